@@ -32,9 +32,21 @@ from app.domain.models.users import User
 from app.domain.models.hotels import Hotel
 from app.domain.models.rooms import Room
 from app.domain.models.booking import Booking
+from app.domain.models.room_nights import RoomNight
+from app.domain.models.booking_archive import BookingArchive
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Index plein texte des hôtels (table FTS5 et ses tables internes, index GIN) :
+    # créés par DDL (app.domain.models.hotels), absents du metadata
+    if type_ == "table" and name.startswith("hotels_fts"):
+        return False
+    if type_ == "index" and name == "ix_hotels_search_vector":
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -60,6 +72,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -88,6 +101,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,52 @@
+"""add hotels search_text
+
+Data migration: search_text (accent-folded tokens of name, description
+and address, see Hotel.search_text) is backfilled for existing hotels.
+
+Revision ID: 4bc43830878e
+Revises: 74453a4df845
+Create Date: 2026-10-18 15:51:12.497161
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4bc43830878e'
+down_revision: Union[str, Sequence[str], None] = '74453a4df845'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def fold(*texts) -> str:
+    """Same folding as tokenize() at the time of this revision."""
+    text = " ".join(filter(None, texts))
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.findall(r"[a-z0-9]+", folded))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hotels', sa.Column('search_text', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    hotels = sa.table(
+        'hotels',
+        sa.column('id'), sa.column('name'), sa.column('description'), sa.column('address'), sa.column('search_text'),
+    )
+    for hotel_id, name, description, address in bind.execute(
+        sa.select(hotels.c.id, hotels.c.name, hotels.c.description, hotels.c.address)
+    ).all():
+        bind.execute(
+            hotels.update().where(hotels.c.id == hotel_id).values(search_text=fold(name, description, address))
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('hotels', 'search_text')
@@ -0,0 +1,58 @@
+"""add hotels full-text index
+
+SQLite: FTS5 table hotels_fts kept up to date by triggers on hotels,
+backfilled from the existing hotels. PostgreSQL: GIN index on the
+tsvector of search_text. See app.domain.models.hotels.
+
+Revision ID: 9d2e51c7a3f4
+Revises: 4bc43830878e
+Create Date: 2026-10-18 17:05:41.208913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e51c7a3f4'
+down_revision: Union[str, Sequence[str], None] = '4bc43830878e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COPY_ROW = "INSERT INTO hotels_fts (hotel_id, name, description, address) VALUES (new.id, new.name, new.description, new.address);"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE hotels_fts USING fts5("
+            "hotel_id UNINDEXED, name, description, address, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(f"CREATE TRIGGER hotels_fts_insert AFTER INSERT ON hotels BEGIN {COPY_ROW} END")
+        op.execute(
+            "CREATE TRIGGER hotels_fts_update AFTER UPDATE OF name, description, address ON hotels BEGIN "
+            f"DELETE FROM hotels_fts WHERE hotel_id = old.id; {COPY_ROW} END"
+        )
+        op.execute("CREATE TRIGGER hotels_fts_delete AFTER DELETE ON hotels BEGIN DELETE FROM hotels_fts WHERE hotel_id = old.id; END")
+        op.execute(
+            "INSERT INTO hotels_fts (hotel_id, name, description, address) "
+            "SELECT id, name, description, address FROM hotels"
+        )
+    elif dialect == "postgresql":
+        op.execute("CREATE INDEX ix_hotels_search_vector ON hotels USING gin (to_tsvector('simple', coalesce(search_text, '')))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("hotels_fts_insert", "hotels_fts_update", "hotels_fts_delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS hotels_fts")
+    elif dialect == "postgresql":
+        op.drop_index('ix_hotels_search_vector', table_name='hotels')
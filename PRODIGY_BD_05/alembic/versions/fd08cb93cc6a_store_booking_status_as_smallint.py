@@ -0,0 +1,67 @@
+"""store booking status as smallint
+
+Data migration: the status strings are mapped to their SMALLINT codes
+(see BOOKING_STATUS_CODES), then the composite overlap index is replaced
+by a partial index holding only the occupying statuses.
+
+Revision ID: fd08cb93cc6a
+Revises: 6afbe226ffd0
+Create Date: 2026-10-18 15:05:08.062678
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fd08cb93cc6a'
+down_revision: Union[str, Sequence[str], None] = '6afbe226ffd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+STATUS_CODES = {"cancelled": 0, "confirmed": 1, "pending": 2, "held": 3, "expired": 4}
+OCCUPYING = "status IN (1, 2, 3)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_bookings_room_status_dates', table_name='bookings')
+
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.add_column(sa.Column('status_code', sa.SmallInteger(), nullable=True))
+
+    cases = " ".join(f"WHEN '{status}' THEN {code}" for status, code in STATUS_CODES.items())
+    op.execute(f"UPDATE bookings SET status_code = CASE status {cases} ELSE 1 END")
+
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.drop_column('status')
+        batch_op.alter_column('status_code', new_column_name='status', existing_type=sa.SmallInteger(), nullable=False)
+
+    op.create_index(
+        'ix_bookings_room_dates_occupying',
+        'bookings',
+        ['room_id', 'check_in_date', 'check_out_date'],
+        unique=False,
+        sqlite_where=sa.text(OCCUPYING),
+        postgresql_where=sa.text(OCCUPYING),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_room_dates_occupying', table_name='bookings')
+
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.add_column(sa.Column('status_label', sa.String(), nullable=True))
+
+    cases = " ".join(f"WHEN {code} THEN '{status}'" for status, code in STATUS_CODES.items())
+    op.execute(f"UPDATE bookings SET status_label = CASE status {cases} END")
+
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.drop_column('status')
+        batch_op.alter_column('status_label', new_column_name='status', existing_type=sa.String())
+
+    op.create_index('ix_bookings_room_status_dates', 'bookings', ['room_id', 'status', 'check_in_date', 'check_out_date'], unique=False)
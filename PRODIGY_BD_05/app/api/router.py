@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.routes import auth, hotels, rooms, bookings
+from app.api.v1.routes import auth, hotels, rooms, bookings, cache
 
 router = APIRouter()
 
@@ -7,3 +7,4 @@ router.include_router(auth.router, prefix="/v1")
 router.include_router(hotels.router, prefix="/v1")
 router.include_router(rooms.router, prefix="/v1")
 router.include_router(bookings.router, prefix="/v1")
+router.include_router(cache.router, prefix="/v1")
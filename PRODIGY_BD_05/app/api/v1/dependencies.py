@@ -5,6 +5,7 @@ from app.application.services.v1.auth_service import AuthService
 from app.application.services.v1.booking_service import BookingService
 from app.application.services.v1.cache_service import CacheService
 from app.application.services.v1.hotel_service import HotelService
+from app.application.services.v1.idempotency_service import IdempotencyService
 from app.application.services.v1.room_service import RoomService
 from app.infrastructure.database.session import get_db
 from app.infrastructure.repositories.booking_repository import BookingRepository
@@ -22,6 +23,10 @@ def get_cache_service() -> CacheService:
     return CacheService()
 
 
+def get_idempotency_service() -> IdempotencyService:
+    return IdempotencyService()
+
+
 # -----------------------------
 # Repositories
 # -----------------------------
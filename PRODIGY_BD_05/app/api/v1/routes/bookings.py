@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends
-from app.api.v1.dependencies import get_booking_service_v1
+from fastapi import APIRouter, Depends, Header, Query, Response
+from app.api.v1.dependencies import get_booking_service_v1, get_idempotency_service
 from app.application.services.v1.booking_service import BookingService
-from app.api.v1.schemas.booking_schema import BookingCreate, BookingDetailResponse
+from app.application.services.v1.idempotency_service import IdempotencyService
+from app.api.v1.schemas.booking_schema import (
+    BookingBatchCreate,
+    BookingBatchResponse,
+    BookingCreate,
+    BookingDetailResponse,
+    BookingHistoryResponse,
+)
+from app.core.config import settings
 from app.core.security import get_current_user, require_roles
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
@@ -10,14 +18,100 @@ router = APIRouter(prefix="/bookings", tags=["Bookings"])
 @router.post("", response_model=BookingDetailResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
 def create_booking(
     payload: BookingCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     current_user=Depends(get_current_user),
     service : BookingService = Depends(get_booking_service_v1),
+    idempotency : IdempotencyService = Depends(get_idempotency_service),
 ):
-    booking = service.create(current_user["user_id"], payload)
+    # Mode asynchrone : réservation prise, confirmation par le worker (202 + polling)
+    if settings.BOOKING_ASYNC_MODE:
+        response.status_code = 202
+
+    return idempotency.run(
+        "bookings",
+        current_user["user_id"],
+        idempotency_key,
+        payload,
+        lambda: BookingDetailResponse(
+            code=202 if settings.BOOKING_ASYNC_MODE else 201,
+            message="Booking pending" if settings.BOOKING_ASYNC_MODE else "Booking created",
+            data=service.create(current_user["user_id"], payload)
+        ),
+        response,
+    )
+
+@router.post("/hold", response_model=BookingDetailResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
+def hold_booking(
+    payload: BookingCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    current_user=Depends(get_current_user),
+    service : BookingService = Depends(get_booking_service_v1),
+    idempotency : IdempotencyService = Depends(get_idempotency_service),
+):
+    return idempotency.run(
+        "bookings:hold",
+        current_user["user_id"],
+        idempotency_key,
+        payload,
+        lambda: BookingDetailResponse(
+            code=201,
+            message="Room held",
+            data=service.hold(current_user["user_id"], payload)
+        ),
+        response,
+    )
+
+@router.post("/batch", response_model=BookingBatchResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
+def create_booking_batch(
+    payload: BookingBatchCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    current_user=Depends(get_current_user),
+    service : BookingService = Depends(get_booking_service_v1),
+    idempotency : IdempotencyService = Depends(get_idempotency_service),
+):
+    return idempotency.run(
+        "bookings:batch",
+        current_user["user_id"],
+        idempotency_key,
+        payload,
+        lambda: BookingBatchResponse(
+            code=201,
+            message="Bookings created",
+            data=service.create_batch(current_user["user_id"], payload.bookings)
+        ),
+        response,
+    )
+
+@router.get("/me", response_model=BookingHistoryResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
+def list_my_bookings(
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    current_user=Depends(get_current_user),
+    service : BookingService = Depends(get_booking_service_v1),
+):
+    page = service.history(current_user["user_id"], cursor, limit)
+
+    return BookingHistoryResponse(
+        code=200,
+        message="Success",
+        data=page["items"],
+        next_cursor=page["next_cursor"],
+    )
+
+@router.get("/{booking_id}", response_model=BookingDetailResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
+def get_booking(
+    booking_id: str,
+    current_user=Depends(get_current_user),
+    service : BookingService = Depends(get_booking_service_v1),
+):
+    booking = service.get(booking_id, current_user["user_id"])
 
     return BookingDetailResponse(
-        code=201,
-        message="Booking created",
+        code=200,
+        message="Success",
         data=booking
     )
 
@@ -35,17 +129,16 @@ def cancel_booking(
         data=booking
     )
 
-# @router.patch("/{booking_id}/confirm", response_model=BookingDetailResponse, dependencies=[Depends(require_roles("owner"))])
-# def confirm_booking(
-#     booking_id: str,
-#     db: Session = Depends(get_db),
-#     current_user=Depends(get_current_user),
-# ):
-#     service = get_booking_service_v1()
-#     booking = service.confirm(db, booking_id, current_user["user_id"])
-
-#     return BookingDetailResponse(
-#         code=200,
-#         message="Booking confirmed",
-#         data=booking
-# )
\ No newline at end of file
+@router.patch("/{booking_id}/confirm", response_model=BookingDetailResponse, dependencies=[Depends(require_roles("user", "owner", "admin"))])
+def confirm_booking(
+    booking_id: str,
+    current_user=Depends(get_current_user),
+    service : BookingService = Depends(get_booking_service_v1),
+):
+    booking = service.confirm(booking_id, current_user["user_id"])
+
+    return BookingDetailResponse(
+        code=200,
+        message="Booking confirmed",
+        data=booking
+    )
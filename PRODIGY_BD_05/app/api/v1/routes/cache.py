@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.api.v1.dependencies import get_cache_service
+from app.api.v1.schemas.cache_schema import CacheStatsResponse
+from app.application.services.v1.cache_service import CacheService
+from app.core.security import require_roles
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@router.get("/stats", response_model=CacheStatsResponse, dependencies=[Depends(require_roles("admin"))])
+def cache_stats(
+    service : CacheService = Depends(get_cache_service),
+):
+    """Hit / miss / eviction counters of the L1 (this worker) and L2 (Redis) cache tiers."""
+    return CacheStatsResponse(
+        code=200,
+        message="Cache stats fetched successfully",
+        data=service.stats(),
+    )
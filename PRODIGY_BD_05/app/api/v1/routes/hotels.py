@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends
+from datetime import date
 
-from app.api.v1.dependencies import get_hotel_service_v1
+from fastapi import APIRouter, Depends, Header, Query, Response
+
+from app.api.v1.dependencies import get_hotel_service_v1, get_idempotency_service, get_room_service_v1
 from app.application.services.v1.hotel_service import HotelService
-from app.api.v1.schemas.hotel_schema import HotelCreate,HotelDetailResponse, HotelListResponse, HotelUpdate
+from app.application.services.v1.idempotency_service import IdempotencyService
+from app.application.services.v1.room_service import RoomService
+from app.api.v1.schemas.hotel_schema import (
+    HotelAvailabilityListResponse,
+    HotelCreate,
+    HotelDetailResponse,
+    HotelListResponse,
+    HotelUpdate,
+)
+from app.core.config import settings
 from app.core.security import require_roles, get_current_user
+from app.utils.etag import etag, parse_if_match
 
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
@@ -12,25 +24,36 @@ router = APIRouter(prefix="/hotels", tags=["Hotels"])
 @router.post("", response_model=HotelDetailResponse, dependencies=[Depends(require_roles("admin", "owner"))],)
 def create_hotel(
     payload: HotelCreate,
+    response: Response,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     current_user=Depends(get_current_user),
     service : HotelService = Depends(get_hotel_service_v1),
+    idempotency : IdempotencyService = Depends(get_idempotency_service),
 ):
-    hotel = service.create(current_user["user_id"], payload)
-
-    return HotelDetailResponse(
-        code=201,
-        message="Hotel created successfully",
-        data=hotel,
+    return idempotency.run(
+        "hotels",
+        current_user["user_id"],
+        idempotency_key,
+        payload,
+        lambda: HotelDetailResponse(
+            code=201,
+            message="Hotel created successfully",
+            data=service.create(current_user["user_id"], payload),
+        ),
+        response,
     )
 
 @router.put("/{hotel_id}", response_model=HotelDetailResponse, dependencies=[Depends(require_roles("owner"))])
 def update_hotel(
     hotel_id: str,
     payload: HotelUpdate,
+    response: Response,
+    if_match: str | None = Header(None, alias="If-Match"),
     current_user=Depends(get_current_user),
     service : HotelService = Depends(get_hotel_service_v1),
 ):
-    hotel = service.update(hotel_id, current_user["user_id"], payload)
+    hotel = service.update(hotel_id, current_user["user_id"], payload, parse_if_match(if_match))
+    response.headers["ETag"] = etag(hotel.version)
 
     return HotelDetailResponse(
         code=200,
@@ -39,11 +62,46 @@ def update_hotel(
 )
 
 @router.get("", response_model=HotelListResponse)
-def list_hotels(service : HotelService = Depends(get_hotel_service_v1)):
+def list_hotels(
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    service : HotelService = Depends(get_hotel_service_v1),
+):
 
-    hotel = service.list_all()
+    page = service.list_all(cursor, limit)
     return HotelListResponse(
         code=200, 
         message="Success", 
-        data=hotel
-    )
\ No newline at end of file
+        data=page["items"],
+        next_cursor=page["next_cursor"],
+    )
+
+@router.get("/search", response_model=HotelListResponse)
+def search_hotels(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    service : HotelService = Depends(get_hotel_service_v1),
+):
+    page = service.search(q, cursor, limit)
+
+    return HotelListResponse(
+        code=200,
+        message="Success",
+        data=page["items"],
+        next_cursor=page["next_cursor"],
+    )
+
+@router.get("/availability", response_model=HotelAvailabilityListResponse)
+def hotels_availability(
+    check_in: date,
+    check_out: date,
+    service : RoomService = Depends(get_room_service_v1),
+):
+    hotels = service.availability_by_hotel(check_in, check_out)
+
+    return HotelAvailabilityListResponse(
+        code=200,
+        message="Success",
+        data=hotels
+    )
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from app.api.v1.dependencies import get_room_service_v1
 from app.application.services.v1.room_service import RoomService
+from app.core.config import settings
 from app.core.security import get_current_user, require_roles
-from app.api.v1.schemas.room_schema import RoomCreate, RoomDetailResponse, RoomListResponse, RoomUpdate
+from app.utils.etag import etag, parse_if_match
+from app.api.v1.schemas.room_schema import (
+    GroupSearchResponse,
+    HotelCalendarDetailResponse,
+    RoomCalendarDetailResponse,
+    RoomCreate,
+    RoomDetailResponse,
+    RoomFlexSearchResponse,
+    RoomListResponse,
+    RoomSearchFilters,
+    RoomSort,
+    RoomUpdate,
+)
 
 import uuid
 from datetime import datetime
+from uuid import UUID
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
@@ -26,13 +40,47 @@ def create_room(
     )
 
 @router.get("/hotel/{hotel_id}", response_model=RoomListResponse)
-def list_rooms_by_hotel(hotel_id: str, service : RoomService = Depends(get_room_service_v1)):
-    rooms = service.list_by_hotel(hotel_id)
+def list_rooms_by_hotel(
+    hotel_id: str,
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    service : RoomService = Depends(get_room_service_v1),
+):
+    page = service.list_by_hotel(hotel_id, cursor, limit)
 
     return RoomListResponse(
         code=200,
         message="Success",
-        data=rooms
+        data=page["items"],
+        next_cursor=page["next_cursor"],
+    )
+
+@router.get("/hotel/{hotel_id}/calendar", response_model=HotelCalendarDetailResponse)
+def get_hotel_calendar(
+    hotel_id: str,
+    month: str | None = None,
+    service : RoomService = Depends(get_room_service_v1),
+):
+    calendar = service.get_hotel_calendar(hotel_id, month)
+
+    return HotelCalendarDetailResponse(
+        code=200,
+        message="Success",
+        data=calendar
+    )
+
+@router.get("/{room_id}/calendar", response_model=RoomCalendarDetailResponse)
+def get_room_calendar(
+    room_id: str,
+    month: str | None = None,
+    service : RoomService = Depends(get_room_service_v1),
+):
+    calendar = service.get_calendar(room_id, month)
+
+    return RoomCalendarDetailResponse(
+        code=200,
+        message="Success",
+        data=calendar
     )
 
 @router.get("/{room_id}/", response_model=RoomDetailResponse)
@@ -50,23 +98,31 @@ def get_room(room_id: str, service : RoomService = Depends(get_room_service_v1))
 
 
 @router.get("/available", response_model=RoomListResponse)
-def list_available_rooms(service : RoomService = Depends(get_room_service_v1)):
+def list_available_rooms(
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    service : RoomService = Depends(get_room_service_v1),
+):
 
-    rooms = service.list_available()
+    page = service.list_available(cursor, limit)
 
     return RoomListResponse(
         code=200,
         message="Success",
-        data=rooms,
+        data=page["items"],
+        next_cursor=page["next_cursor"],
     )
 @router.put("/{room_id}", response_model=RoomDetailResponse, dependencies=[Depends(require_roles("owner"))])
 def update_room(
     room_id: str,
     payload: RoomUpdate,
+    response: Response,
+    if_match: str | None = Header(None, alias="If-Match"),
     current_user=Depends(get_current_user),
     service : RoomService = Depends(get_room_service_v1),
 ):
-    room = service.update(room_id, current_user["user_id"], payload)
+    room = service.update(room_id, current_user["user_id"], payload, parse_if_match(if_match))
+    response.headers["ETag"] = etag(room.version)
 
     return RoomDetailResponse(
         code=200,
@@ -77,10 +133,13 @@ def update_room(
 @router.patch("/{room_id}/availability", response_model=RoomDetailResponse, dependencies=[Depends(require_roles("owner"))])
 def toggle_room_availability(
     room_id: str,
+    response: Response,
+    if_match: str | None = Header(None, alias="If-Match"),
     current_user=Depends(get_current_user),
     service : RoomService = Depends(get_room_service_v1),
 ):
-    room = service.toggle_availability(room_id, current_user["user_id"])
+    room = service.toggle_availability(room_id, current_user["user_id"], parse_if_match(if_match))
+    response.headers["ETag"] = etag(room.version)
 
     return RoomDetailResponse(
         code=200,
@@ -103,16 +162,77 @@ def delete_room(
     }
 
 
-@router.get("/search", response_model=RoomListResponse)
+@router.get("/search", response_model=RoomListResponse | RoomFlexSearchResponse)
 def search_rooms(
     check_in: datetime,
     check_out: datetime,
+    flex_days: int = Query(0, ge=0, le=14),
+    min_capacity: int | None = Query(None, ge=1),
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    hotel_id: UUID | None = None,
+    sort: RoomSort | None = None,
+    cursor: str | None = None,
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
     service : RoomService = Depends(get_room_service_v1),
 ):
-    rooms = service.list_available_by_date(check_in, check_out)
+    filters = RoomSearchFilters(
+        min_capacity=min_capacity,
+        min_price=min_price,
+        max_price=max_price,
+        hotel_id=hotel_id,
+        sort=sort,
+    )
+
+    if flex_days:
+        windows = service.list_available_by_date_flex(check_in, check_out, flex_days, filters, cursor, limit)
+
+        return RoomFlexSearchResponse(
+            code=200,
+            message="Available rooms",
+            data=windows
+        )
+
+    page = service.list_available_by_date(check_in, check_out, filters, cursor, limit)
+
+    return RoomListResponse(
+        code=200,
+        message="Available rooms",
+        data=page["items"],
+        next_cursor=page["next_cursor"],
+    )
+
+
+
+@router.get("/search/top", response_model=RoomListResponse)
+def search_top_rooms(
+    check_in: datetime,
+    check_out: datetime,
+    k: int = Query(20, ge=1, le=100),
+    order: RoomSort = RoomSort.PRICE,
+    service : RoomService = Depends(get_room_service_v1),
+):
+    rooms = service.list_top_available_by_date(check_in, check_out, k, order)
 
     return RoomListResponse(
         code=200,
         message="Available rooms",
         data=rooms
     )
+
+
+@router.get("/search/group", response_model=GroupSearchResponse)
+def search_group_rooms(
+    check_in: datetime,
+    check_out: datetime,
+    party_size: int = Query(..., ge=1, le=100),
+    limit: int = Query(settings.POSTS_PER_PAGE, ge=1, le=100),
+    service : RoomService = Depends(get_room_service_v1),
+):
+    hotels = service.search_group(check_in, check_out, party_size, limit)
+
+    return GroupSearchResponse(
+        code=200,
+        message="Available hotels",
+        data=hotels
+    )
@@ -1,9 +1,11 @@
 from fastapi import HTTPException
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from uuid import UUID
 from datetime import date, datetime
 
-from app.utils.response import ApiResponse
+from app.core.config import settings
+from app.domain.models.booking import BookingStatus
+from app.utils.response import ApiResponse, PaginatedResponse
 
 class BookingCreate(BaseModel):
     room_id: UUID
@@ -26,8 +28,10 @@ class BookingResponse(BaseModel):
     room_id: UUID
     check_in_date: date
     check_out_date: date
-    status: str
+    status: BookingStatus
+    expires_at: datetime | None = None
     created_at: datetime
+    archived: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -36,8 +40,25 @@ class BookingUpdate(BaseModel):
     check_out_date: date
 
 
+class BookingBatchCreate(BaseModel):
+    bookings: list[BookingCreate] = Field(min_length=1, max_length=settings.BOOKING_BATCH_MAX_SIZE)
+
+class BookingBatchItem(BaseModel):
+    index: int
+    room_id: UUID
+    status: str  # created | rejected | skipped
+    reason: str | None = None
+    booking: BookingResponse | None = None
+
+
 class BookingListResponse(ApiResponse[list[BookingResponse]]):
     pass
 
+class BookingHistoryResponse(PaginatedResponse[list[BookingResponse]]):
+    pass
+
 class BookingDetailResponse(ApiResponse[BookingResponse]):
+    pass
+
+class BookingBatchResponse(ApiResponse[list[BookingBatchItem]]):
     pass
\ No newline at end of file
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.utils.response import ApiResponse
+
+
+class CacheTierStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: Optional[int] = None
+
+
+class LocalCacheStats(CacheTierStats):
+    size: int
+    max_size: int
+    ttl: float
+
+
+class CacheStats(BaseModel):
+    l1: Optional[LocalCacheStats] = None  # None si CACHE_L1_ENABLED est désactivé
+    l2: CacheTierStats
+
+
+class CacheStatsResponse(ApiResponse[CacheStats]):
+    pass
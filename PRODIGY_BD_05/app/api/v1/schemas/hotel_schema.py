@@ -2,7 +2,7 @@ from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import datetime
 
-from app.utils.response import ApiResponse
+from app.utils.response import ApiResponse, PaginatedResponse
 
 class HotelCreate(BaseModel):
     name: str
@@ -20,15 +20,27 @@ class HotelResponse(BaseModel):
     description: str | None
     address: str
     owner_id: UUID
+    version: int
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class HotelAvailability(BaseModel):
+    hotel_id: UUID
+    name: str
+    free_rooms: int
+    min_price: float | None
+    max_price: float | None
+
+
 
 
-class HotelListResponse(ApiResponse[list[HotelResponse]]):
+class HotelListResponse(PaginatedResponse[list[HotelResponse]]):
     pass
 
 class HotelDetailResponse(ApiResponse[HotelResponse]):
+    pass
+
+class HotelAvailabilityListResponse(ApiResponse[list[HotelAvailability]]):
     pass
\ No newline at end of file
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
 
-from app.utils.response import ApiResponse
+from app.utils.response import ApiResponse, PaginatedResponse
 
 class RoomCreate(BaseModel):
     title: str
@@ -17,6 +18,7 @@ class RoomResponse(BaseModel):
     price_per_night: float
     capacity: int
     is_available: bool
+    version: int
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -29,8 +31,67 @@ class RoomUpdate(BaseModel):
     capacity: int | None = None
 
 
-class RoomListResponse(ApiResponse[list[RoomResponse]]):
+class RoomSort(str, Enum):
+    PRICE = "price"
+    CAPACITY = "capacity"
+
+class RoomSearchFilters(BaseModel):
+    min_capacity: int | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+    hotel_id: UUID | None = None
+    sort: RoomSort | None = None
+
+class RoomSearchWindow(BaseModel):
+    check_in: date
+    check_out: date
+    rooms: list[RoomResponse]
+
+class GroupSearchResult(BaseModel):
+    hotel_id: UUID
+    free_capacity: int
+    free_rooms: int
+    price_per_night: float  # prix total de la combinaison
+    rooms: list[RoomResponse]
+
+class CalendarDay(BaseModel):
+    date: date
+    booked: bool
+
+class RoomCalendarResponse(BaseModel):
+    room_id: UUID
+    month: str
+    bitmap: int  # bit i = nuit i du mois réservée
+    days: list[CalendarDay]
+
+class HotelCalendarDay(BaseModel):
+    date: date
+    any_booked: bool
+    fully_booked: bool
+
+class HotelCalendarResponse(BaseModel):
+    hotel_id: UUID
+    month: str
+    rooms: int
+    any_booked: int  # OR des bitmaps des chambres
+    fully_booked: int  # AND des bitmaps des chambres
+    days: list[HotelCalendarDay]
+
+
+class RoomListResponse(PaginatedResponse[list[RoomResponse]]):
     pass
 
 class RoomDetailResponse(ApiResponse[RoomResponse]):
+    pass
+
+class RoomFlexSearchResponse(ApiResponse[list[RoomSearchWindow]]):
+    pass
+
+class GroupSearchResponse(ApiResponse[list[GroupSearchResult]]):
+    pass
+
+class RoomCalendarDetailResponse(ApiResponse[RoomCalendarResponse]):
+    pass
+
+class HotelCalendarDetailResponse(ApiResponse[HotelCalendarResponse]):
     pass
\ No newline at end of file
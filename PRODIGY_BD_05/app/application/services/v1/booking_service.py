@@ -1,53 +1,148 @@
 import uuid
+from datetime import timedelta
+
 from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from app.domain.models.booking import Booking
+from app.domain.models.booking import Booking, BookingStatus
 from app.infrastructure.repositories.booking_repository import BookingRepository
 from app.infrastructure.repositories.room_repository import RoomRepository
 from app.api.v1.schemas.booking_schema import BookingCreate
-from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+from app.core.exceptions import raise_exception
+from app.domain.mixins.timestamp_mixin import utcnow
+from app.application.services.v1.cache_service import CacheService, night_tags
+from app.infrastructure.indexes.availability_index import get_availability_index
+from app.infrastructure.queues.booking_queue import BookingQueue, get_booking_queue
 
 
 class BookingService:
-    def __init__(self, booking_repo: BookingRepository, room_repo: RoomRepository, cache: CacheService):
+    def __init__(
+        self,
+        booking_repo: BookingRepository,
+        room_repo: RoomRepository,
+        cache: CacheService,
+        queue: BookingQueue | None = None,
+    ):
         self.booking_repo = booking_repo
         self.room_repo = room_repo
         self.cache = cache
+        self.queue = queue or get_booking_queue()
+        self.availability = get_availability_index()
 
     def create(self, user_id: str, data: BookingCreate):
-        room = self.room_repo.get_by_id(data.room_id)
+        """
+        Book the room. In BOOKING_ASYNC_MODE the nights are reserved
+        atomically but the booking is returned "pending": confirmation
+        and cache invalidation are left to the booking worker.
+        """
+        if settings.BOOKING_ASYNC_MODE:
+            return self._book(user_id, data, BookingStatus.PENDING)
+        return self._book(user_id, data, BookingStatus.CONFIRMED)
 
-        if not room:
-            raise HTTPException(status_code=404, detail="Room not found")
+    def hold(self, user_id: str, data: BookingCreate):
+        """
+        Reserve the room for BOOKING_HOLD_TTL seconds during checkout.
 
-        if not room.is_available:
-            raise HTTPException(status_code=400, detail="Room unavailable")
+        A hold is a booking with status "held" and an expiry: its nights
+        are taken in room_nights like any booking, so searches and
+        conflict checks see the room as occupied until it expires.
+        """
+        expires_at = utcnow() + timedelta(seconds=settings.BOOKING_HOLD_TTL)
+        return self._book(user_id, data, BookingStatus.HELD, expires_at)
 
+    def _book(self, user_id: str, data: BookingCreate, status: BookingStatus, expires_at=None):
         if data.check_in_date >= data.check_out_date:
             raise HTTPException(status_code=400, detail="Invalid dates")
 
-        conflict = self.booking_repo.has_conflict(
-            data.room_id,
-            data.check_in_date,
-            data.check_out_date,
-        )
+        # Verrou sur la chambre jusqu'au commit : une réservation à la fois par chambre
+        room = self.room_repo.get_by_id_for_update(data.room_id)
 
-        if conflict:
-            raise HTTPException(status_code=400, detail="Booking conflict, ")
+        if not room:
+            raise HTTPException(status_code=404, detail="Room not found")
+
+        if not room.is_available:
+            raise HTTPException(status_code=400, detail="Room unavailable")
 
         booking = Booking(
             user_id=uuid.UUID(user_id),
             room_id=data.room_id,
             check_in_date=data.check_in_date,
             check_out_date=data.check_out_date,
-            status="confirmed",
+            status=status,
+            expires_at=expires_at,
         )
 
-        self.cache.invalidate_pattern("rooms:*")
+        # Les holds expirés de la chambre libèrent leurs nuits dans la même transaction
+        released = self.booking_repo.release_expired_holds(utcnow(), [room.id])
 
-        return self.booking_repo.create(booking)
+        # Pas de has_conflict : la clé (room_id, night) de room_nights rejette les doublons
+        try:
+            booking = self.booking_repo.create(booking)
+        except IntegrityError:
+            raise HTTPException(status_code=400, detail="Booking conflict, ")
+        except OperationalError:
+            raise HTTPException(status_code=503, detail="Room is busy, please retry")
 
-    def cancel(self, booking_id: str, user_id: str):
+        # Nuits libérées par les holds expirés : invalidées tout de suite
+        stays = self.booking_repo.get_stays_of(released) if released else []
+
+        # Write-behind : le worker invalide le cache (les nuits sont déjà prises en base)
+        if status == BookingStatus.PENDING:
+            self.queue.enqueue(booking.id)
+        else:
+            stays.append((room.id, room.hotel_id, booking.check_in_date, booking.check_out_date))
+        self._invalidate_stays(stays)
+        for booking_id in released:
+            self.availability.remove(booking_id)
+        self.availability.add(booking.id, booking.room_id, booking.check_in_date, booking.check_out_date, booking.expires_at)
+
+        return booking
+
+    def finalize_pending(self, booking_id) -> bool:
+        """
+        Worker side of the async pipeline: confirm the pending booking and
+        run the side effects deferred by create.
+        """
+        confirmed = self.booking_repo.confirm_pending(booking_id)
+        self._invalidate_stays(self.booking_repo.get_stays_of([booking_id]))
+        return confirmed
+
+    def requeue_stale_pending(self):
+        """
+        Queue again the bookings still pending BOOKING_PENDING_REQUEUE_AFTER
+        seconds after their creation: their job was lost (worker crash or
+        error after the pop, failed enqueue). Bookings whose job is still
+        waiting in the queue are skipped (BookingQueue.enqueue).
+        Returns the re-queued ids.
+        """
+        before = utcnow() - timedelta(seconds=settings.BOOKING_PENDING_REQUEUE_AFTER)
+        return [
+            booking_id
+            for booking_id in self.booking_repo.get_stale_pending(before)
+            if self.queue.enqueue(booking_id)
+        ]
+
+    def get(self, booking_id: str, user_id: str):
+        # Repli sur l'archive : les séjours passés restent consultables
+        booking = self.booking_repo.get_booking_by_id(booking_id) or self.booking_repo.get_archived_by_id(booking_id)
+
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        if str(booking.user_id) != user_id:
+            raise HTTPException(status_code=403, detail="Not your booking")
+
+        return booking
+
+    def history(self, user_id: str, cursor: str | None = None, limit: int = settings.POSTS_PER_PAGE):
+        """Bookings of the user, archived ones included, latest stay first."""
+        bookings, next_cursor = self.booking_repo.get_history_page(uuid.UUID(user_id), cursor, limit)
+        return {"items": bookings, "next_cursor": next_cursor}
+
+    def confirm(self, booking_id: str, user_id: str):
+        """Convert a live hold into a confirmed booking (no conflict check needed)."""
         booking = self.booking_repo.get_booking_by_id(booking_id)
 
         if not booking:
@@ -56,7 +151,153 @@ class BookingService:
         if str(booking.user_id) != user_id:
             raise HTTPException(status_code=403, detail="Not your booking")
 
-        self.cache.invalidate_pattern("rooms:*")
+        if booking.status != BookingStatus.HELD:
+            raise HTTPException(status_code=400, detail="Booking is not a hold")
+
+        # UPDATE conditionnel : un hold libéré entre-temps par le sweeper n'est jamais confirmé
+        confirmed = self.booking_repo.confirm_hold(booking, utcnow())
+        if confirmed is None:
+            raise HTTPException(status_code=410, detail="Hold expired")
+
+        # Nuits déjà réservées par le hold, mais l'index doit oublier son expiration
+        self.availability.remove(confirmed.id)
+        self.availability.add(confirmed.id, confirmed.room_id, confirmed.check_in_date, confirmed.check_out_date)
+        return confirmed
+
+    def release_expired_holds(self):
+        """Expiry sweeper: release every lapsed hold. Returns the released ids."""
+        released = self.booking_repo.sweep_expired_holds(utcnow())
+
+        if released:
+            self._invalidate_stays(self.booking_repo.get_stays_of(released))
+            for booking_id in released:
+                self.availability.remove(booking_id)
+
+        return released
+
+    def create_batch(self, user_id: str, items: list[BookingCreate]):
+        """
+        Book several rooms at once, all or nothing.
+
+        Rooms are fetched (and locked) with one IN query and conflicts are
+        checked for the whole set with one query. If any item is rejected,
+        nothing is created and a 409 lists the outcome of every item.
+        Otherwise all bookings are inserted in a single transaction and
+        the cache is invalidated once.
+        """
+        rooms = {room.id: room for room in self.room_repo.get_by_ids_for_update({item.room_id for item in items})}
+
+        reasons = [None] * len(items)
+        for i, item in enumerate(items):
+            room = rooms.get(item.room_id)
+            if item.check_in_date >= item.check_out_date:
+                reasons[i] = "Invalid dates"
+            elif not room:
+                reasons[i] = "Room not found"
+            elif not room.is_available:
+                reasons[i] = "Room unavailable"
+            elif any(
+                other.room_id == item.room_id
+                and other.check_in_date < item.check_out_date
+                and other.check_out_date > item.check_in_date
+                for other in items[:i]
+            ):
+                reasons[i] = "Overlaps another booking of the batch"
+
+        conflicts = self.booking_repo.get_conflicts([
+            (item.room_id, item.check_in_date, item.check_out_date)
+            for item, reason in zip(items, reasons) if reason is None
+        ])
+        for i, item in enumerate(items):
+            if reasons[i] is None and any(
+                room_id == item.room_id and check_in < item.check_out_date and check_out > item.check_in_date
+                for room_id, check_in, check_out in conflicts
+            ):
+                reasons[i] = "Booking conflict"
+
+        if any(reasons):
+            raise_exception(409, "Batch rejected, no booking created", jsonable_encoder([
+                {
+                    "index": i,
+                    "room_id": item.room_id,
+                    "status": "rejected" if reason else "skipped",
+                    "reason": reason,
+                    "booking": None,
+                }
+                for i, (item, reason) in enumerate(zip(items, reasons))
+            ]))
+
+        bookings = [
+            Booking(
+                user_id=uuid.UUID(user_id),
+                room_id=item.room_id,
+                check_in_date=item.check_in_date,
+                check_out_date=item.check_out_date,
+                status=BookingStatus.CONFIRMED,
+            )
+            for item in items
+        ]
+
+        released = self.booking_repo.release_expired_holds(utcnow(), list(rooms))
+
+        try:
+            bookings = self.booking_repo.create_many(bookings)
+        except IntegrityError:
+            raise HTTPException(status_code=400, detail="Booking conflict, ")
+        except OperationalError:
+            raise HTTPException(status_code=503, detail="Room is busy, please retry")
+
+        self._invalidate_stays([
+            *(self.booking_repo.get_stays_of(released) if released else []),
+            *(
+                (booking.room_id, rooms[booking.room_id].hotel_id, booking.check_in_date, booking.check_out_date)
+                for booking in bookings
+            ),
+        ])
+        for booking_id in released:
+            self.availability.remove(booking_id)
+        for booking in bookings:
+            self.availability.add(booking.id, booking.room_id, booking.check_in_date, booking.check_out_date)
+
+        return [
+            {"index": i, "room_id": booking.room_id, "status": "created", "booking": booking}
+            for i, booking in enumerate(bookings)
+        ]
+
+    def cancel(self, booking_id: str, user_id: str):
+        """
+        Fast path: one conditional UPDATE ... RETURNING, the booking is
+        never loaded. Only a miss costs a second query, to tell an unknown
+        booking (404) from someone else's (403) and from one already
+        cancelled or expired (409).
+        """
+        booking = self.booking_repo.cancel_owned(uuid.UUID(booking_id), uuid.UUID(user_id))
+
+        if booking is None:
+            owner_id = self.booking_repo.get_owner_id(uuid.UUID(booking_id))
+            if owner_id is None:
+                raise HTTPException(status_code=404, detail="Booking not found")
+            if str(owner_id) != user_id:
+                raise HTTPException(status_code=403, detail="Not your booking")
+            raise HTTPException(status_code=409, detail="Booking already cancelled or expired")
+
+        self._invalidate_stays([(booking.room_id, booking.hotel_id, booking.check_in_date, booking.check_out_date)])
+        self.availability.remove(booking.id)
+
+        return booking
+
+    def _invalidate_stays(self, stays):
+        """
+        Drop only what the (room_id, hotel_id, check_in, check_out) stays
+        can change: the searches covering one of their nights (night
+        tags) and the room and hotel calendars (generation bump). Searches
+        on other dates and the room and hotel listings are kept.
+        """
+        tags, namespaces = [], []
+        for room_id, hotel_id, check_in, check_out in stays:
+            tags += night_tags(check_in, check_out)
+            namespaces += [f"rooms:calendar:{room_id}", f"rooms:hotel:{hotel_id}:calendar"]
 
-        booking.status = "cancelled"
-        return self.booking_repo.update(booking)
+        self.cache.invalidate_tags(*tags)
+        if namespaces:
+            self.cache.bump(*namespaces)
@@ -1,36 +1,318 @@
 import json
-from typing import Any, Optional
-from app.core.redis import get_redis
+import math
+import random
+import time
+import uuid
+from typing import Any, Callable, Iterable, Optional, Union
+from app.core.redis import get_redis, release_lock
 from app.core.config import settings
+from app.domain.models.room_nights import nights_between
+from app.infrastructure.cache.local_cache import TierStats, get_local_cache
+from app.infrastructure.cache.single_flight import get_single_flight
+from app.infrastructure.indexes.availability_index import to_date
+
+# Compteurs du tier Redis (L2) pour ce worker
+L2_STATS = TierStats()
+
+
+def night_tags(check_in, check_out) -> list[str]:
+    """Tags night:{date} des nuits [check_in, check_out)."""
+    return [f"night:{night}" for night in nights_between(to_date(check_in), to_date(check_out))]
+
+
+def generation_seed() -> int:
+    """
+    Valeur initiale d'un compteur de génération : l'heure en µs. Un
+    compteur perdu (éviction, flush) repart ainsi au-delà des générations
+    déjà utilisées au lieu de 0, sans ressusciter d'anciennes entrées.
+    """
+    return time.time_ns() // 1000
 
 
 class CacheService:
+    """
+    Cache Redis (L2), précédé si CACHE_L1_ENABLED d'un cache LRU local au
+    worker (L1). Les invalidations vident le L1 local puis sont publiées
+    sur CACHE_INVALIDATION_CHANNEL pour les L1 des autres workers.
+    """
+
     def __init__(self):
         self.redis = get_redis()
         self.default_ttl = settings.REDIS_CACHE_EXPIRE
+        self.scan_count = settings.CACHE_SCAN_COUNT
+        self.unlink_batch = settings.CACHE_UNLINK_BATCH
+        self.local = get_local_cache() if settings.CACHE_L1_ENABLED else None
+        self.flights = get_single_flight()
 
     def get(self, key: str) -> Optional[Any]:
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
         data = self.redis.get(key)
+        L2_STATS.record(bool(data))
         if not data:
             return None
-        return json.loads(data)
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        value = json.loads(data)
+        if self.local is not None:
+            self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        """
+        Met en cache la valeur. Chaque tag (room:{id}, hotel:{id},
+        night:{date}) référence la clé dans le set Redis tag:{tag}, pour
+        invalidate_tags().
+
+        Un set souvent écrit n'expire jamais : chaque fois qu'il gagne
+        CACHE_TAG_PRUNE_EVERY membres, ses clés déjà expirées en sont
+        retirées (_prune_tag), sa taille reste bornée par les clés vivantes.
+        """
         expire_time = ttl if ttl else self.default_ttl
-        self.redis.setex(
+        tag_keys = [f"tag:{tag}" for tag in dict.fromkeys(tags)]
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setex(
             key,
             expire_time,
             json.dumps(value, default=str)  # important UUID/date
         )
+        for tag_key in tag_keys:
+            pipe.sadd(tag_key, key)
+            pipe.scard(tag_key)
+            # EXPIRE simple (NX / GT exigent Redis >= 7.0) : le set survit à ses clés
+            pipe.expire(tag_key, max(expire_time, settings.CACHE_TAG_TTL))
+        results = pipe.execute()
+
+        for i, tag_key in enumerate(tag_keys):
+            added, size = results[1 + 3 * i], results[2 + 3 * i]
+            if added and size % settings.CACHE_TAG_PRUNE_EVERY == 0:
+                self._prune_tag(tag_key)
+
+    def _prune_tag(self, tag_key: str) -> int:
+        """
+        Retire du set tag_key les clés déjà expirées : SSCAN par pages de
+        CACHE_SCAN_COUNT, EXISTS en pipeline, SREM des clés disparues.
+        Retourne leur nombre.
+        """
+        removed = 0
+        cursor = 0
+        while True:
+            cursor, members = self.redis.sscan(tag_key, cursor, count=self.scan_count)
+            if members:
+                pipe = self.redis.pipeline(transaction=False)
+                for member in members:
+                    pipe.exists(member)
+                expired = [member for member, alive in zip(members, pipe.execute()) if not alive]
+                if expired:
+                    removed += self.redis.srem(tag_key, *expired)
+
+            if cursor == 0:
+                return removed
+
+    def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: Optional[int] = None,
+        tags: Union[Iterable[str], Callable[[Any], Iterable[str]]] = (),
+    ) -> Any:
+        """
+        Valeur en cache de `key`, sinon compute() mise en cache (tags : liste,
+        ou fonction de la valeur calculée). Protégé contre les stampedes :
+
+        - dans le worker, les misses concurrents attendent un seul calcul ;
+        - entre workers, seul le détenteur du verrou Redis lock:{key} calcule,
+          les autres lisent la clé en polling (CACHE_LOCK_WAIT au plus) ;
+        - XFetch : avant expiration, une requête recalcule la clé avec une
+          probabilité qui croît avec le coût du calcul et la proximité de
+          l'expiration, pendant que les autres servent encore l'ancienne valeur.
+
+        L'entrée stockée est {"value", "delta" (durée du calcul), "expires_at"}.
+        """
+        entry = self.get(key)
+        if entry is not None and (not self._refresh_due(entry) or self.flights.running(key)):
+            return entry["value"]
+
+        return self.flights.do(
+            key,
+            lambda: self._fill(key, compute, ttl, tags, stale=entry),
+            timeout=settings.CACHE_LOCK_TTL,
+        )
+
+    def _refresh_due(self, entry: dict) -> bool:
+        # XFetch : now - delta * beta * ln(rand) >= expires_at, rand dans ]0, 1]
+        return time.time() - entry["delta"] * settings.CACHE_XFETCH_BETA * math.log(1.0 - random.random()) >= entry["expires_at"]
+
+    def _fill(self, key: str, compute, ttl, tags, stale: Optional[dict]):
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        if not self.redis.set(lock_key, token, nx=True, ex=settings.CACHE_LOCK_TTL):
+            if stale is not None:
+                # Rafraîchissement anticipé déjà en cours dans un autre worker
+                return stale["value"]
+
+            entry = self._wait_for(key)
+            if entry is not None:
+                return entry["value"]
+            # Verrou tenu trop longtemps : on calcule plutôt que d'échouer
+            return self._compute(key, compute, ttl, tags)
+
+        try:
+            return self._compute(key, compute, ttl, tags)
+        finally:
+            # Calcul plus long que CACHE_LOCK_TTL : le verrou peut appartenir à un autre worker
+            release_lock(lock_key, token)
+
+    def _compute(self, key: str, compute, ttl, tags):
+        start = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - start
+
+        expire_time = ttl if ttl else self.default_ttl
+        self.set(
+            key,
+            {"value": value, "delta": delta, "expires_at": time.time() + expire_time},
+            expire_time,
+            tags(value) if callable(tags) else tags,
+        )
+        return value
+
+    def _wait_for(self, key: str) -> Optional[dict]:
+        """Poll the entry being computed by the worker holding lock:{key}."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(settings.CACHE_LOCK_POLL)
+            data = self.redis.get(key)
+            if data:
+                entry = json.loads(data)
+                if self.local is not None:
+                    self.local.set(key, entry)
+                return entry
+        return None
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Supprime les entrées marquées par au moins un des tags (SUNION puis
+        UNLINK en pipeline) et retourne leur nombre. Les clés sont retirées
+        des sets (SREM) plutôt que les sets supprimés : une entrée taguée
+        entre-temps reste invalidable.
+        """
+        tag_keys = [f"tag:{tag}" for tag in dict.fromkeys(tags)]
+        if not tag_keys:
+            return 0
+
+        keys = list(self.redis.sunion(tag_keys))
+        if not keys:
+            return 0
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.unlink(*keys)
+        for tag_key in tag_keys:
+            pipe.srem(tag_key, *keys)
+        self._invalidate_local(pipe, keys=keys)
+        return pipe.execute()[0]
+
+    def key(self, namespace: str, *parts) -> str:
+        """
+        Clé versionnée : {namespace}:v{génération}:{parts}.
+        Ex: key("rooms:hotel:42", cursor, limit) -> rooms:hotel:42:v7:<cursor>:10
+        """
+        return ":".join([namespace, f"v{self.generation(namespace)}", *(str(part) for part in parts)])
+
+    def generation(self, namespace: str) -> int:
+        """
+        Compteur gen:{namespace}, créé avec un TTL (CACHE_GENERATION_TTL) :
+        un namespace abandonné ne laisse aucune clé permanente, et un
+        compteur expiré repart au-delà des générations déjà utilisées.
+        """
+        if self.local is not None:
+            generation = self.local.get(f"gen:{namespace}")
+            if generation is not None:
+                return generation
+
+        generation = self.redis.get(f"gen:{namespace}")
+        if generation is None:
+            self.redis.set(f"gen:{namespace}", generation_seed(), nx=True, ex=settings.CACHE_GENERATION_TTL)
+            generation = self.redis.get(f"gen:{namespace}")
+
+        generation = int(generation)
+        if self.local is not None:
+            self.local.set(f"gen:{namespace}", generation)
+        return generation
+
+    def bump(self, *namespaces: str):
+        """
+        Invalide tout ce qui est en cache sous ces namespaces : un INCR
+        par namespace, en un seul aller-retour. Les anciennes entrées ne
+        sont plus jamais lues et expirent par TTL.
+        """
+        namespaces = list(dict.fromkeys(namespaces))
+        pipe = self.redis.pipeline(transaction=False)
+        for namespace in namespaces:
+            pipe.set(f"gen:{namespace}", generation_seed(), nx=True, ex=settings.CACHE_GENERATION_TTL)
+            pipe.incr(f"gen:{namespace}")
+        self._invalidate_local(pipe, keys=[f"gen:{namespace}" for namespace in namespaces])
+        pipe.execute()
 
     def delete(self, key: str):
-        self.redis.delete(key)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(key)
+        self._invalidate_local(pipe, keys=[key])
+        pipe.execute()
 
-    def invalidate_pattern(self, pattern: str):
+    def invalidate_pattern(self, pattern: str, budget: Optional[float] = None) -> int:
         """
-        Supprime toutes les clés correspondant au pattern
-        Ex: hotels:*
+        Supprime les clés correspondant au pattern (ex: hotels:*) et
+        retourne leur nombre.
+
+        SCAN incrémental au lieu de KEYS : Redis reste disponible pour les
+        autres clients entre deux pages. Les clés trouvées sont supprimées
+        par UNLINK (mémoire libérée en arrière-plan), envoyées en pipeline
+        par lots de CACHE_UNLINK_BATCH. Arrêt après `budget` secondes
+        (CACHE_INVALIDATION_BUDGET) : le reste expire par TTL.
         """
-        keys = self.redis.keys(pattern)
-        if keys:
-            self.redis.delete(*keys)
+        deadline = time.monotonic() + (settings.CACHE_INVALIDATION_BUDGET if budget is None else budget)
+        pipe = self.redis.pipeline(transaction=False)
+        if self._invalidate_local(pipe, patterns=[pattern]):
+            pipe.execute()
+        queued = removed = 0
+        cursor = 0
+
+        while True:
+            cursor, keys = self.redis.scan(cursor, match=pattern, count=self.scan_count)
+            if keys:
+                pipe.unlink(*keys)
+                queued += len(keys)
+
+            done = cursor == 0 or time.monotonic() >= deadline
+            if queued and (done or queued >= self.unlink_batch):
+                removed += sum(pipe.execute())
+                queued = 0
+
+            if done:
+                return removed
+
+    def _invalidate_local(self, pipe, keys=(), patterns=()) -> bool:
+        """
+        Vide ces entrées du L1 de ce worker et queue leur publication pour
+        les autres workers dans le pipeline. False si le L1 est désactivé.
+        """
+        if self.local is None:
+            return False
+
+        self.local.invalidate(keys, patterns)
+        pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, json.dumps({"keys": list(keys), "patterns": list(patterns)}))
+        return True
+
+    def stats(self) -> dict:
+        """Compteurs hit / miss / éviction du L1 (None si désactivé) et du L2 de ce worker."""
+        return {
+            "l1": self.local.as_dict() if self.local is not None else None,
+            "l2": {
+                **L2_STATS.as_dict(),
+                # Évictions côté serveur Redis (toutes clés confondues)
+                "evictions": self.redis.info("stats").get("evicted_keys"),
+            },
+        }
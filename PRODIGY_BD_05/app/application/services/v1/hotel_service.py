@@ -5,12 +5,16 @@ from app.api.v1.schemas.hotel_schema import HotelCreate, HotelResponse, HotelUpd
 from app.infrastructure.repositories.hotel_repository import HotelRepository
 from app.domain.models.hotels import Hotel
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+from app.infrastructure.indexes.hotel_search_index import get_hotel_search_index, tokenize
 
 class HotelService:
     def __init__(self, repo: HotelRepository, cache: CacheService):
         self.repo = repo
         self.cache = cache
+        self.search_index = get_hotel_search_index()
 
     def create(self, owner_id, data: HotelCreate):
         hotel = Hotel(
@@ -20,12 +24,14 @@ class HotelService:
             owner_id=uuid.UUID(owner_id)
         )
 
-        # Invalidation
-        self.cache.invalidate_pattern("hotels:*")
+        hotel = self.repo.create(hotel)
 
-        return self.repo.create(hotel)
+        # Invalidation : listes et recherches d'hôtels
+        self.cache.bump("hotels")
+        self.search_index.upsert(hotel.id, hotel.name, hotel.description, hotel.address)
+        return hotel
 
-    def update(self, hotel_id: str, owner_id: str, data: HotelUpdate):
+    def update(self, hotel_id: str, owner_id: str, data: HotelUpdate, expected_version: int | None = None):
         hotel = self.repo.get_by_id(uuid.UUID(hotel_id))
 
         if not hotel:
@@ -34,30 +40,47 @@ class HotelService:
         if str(hotel.owner_id) != owner_id:
             raise HTTPException(status_code=403, detail="Not your hotel")
 
+        if expected_version is not None and hotel.version != expected_version:
+            raise HTTPException(status_code=412, detail="Hotel has been modified, reload it and retry")
+
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(hotel, field, value)
 
-        # Invalidation
-        self.cache.invalidate_pattern("hotels:*")
-
-        return self.repo.update(hotel)
-
-    def list_all(self):
-        cache_key = "hotels:all"
-
-        cached = self.cache.get(cache_key)
-        if cached:
-            return cached
-
-        hotels = self.repo.get_all()
-
-        serialized_cache_response = [
-            HotelResponse.model_validate(h).model_dump()
-            for h in hotels
-        ]
-
-        self.cache.set(cache_key, serialized_cache_response)
-        return hotels
+        try:
+            hotel = self.repo.update(hotel)
+        except StaleDataError:
+            raise HTTPException(status_code=409, detail="Hotel was modified concurrently, reload it and retry")
+
+        # Invalidation : le nom de l'hôtel figure aussi dans la disponibilité par hôtel
+        self.cache.bump("hotels")
+        self.cache.invalidate_tags(f"hotel:{hotel.id}")
+        self.search_index.upsert(hotel.id, hotel.name, hotel.description, hotel.address)
+        return hotel
+
+    def search(self, query: str, cursor: str | None = None, limit: int = settings.POSTS_PER_PAGE):
+        # Clé normalisée : "Abidjan  Pool" et "pool abidjan" partagent le cache
+        cache_key = self.cache.key("hotels", "search", " ".join(sorted(set(tokenize(query)))), cursor or "", limit)
+
+        def load():
+            hotels, next_cursor = self.repo.search_page(query, cursor, limit)
+            return {
+                "items": [HotelResponse.model_validate(h).model_dump() for h in hotels],
+                "next_cursor": next_cursor,
+            }
+
+        return self.cache.get_or_set(cache_key, load)
+
+    def list_all(self, cursor: str | None = None, limit: int = settings.POSTS_PER_PAGE):
+        cache_key = self.cache.key("hotels", "all", cursor or "", limit)
+
+        def load():
+            hotels, next_cursor = self.repo.get_page(cursor, limit)
+            return {
+                "items": [HotelResponse.model_validate(h).model_dump() for h in hotels],
+                "next_cursor": next_cursor,
+            }
+
+        return self.cache.get_or_set(cache_key, load)
     
     def list_by_owner(self, owner_id):
         return self.repo.get_by_owner(owner_id)
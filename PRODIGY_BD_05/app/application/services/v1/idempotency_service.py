@@ -0,0 +1,111 @@
+import hashlib
+import json
+import time
+import uuid
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.exceptions import raise_exception
+from app.core.redis import get_redis, release_lock
+
+
+class IdempotencyService:
+    """
+    Replay the stored response of a request retried with the same
+    Idempotency-Key header instead of executing it again.
+
+    Keys are scoped by endpoint and user. The first request takes a
+    short-lived lock (SET NX, with a random token so that it only ever
+    releases its own lock), runs, and stores its response (success or
+    4xx error) with a TTL. Retries cost a single Redis GET. A duplicate
+    arriving while the first one is still running waits for its result
+    instead of running in parallel. 5xx errors (e.g. 503 "Room is busy,
+    please retry") are transient: they are not stored, so the retry runs
+    again.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+        self.ttl = settings.IDEMPOTENCY_TTL
+        self.lock_ttl = settings.IDEMPOTENCY_LOCK_TTL
+        self.wait_timeout = settings.IDEMPOTENCY_WAIT_TIMEOUT
+
+    def run(
+        self,
+        scope: str,
+        user_id: str,
+        key: str | None,
+        payload: BaseModel,
+        execute: Callable[[], BaseModel],
+        response: Response | None = None,
+    ) -> Any:
+        if key is None:
+            return execute()
+
+        if not key or len(key) > 255:
+            raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+        result_key = f"idempotency:{scope}:{user_id}:{key}"
+        lock_key = f"{result_key}:lock"
+        fingerprint = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+        token = uuid.uuid4().hex
+
+        stored = self._acquire(result_key, lock_key, token)
+        if stored is not None:
+            return self._replay(json.loads(stored), fingerprint, response)
+
+        try:
+            result = execute()
+        except HTTPException as exc:
+            # Erreur transitoire (5xx) : pas rejouée, la prochaine tentative s'exécute
+            if exc.status_code < 500:
+                self._store(result_key, {"fingerprint": fingerprint, "status_code": exc.status_code, "error": exc.detail})
+            raise
+        else:
+            self._store(result_key, {"fingerprint": fingerprint, "status_code": 200, "body": result.model_dump(mode="json")})
+            return result
+        finally:
+            # Requête plus longue que IDEMPOTENCY_LOCK_TTL : le verrou peut appartenir à un doublon
+            release_lock(lock_key, token)
+
+    def _acquire(self, result_key: str, lock_key: str, token: str):
+        """
+        Return the stored result, or None once this request holds the lock
+        and must run. While another request holds it, poll for its result
+        (or for the lock to be released without one, after a 5xx).
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            stored = self.redis.get(result_key)
+            if stored is not None:
+                return stored
+
+            if self.redis.set(lock_key, token, nx=True, ex=self.lock_ttl):
+                # Le premier a pu stocker son résultat et rendre le verrou entre le GET et le SET NX
+                stored = self.redis.get(result_key)
+                if stored is not None:
+                    release_lock(lock_key, token)
+                return stored
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            time.sleep(0.05)
+
+    def _store(self, result_key: str, record: dict):
+        self.redis.setex(result_key, self.ttl, json.dumps(jsonable_encoder(record)))
+
+    def _replay(self, record: dict, fingerprint: str, response: Response | None):
+        if record["fingerprint"] != fingerprint:
+            raise_exception(422, "Idempotency-Key already used with a different payload")
+
+        if response is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+
+        if "error" in record:
+            raise HTTPException(status_code=record["status_code"], detail=record["error"])
+        return record["body"]
@@ -1,11 +1,99 @@
+import operator
 import uuid
+from datetime import date, timedelta
+from functools import reduce
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi import HTTPException, status
 from app.domain.models.rooms import Room
 from app.infrastructure.repositories.room_repository import RoomRepository
 from app.infrastructure.repositories.hotel_repository import HotelRepository
-from app.api.v1.schemas.room_schema import RoomCreate, RoomResponse, RoomUpdate
-from app.application.services.v1.cache_service import CacheService
+from app.api.v1.schemas.room_schema import RoomCreate, RoomResponse, RoomSearchFilters, RoomSort, RoomUpdate
+from app.application.services.v1.cache_service import CacheService, night_tags
+from app.core.config import settings
+from app.infrastructure.indexes.availability_index import month_range, to_date
+
+
+def parse_month(month: str | None):
+    """Parse a YYYY-MM query parameter (current month by default)."""
+    if month is None:
+        today = date.today()
+        return today.year, today.month
+
+    try:
+        year, month_number = (int(part) for part in month.split("-"))
+        month_range(year, month_number)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month, expected YYYY-MM")
+
+    return year, month_number
+
+
+def parse_id(value: str, detail: str) -> uuid.UUID:
+    """Parse a path id, 404 (detail) when it is not a UUID."""
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=detail)
+
+
+def search_filters_key(filters: RoomSearchFilters | None):
+    """Cache key fragment of the search filters (empty when none are set)."""
+    if filters is None:
+        return ""
+
+    values = filters.model_dump(mode="json", exclude_none=True)
+    return ":".join(f"{field}={values[field]}" for field in sorted(values))
+
+
+def cheapest_combination(rooms, party_size: int):
+    """
+    Cheapest set of rooms hosting at least party_size guests, or None.
+
+    0/1 knapsack with the capacity capped at party_size: best[c] is the
+    cheapest (price, room indexes) reaching c guests. O(len(rooms) * party_size).
+    """
+    best = [None] * (party_size + 1)
+    best[0] = (0.0, ())
+
+    for i, room in enumerate(rooms):
+        if room.capacity <= 0:
+            continue
+
+        # Parcours décroissant : chaque chambre n'est utilisée qu'une fois
+        for guests in range(party_size, -1, -1):
+            if best[guests] is None:
+                continue
+
+            target = min(party_size, guests + room.capacity)
+            price = best[guests][0] + room.price_per_night
+            if best[target] is None or price < best[target][0]:
+                best[target] = (price, best[guests][1] + (i,))
+
+    if best[party_size] is None:
+        return None
+
+    price, indexes = best[party_size]
+    return price, [rooms[i] for i in indexes]
+
+
+def room_tags(rooms) -> list[str]:
+    """Tags room:{id} of serialized rooms (RoomResponse dumps)."""
+    return [f"room:{room['id']}" for room in rooms]
+
+
+def validate_search_filters(filters: RoomSearchFilters | None):
+    if filters is None:
+        return
+
+    if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+        raise HTTPException(status_code=400, detail="Invalid price range")
+
+
+def check_version(room: Room, expected_version: int | None):
+    """412 when the If-Match version is not the current one."""
+    if expected_version is not None and room.version != expected_version:
+        raise HTTPException(status_code=412, detail="Room has been modified, reload it and retry")
 
 
 class RoomService:
@@ -31,12 +119,11 @@ class RoomService:
             capacity=data.capacity,
         )
 
-        # Invalidation
-        self.cache.invalidate_pattern("rooms:*")
+        room = self.room_repo.create(room)
+        self._invalidate(room.id, room.hotel_id)
+        return room
 
-        return self.room_repo.create(room)
-
-    def update(self, room_id: str, owner_id: str, data: RoomUpdate):
+    def update(self, room_id: str, owner_id: str, data: RoomUpdate, expected_version: int | None = None):
         room = self.room_repo.get_by_id(uuid.UUID(room_id))
 
         if not room:
@@ -45,13 +132,12 @@ class RoomService:
         if str(room.hotel.owner_id) != owner_id:
             raise HTTPException(status_code=403, detail="Not your room")
 
+        check_version(room, expected_version)
+
         for field, value in data.model_dump(exclude_unset=True).items():
             setattr(room, field, value)
 
-        # Invalidation
-        self.cache.invalidate_pattern("rooms:*")
-
-        return self.room_repo.update(room)
+        return self._save(room)
 
     def delete(self, room_id: str, owner_id: str):
         room = self.room_repo.get_by_id(uuid.UUID(room_id))
@@ -62,52 +148,43 @@ class RoomService:
         if str(room.hotel.owner_id) != owner_id:
             raise HTTPException(status_code=403, detail="Not your room")
 
-        # Invalidation
-        self.cache.invalidate_pattern("rooms:*")
-
+        room_id, hotel_id = room.id, room.hotel_id
         self.room_repo.delete(room)
 
-    def list_available(self):
-        cache_key = "rooms:available"
+        # Seules les recherches qui listaient la chambre ou son hôtel changent
+        self.cache.invalidate_tags(f"room:{room_id}", f"hotel:{hotel_id}")
+        self._invalidate(room_id, hotel_id, searches=False)
 
-        cached = self.cache.get(cache_key)
-        if cached:
-            return cached
+    def list_available(self, cursor: str | None = None, limit: int = settings.POSTS_PER_PAGE):
+        cache_key = self.cache.key("rooms:available", cursor or "", limit)
 
-        rooms = self.room_repo.get_all_available_rooms()
+        def load():
+            rooms, next_cursor = self.room_repo.get_available_rooms_page(cursor, limit)
+            return {
+                "items": [RoomResponse.model_validate(r).model_dump() for r in rooms],
+                "next_cursor": next_cursor,
+            }
 
-        serialized_cache_response = [
-            RoomResponse.model_validate(r).model_dump()
-            for r in rooms
-        ]
-
-        self.cache.set(cache_key, serialized_cache_response)
+        return self.cache.get_or_set(cache_key, load)
 
-        return rooms
 
+    def list_by_hotel(self, hotel_id: str, cursor: str | None = None, limit: int = settings.POSTS_PER_PAGE):
+        hotel_uuid = parse_id(hotel_id, "Hotel not found")
+        cache_key = self.cache.key(f"rooms:hotel:{hotel_uuid}", cursor or "", limit)
 
-    def list_by_hotel(self, hotel_id: str):
-        cache_key = f"rooms:hotel:{hotel_id}"
+        def load():
+            rooms, next_cursor = self.room_repo.get_rooms_page_by_hotel_id(hotel_uuid, cursor, limit)
+            return {
+                "items": [RoomResponse.model_validate(r).model_dump() for r in rooms],
+                "next_cursor": next_cursor,
+            }
 
-        cached = self.cache.get(cache_key)
-        if cached:
-            return cached
-
-        rooms = self.room_repo.get_all_rooms_by_hotel_id(uuid.UUID(hotel_id))
-
-        serialized_cache_response = [
-            RoomResponse.model_validate(r).model_dump()
-            for r in rooms
-        ]
-
-        self.cache.set(cache_key, serialized_cache_response)
-
-        return rooms
+        return self.cache.get_or_set(cache_key, load)
 
     def get_by_id(self, room_id: str):
         return self.room_repo.get_by_id(uuid.UUID(room_id))
     
-    def toggle_availability(self, room_id: str, owner_id: str):
+    def toggle_availability(self, room_id: str, owner_id: str, expected_version: int | None = None):
         room = self.room_repo.get_by_id(uuid.UUID(room_id))
 
         if not room:
@@ -116,31 +193,265 @@ class RoomService:
         if str(room.hotel.owner_id) != owner_id:
             raise HTTPException(status_code=403, detail="Not your room")
 
+        check_version(room, expected_version)
+
         room.is_available = not room.is_available
-        
-        # Invalidation
-        self.cache.invalidate_pattern("rooms:*")
 
-        return self.room_repo.update(room)
+        return self._save(room)
+
+    def _save(self, room):
+        try:
+            room = self.room_repo.update(room)
+        except StaleDataError:
+            raise HTTPException(status_code=409, detail="Room was modified concurrently, reload it and retry")
+
+        self._invalidate(room.id, room.hotel_id)
+        return room
+
+    def _invalidate(self, room_id, hotel_id, searches: bool = True):
+        """
+        Bump the generations a change of the room affects: listings,
+        calendars and, unless searches=False, every date search (a new
+        price or availability can bring the room into any of them).
+        """
+        self.cache.bump(
+            "rooms:available",
+            f"rooms:hotel:{hotel_id}",
+            f"rooms:hotel:{hotel_id}:calendar",
+            f"rooms:calendar:{room_id}",
+            *(["rooms:search"] if searches else []),
+        )
+
+
+    def list_available_by_date(
+        self,
+        check_in,
+        check_out,
+        filters: RoomSearchFilters | None = None,
+        cursor: str | None = None,
+        limit: int = settings.POSTS_PER_PAGE,
+    ):
+        if check_in >= check_out:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        validate_search_filters(filters)
+
+        cache_key = self.cache.key("rooms:search", check_in, check_out, search_filters_key(filters), cursor or "", limit)
+
+        def load():
+            rooms, next_cursor = self.room_repo.get_available_by_date_page(check_in, check_out, filters, cursor, limit)
+            return {
+                "items": [RoomResponse.model_validate(r).model_dump() for r in rooms],
+                "next_cursor": next_cursor,
+            }
 
+        # TTL plus court ; invalidée par les réservations sur ces nuits
+        return self.cache.get_or_set(
+            cache_key,
+            load,
+            ttl=60,
+            tags=lambda page: night_tags(check_in, check_out) + room_tags(page["items"]),
+        )
 
-    def list_available_by_date(self, check_in, check_out):
+    def list_top_available_by_date(self, check_in, check_out, k: int, order: RoomSort = RoomSort.PRICE):
         if check_in >= check_out:
             raise HTTPException(status_code=400, detail="Invalid date range")
 
-        cache_key = f"rooms:search:{check_in}:{check_out}"
+        cache_key = self.cache.key("rooms:search", "top", check_in, check_out, order.value, k)
 
-        cached = self.cache.get(cache_key)
-        if cached:
-            return cached
+        def load():
+            return [
+                RoomResponse.model_validate(r).model_dump()
+                for r in self.room_repo.get_top_available_by_date(check_in, check_out, k, order)
+            ]
 
-        rooms = self.room_repo.get_available_by_date(check_in, check_out)
+        return self.cache.get_or_set(
+            cache_key,
+            load,
+            ttl=60,
+            tags=lambda rooms: night_tags(check_in, check_out) + room_tags(rooms),
+        )
 
-        serialized_cache_response = [
-            RoomResponse.model_validate(r).model_dump()
-            for r in rooms
+    def search_group(self, check_in, check_out, party_size: int, limit: int = settings.POSTS_PER_PAGE):
+        """
+        Hotels able to host party_size guests across their free rooms, with
+        the cheapest room combination, cheapest hotels first.
+        """
+        if check_in >= check_out:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        cache_key = self.cache.key("rooms:search", "group", check_in, check_out, party_size, limit)
+
+        def load():
+            hotels = {
+                row.hotel_id: row
+                for row in self.room_repo.get_free_capacity_by_hotel(check_in, check_out, party_size)
+            }
+
+            rooms_by_hotel = {}
+            for room in self.room_repo.get_free_rooms_by_hotel_ids(list(hotels), check_in, check_out):
+                rooms_by_hotel.setdefault(room.hotel_id, []).append(room)
+
+            results = []
+            for hotel_id, rooms in rooms_by_hotel.items():
+                combination = cheapest_combination(rooms, party_size)
+                if combination is None:
+                    continue
+
+                price, chosen = combination
+                results.append({
+                    "hotel_id": hotel_id,
+                    "free_capacity": hotels[hotel_id].free_capacity,
+                    "free_rooms": hotels[hotel_id].free_rooms,
+                    "price_per_night": price,
+                    "rooms": [RoomResponse.model_validate(r).model_dump() for r in chosen],
+                })
+
+            results.sort(key=lambda result: result["price_per_night"])
+            return results[:limit]
+
+        return self.cache.get_or_set(
+            cache_key,
+            load,
+            ttl=60,
+            tags=lambda results: night_tags(check_in, check_out) + [f"hotel:{result['hotel_id']}" for result in results],
+        )
+
+    def availability_by_hotel(self, check_in, check_out):
+        if check_in >= check_out:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        # Namespace des recherches : même invalidation
+        cache_key = self.cache.key("rooms:search", "availability", check_in, check_out)
+
+        def load():
+            return [
+                {
+                    "hotel_id": row.hotel_id,
+                    "name": row.name,
+                    "free_rooms": row.free_rooms,
+                    "min_price": row.min_price,
+                    "max_price": row.max_price,
+                }
+                for row in self.room_repo.get_availability_summary_by_hotel(check_in, check_out)
+            ]
+
+        return self.cache.get_or_set(
+            cache_key,
+            load,
+            ttl=60,
+            tags=lambda rows: night_tags(check_in, check_out) + [f"hotel:{row['hotel_id']}" for row in rows],
+        )
+
+    def list_available_by_date_flex(
+        self,
+        check_in,
+        check_out,
+        flex_days: int,
+        filters: RoomSearchFilters | None = None,
+        cursor: str | None = None,
+        limit: int = settings.POSTS_PER_PAGE,
+    ):
+        """
+        Search every window shifted by -flex_days..+flex_days days (same
+        length of stay) in a single pass, at most `limit` rooms per window.
+        Not paginated: a cursor is rejected.
+        """
+        if check_in >= check_out:
+            raise HTTPException(status_code=400, detail="Invalid date range")
+
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="cursor is not supported with flex_days")
+
+        validate_search_filters(filters)
+
+        check_in, check_out = to_date(check_in), to_date(check_out)
+        cache_key = self.cache.key("rooms:search", check_in, check_out, "flex", flex_days, search_filters_key(filters), limit)
+
+        windows = [
+            (check_in + timedelta(days=shift), check_out + timedelta(days=shift))
+            for shift in range(-flex_days, flex_days + 1)
         ]
 
-        self.cache.set(cache_key, serialized_cache_response, ttl=60)  # TTL plus court
+        def load():
+            rooms_by_window = self.room_repo.get_available_by_date_windows(windows, filters, limit)
+            return [
+                {
+                    "check_in": window_check_in,
+                    "check_out": window_check_out,
+                    "rooms": [RoomResponse.model_validate(r).model_dump() for r in rooms],
+                }
+                for (window_check_in, window_check_out), rooms in zip(windows, rooms_by_window)
+            ]
+
+        return self.cache.get_or_set(
+            cache_key,
+            load,
+            ttl=60,
+            tags=lambda results: (
+                night_tags(windows[0][0], windows[-1][1]) + [tag for result in results for tag in room_tags(result["rooms"])]
+            ),
+        )
 
-        return rooms
\ No newline at end of file
+    def get_calendar(self, room_id: str, month: str | None = None):
+        room_uuid = parse_id(room_id, "Room not found")
+        year, month_number = parse_month(month)
+        cache_key = self.cache.key(f"rooms:calendar:{room_uuid}", f"{year:04d}-{month_number:02d}")
+
+        def load():
+            room = self.room_repo.get_by_id(room_uuid)
+
+            if not room:
+                raise HTTPException(status_code=404, detail="Room not found")
+
+            bitmap = self.room_repo.get_month_bitmaps([room.id], year, month_number)[room.id]
+            first_night, nights = month_range(year, month_number)
+
+            return {
+                "room_id": room.id,
+                "month": f"{year:04d}-{month_number:02d}",
+                "bitmap": bitmap,
+                "days": [
+                    {"date": first_night + timedelta(days=i), "booked": bool(bitmap >> i & 1)}
+                    for i in range(nights)
+                ],
+            }
+
+        return self.cache.get_or_set(cache_key, load, ttl=60)
+
+    def get_hotel_calendar(self, hotel_id: str, month: str | None = None):
+        hotel_uuid = parse_id(hotel_id, "Hotel not found")
+        year, month_number = parse_month(month)
+        cache_key = self.cache.key(f"rooms:hotel:{hotel_uuid}:calendar", f"{year:04d}-{month_number:02d}")
+
+        def load():
+            hotel = self.hotel_repo.get_by_id(hotel_uuid)
+
+            if not hotel:
+                raise HTTPException(status_code=404, detail="Hotel not found")
+
+            room_ids = self.room_repo.get_room_ids_by_hotel_id(hotel.id)
+            bitmaps = list(self.room_repo.get_month_bitmaps(room_ids, year, month_number).values())
+
+            # Une seule passe : OR = au moins une chambre réservée, AND = hôtel complet
+            any_booked = reduce(operator.or_, bitmaps, 0)
+            fully_booked = reduce(operator.and_, bitmaps) if bitmaps else 0
+            first_night, nights = month_range(year, month_number)
+
+            return {
+                "hotel_id": hotel.id,
+                "month": f"{year:04d}-{month_number:02d}",
+                "rooms": len(room_ids),
+                "any_booked": any_booked,
+                "fully_booked": fully_booked,
+                "days": [
+                    {
+                        "date": first_night + timedelta(days=i),
+                        "any_booked": bool(any_booked >> i & 1),
+                        "fully_booked": bool(fully_booked >> i & 1),
+                    }
+                    for i in range(nights)
+                ],
+            }
+
+        return self.cache.get_or_set(cache_key, load, ttl=60)
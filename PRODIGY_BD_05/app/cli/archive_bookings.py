@@ -0,0 +1,63 @@
+"""
+Move the bookings whose stay is over to the bookings_archive table.
+
+Usage:
+    python -m app.cli.archive_bookings [--before YYYY-MM-DD] [--batch-size 1000]
+
+Meant for a daily cron. The default cutoff is today minus
+BOOKING_ARCHIVE_RETENTION_DAYS: the hot bookings table (and its overlap
+index) stays proportional to current and future stays. Archived bookings
+remain readable through GET /v1/bookings/me and GET /v1/bookings/{id}.
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infrastructure.repositories.booking_repository import BookingRepository
+
+
+def archive_bookings(db: Session, before: date, batch_size: int = settings.BOOKING_ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Archive every booking checked out before `before`, batch_size
+    bookings per transaction. Returns the number of bookings archived.
+    """
+    repo = BookingRepository(db)
+    archived = 0
+
+    while True:
+        moved = repo.archive_before(before, batch_size)
+        if not moved:
+            return archived
+        archived += moved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move past bookings to the bookings_archive table.")
+    parser.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        default=date.today() - timedelta(days=settings.BOOKING_ARCHIVE_RETENTION_DAYS),
+        help="archive the stays checked out before this date (YYYY-MM-DD)",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.BOOKING_ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.before > date.today():
+        parser.error("--before cannot be in the future")
+
+    from app.infrastructure.database.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        archived = archive_bookings(db, args.before, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{archived} booking(s) archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Backfill the room_nights inventory from the existing confirmed bookings.
+
+Usage:
+    python -m app.cli.backfill_room_nights [--batch-size 500]
+
+Safe to run several times: bookings that already have their nights are
+skipped. A booking whose nights are already taken by another booking
+(double booking made before the room_nights table existed) is reported
+and left without nights.
+"""
+
+import argparse
+
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.domain.models.booking import Booking, BookingStatus
+from app.domain.models.room_nights import RoomNight
+from app.infrastructure.repositories.booking_repository import BookingRepository
+
+
+def backfill_room_nights(db: Session, batch_size: int = 500):
+    """
+    Insert the missing nights of every confirmed booking, batch_size
+    bookings per transaction (keyset on the booking id).
+
+    Returns (backfilled_booking_ids, conflicting_booking_ids).
+    """
+    repo = BookingRepository(db)
+    backfilled, conflicts = [], []
+    last_id = None
+
+    while True:
+        query = db.query(Booking).filter(
+            Booking.status == BookingStatus.CONFIRMED,
+            ~exists().where(RoomNight.booking_id == Booking.id),
+        )
+        if last_id is not None:
+            query = query.filter(Booking.id > last_id)
+
+        bookings = query.order_by(Booking.id).limit(batch_size).all()
+        if not bookings:
+            return backfilled, conflicts
+
+        for booking in bookings:
+            try:
+                with db.begin_nested():
+                    db.add_all(repo.nights_of(booking))
+                backfilled.append(booking.id)
+            except IntegrityError:
+                conflicts.append(booking.id)
+
+        db.commit()
+        last_id = bookings[-1].id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill the room_nights table from the confirmed bookings.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from app.infrastructure.database.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        backfilled, conflicts = backfill_room_nights(db, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"{len(backfilled)} booking(s) backfilled")
+    for booking_id in conflicts:
+        print(f"conflict: booking {booking_id} overlaps nights already booked")
+
+
+if __name__ == "__main__":
+    main()
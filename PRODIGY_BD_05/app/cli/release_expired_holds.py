@@ -0,0 +1,34 @@
+"""
+Release the lapsed booking holds.
+
+Usage:
+    python -m app.cli.release_expired_holds
+
+The API also runs this sweep every BOOKING_HOLD_SWEEP_INTERVAL seconds;
+the command is for deployments that disable it and use cron instead.
+"""
+
+from app.application.services.v1.booking_service import BookingService
+from app.application.services.v1.cache_service import CacheService
+from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.repositories.room_repository import RoomRepository
+
+
+def release_expired_holds():
+    """One sweep with its own session. Returns the released booking ids."""
+    db = SessionLocal()
+    try:
+        service = BookingService(BookingRepository(db), RoomRepository(db), CacheService())
+        return service.release_expired_holds()
+    finally:
+        db.close()
+
+
+def main():
+    released = release_expired_holds()
+    print(f"{len(released)} hold(s) released")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,5 +25,57 @@ class Settings:
     REDIS_DB: int = int(os.environ.get("REDIS_DB", 0))
     REDIS_CACHE_EXPIRE: int = 120  # seconds
 
+    # Invalidation par SCAN (jamais KEYS) : les clés restantes après le budget expirent par TTL
+    CACHE_SCAN_COUNT: int = 1000  # clés examinées par appel SCAN
+    CACHE_UNLINK_BATCH: int = 5000  # clés supprimées par aller-retour (pipeline UNLINK)
+    CACHE_INVALIDATION_BUDGET: float = float(os.environ.get("CACHE_INVALIDATION_BUDGET", 0.25))  # seconds
+
+    # Sets tag:{tag} de l'invalidation par tags
+    CACHE_TAG_TTL: int = 600  # seconds, >= au plus long TTL du cache : le set survit à ses clés
+    CACHE_TAG_PRUNE_EVERY: int = 1000  # membres ajoutés entre deux purges des clés expirées (SSCAN)
+    CACHE_GENERATION_TTL: int = 86400  # seconds, compteurs gen:{namespace}, > au plus long TTL du cache
+
+    # Cache L1 en mémoire par worker devant Redis (LRU), invalidé par pub/sub
+    CACHE_L1_ENABLED: bool = os.environ.get("CACHE_L1_ENABLED", "false").lower() == "true"
+    CACHE_L1_MAX_SIZE: int = int(os.environ.get("CACHE_L1_MAX_SIZE", 1000))  # entrées
+    CACHE_L1_TTL: float = float(os.environ.get("CACHE_L1_TTL", 5))  # seconds, borne de fraîcheur
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+
+    # Anti-stampede (CacheService.get_or_set) : un seul recalcul par clé
+    CACHE_LOCK_TTL: int = 10  # seconds, durée max d'un recalcul (verrou Redis lock:{key})
+    CACHE_LOCK_WAIT: float = 2  # seconds, attente de la valeur calculée par un autre worker
+    CACHE_LOCK_POLL: float = 0.05  # seconds, intervalle de polling pendant cette attente
+    CACHE_XFETCH_BETA: float = float(os.environ.get("CACHE_XFETCH_BETA", 1.0))  # > 1 : rafraîchit plus tôt
+
+    # Réservations groupées (tour-opérateurs)
+    BOOKING_BATCH_MAX_SIZE: int = 50
+
+    # Holds (réservation temporaire pendant le paiement)
+    BOOKING_HOLD_TTL: int = int(os.environ.get("BOOKING_HOLD_TTL", 600))  # seconds
+    BOOKING_HOLD_SWEEP_INTERVAL: int = int(os.environ.get("BOOKING_HOLD_SWEEP_INTERVAL", 30))  # seconds, 0 = off
+
+    # Pipeline asynchrone : réservation atomique, confirmation et invalidation par le worker
+    BOOKING_ASYNC_MODE: bool = os.environ.get("BOOKING_ASYNC_MODE", "false").lower() == "true"
+    BOOKING_WORKER_IN_PROCESS: bool = os.environ.get("BOOKING_WORKER_IN_PROCESS", "true").lower() == "true"
+    # Job perdu (crash du worker, erreur après BLPOP, RPUSH échoué) : remis en file après N secondes en "pending"
+    BOOKING_PENDING_REQUEUE_AFTER: int = int(os.environ.get("BOOKING_PENDING_REQUEUE_AFTER", 60))  # seconds
+    BOOKING_QUEUE_MARKER_TTL: int = 3600  # seconds, marqueur "déjà en file" d'une réservation
+
+    # Archivage : les séjours terminés depuis plus de N jours quittent la table chaude
+    BOOKING_ARCHIVE_RETENTION_DAYS: int = int(os.environ.get("BOOKING_ARCHIVE_RETENTION_DAYS", 30))
+    BOOKING_ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Idempotency-Key (réponses rejouées depuis Redis)
+    IDEMPOTENCY_TTL: int = int(os.environ.get("IDEMPOTENCY_TTL", 86400))  # seconds
+    IDEMPOTENCY_LOCK_TTL: int = 30  # seconds, durée max d'une requête en cours
+    IDEMPOTENCY_WAIT_TIMEOUT: int = 10  # seconds, attente d'un doublon concurrent
+
+    # Availability index (en mémoire, par worker) : un seul processus uvicorn uniquement,
+    # les écritures des autres workers ne lui parviennent pas
+    AVAILABILITY_INDEX_ENABLED: bool = os.environ.get("AVAILABILITY_INDEX_ENABLED", "false").lower() == "true"
+
+    # Index de recherche plein texte des hôtels (en mémoire, par worker) : un seul processus uvicorn uniquement
+    HOTEL_SEARCH_INDEX_ENABLED: bool = os.environ.get("HOTEL_SEARCH_INDEX_ENABLED", "false").lower() == "true"
+
 
 settings = Settings()
\ No newline at end of file
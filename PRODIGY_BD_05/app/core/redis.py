@@ -1,6 +1,14 @@
 from redis import Redis
 from app.core.config import settings
 
+# Libère un verrou seulement s'il porte encore notre jeton (compare-and-delete atomique)
+RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 class RedisClient:
     _instance = None
@@ -19,3 +27,11 @@ class RedisClient:
 
 def get_redis():
     return RedisClient.get_instance()
+
+
+def release_lock(lock_key: str, token: str) -> bool:
+    """
+    Delete lock_key if it still holds token. A lock that expired and was
+    taken by another process meanwhile is left alone.
+    """
+    return bool(get_redis().eval(RELEASE_LOCK, 1, lock_key, token))
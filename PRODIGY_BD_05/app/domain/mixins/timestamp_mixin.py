@@ -1,6 +1,15 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, DateTime
 from sqlalchemy.sql import func
 
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
 class TimeStamp:
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Valeur Python (précision microseconde) pour un ordre (created_at, id)
+    # stable en pagination ; server_default reste pour les insertions SQL brutes.
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
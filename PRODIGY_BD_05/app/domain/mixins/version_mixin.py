@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer
+from sqlalchemy.orm import declared_attr
+
+
+class Versioned:
+    # Verrouillage optimiste : chaque UPDATE vérifie et incrémente la version
+    # (UPDATE ... WHERE id = :id AND version = :lue), sans bloquer les lectures.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version}
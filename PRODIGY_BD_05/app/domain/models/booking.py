@@ -1,14 +1,51 @@
 import uuid
-from sqlalchemy import Column, Date, DateTime, ForeignKey, String
+from enum import Enum
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, bindparam, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.domain.mixins.timestamp_mixin import TimeStamp
 from app.infrastructure.database.base import Base
+from app.infrastructure.database.types import CodedEnum
+
+
+class BookingStatus(str, Enum):
+    CANCELLED = "cancelled"
+    CONFIRMED = "confirmed"
+    PENDING = "pending"
+    HELD = "held"
+    EXPIRED = "expired"
+
+
+# Codes SMALLINT stockés en base (ne jamais renuméroter : données existantes)
+BOOKING_STATUS_CODES = {
+    BookingStatus.CANCELLED: 0,
+    BookingStatus.CONFIRMED: 1,
+    BookingStatus.PENDING: 2,
+    BookingStatus.HELD: 3,
+    BookingStatus.EXPIRED: 4,
+}
+
+# Statuts qui occupent des nuits : seuls ces rows entrent dans l'index partiel
+OCCUPYING_STATUSES = (BookingStatus.CONFIRMED, BookingStatus.PENDING, BookingStatus.HELD)
+OCCUPYING_STATUS_SQL = "status IN (1, 2, 3)"
 
 class Booking(Base, TimeStamp):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Test de chevauchement : égalité sur room_id puis plage sur les dates,
+        # index partiel : les réservations annulées / expirées n'y entrent jamais
+        Index(
+            "ix_bookings_room_dates_occupying",
+            "room_id",
+            "check_in_date",
+            "check_out_date",
+            sqlite_where=text(OCCUPYING_STATUS_SQL),
+            postgresql_where=text(OCCUPYING_STATUS_SQL),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -17,8 +54,17 @@ class Booking(Base, TimeStamp):
 
     check_in_date = Column(Date, nullable=False)
     check_out_date = Column(Date, nullable=False)
-    status = Column(String, default="confirmed")  # confirmed | cancelled
+    status = Column(CodedEnum(BookingStatus, BOOKING_STATUS_CODES), nullable=False, default=BookingStatus.CONFIRMED)
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # fin du hold, None sinon
 
 
     user = relationship("User")
-    room = relationship("Room", back_populates="bookings")
\ No newline at end of file
+    room = relationship("Room", back_populates="bookings")
+
+    @classmethod
+    def occupying_status(cls):
+        """
+        status IN (1, 2, 3) rendered with literal codes (not bound
+        parameters) so the planner can match the partial index predicate.
+        """
+        return cls.status.in_(bindparam("occupying_statuses", OCCUPYING_STATUSES, expanding=True, literal_execute=True, unique=True))
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.domain.models.booking import BOOKING_STATUS_CODES, BookingStatus
+from app.infrastructure.database.base import Base
+from app.infrastructure.database.types import CodedEnum
+
+
+class BookingArchive(Base):
+    """
+    Bookings whose stay ended before the archival cutoff.
+
+    Same columns as bookings (rows are moved as-is by
+    BookingRepository.archive_before) plus archived_at. Nothing writes
+    here except the archival job: the hot bookings table only keeps
+    current and future stays.
+    """
+    __tablename__ = "bookings_archive"
+    __table_args__ = (
+        # Historique d'un utilisateur, du plus récent au plus ancien
+        Index("ix_bookings_archive_user_check_in", "user_id", "check_in_date"),
+    )
+
+    archived = True
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    room_id = Column(UUID(as_uuid=True), ForeignKey("rooms.id"), nullable=False)
+
+    check_in_date = Column(Date, nullable=False)
+    check_out_date = Column(Date, nullable=False)
+    status = Column(CodedEnum(BookingStatus, BOOKING_STATUS_CODES), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
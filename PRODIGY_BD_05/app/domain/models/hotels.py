@@ -1,22 +1,71 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, String, DateTime, ForeignKey, Text, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.domain.mixins.timestamp_mixin import TimeStamp
+from app.domain.mixins.version_mixin import Versioned
 from app.infrastructure.database.base import Base
+from app.infrastructure.indexes.hotel_search_index import FIELD_WEIGHTS, tokenize
 
-class Hotel(Base, TimeStamp):
+class Hotel(Base, TimeStamp, Versioned):
     __tablename__ = "hotels"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(String)
     address = Column(String, nullable=False)
+    # Tokens pliés (minuscules, sans accents) de name / description / address,
+    # indexés plein texte sous PostgreSQL (SEARCH_VECTOR_SQL)
+    search_text = Column(Text, nullable=True)
 
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
     
     owner = relationship("User", backref="hotels")
     rooms = relationship("Room", back_populates="hotel", cascade="all, delete")
+
+
+def search_text_of(hotel) -> str:
+    return " ".join(tokenize(" ".join(filter(None, (hotel.name, hotel.description, hotel.address)))))
+
+
+@event.listens_for(Hotel, "before_insert")
+@event.listens_for(Hotel, "before_update")
+def _refresh_search_text(mapper, connection, hotel):
+    hotel.search_text = search_text_of(hotel)
+
+
+# Index plein texte de la recherche d'hôtels (HotelRepository.search_page)
+#
+# SQLite : table FTS5 hotels_fts (accents pliés par le tokenizer), tenue à
+# jour par des triggers sur hotels. Colonnes classées par bm25 avec les
+# poids FIELD_WEIGHTS.
+HOTELS_FTS = "hotels_fts"
+HOTELS_FTS_COLUMNS = ("name", "description", "address")
+HOTELS_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE {HOTELS_FTS} USING fts5("
+    f"hotel_id UNINDEXED, {', '.join(HOTELS_FTS_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {HOTELS_FTS}_insert AFTER INSERT ON hotels BEGIN "
+    f"INSERT INTO {HOTELS_FTS} (hotel_id, name, description, address) VALUES (new.id, new.name, new.description, new.address); "
+    "END",
+    f"CREATE TRIGGER {HOTELS_FTS}_update AFTER UPDATE OF name, description, address ON hotels BEGIN "
+    f"DELETE FROM {HOTELS_FTS} WHERE hotel_id = old.id; "
+    f"INSERT INTO {HOTELS_FTS} (hotel_id, name, description, address) VALUES (new.id, new.name, new.description, new.address); "
+    "END",
+    f"CREATE TRIGGER {HOTELS_FTS}_delete AFTER DELETE ON hotels BEGIN "
+    f"DELETE FROM {HOTELS_FTS} WHERE hotel_id = old.id; "
+    "END",
+)
+HOTELS_FTS_WEIGHTS = tuple(FIELD_WEIGHTS[column] for column in HOTELS_FTS_COLUMNS)
+
+# PostgreSQL : index GIN sur le tsvector de search_text (déjà plié en Python),
+# la requête doit reprendre exactement cette expression pour l'utiliser
+SEARCH_VECTOR_SQL = "to_tsvector('simple', coalesce(search_text, ''))"
+SEARCH_VECTOR_INDEX_DDL = f"CREATE INDEX ix_hotels_search_vector ON hotels USING gin ({SEARCH_VECTOR_SQL})"
+
+for statement in HOTELS_FTS_DDL:
+    event.listen(Hotel.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Hotel.__table__, "after_drop", DDL(f"DROP TABLE IF EXISTS {HOTELS_FTS}").execute_if(dialect="sqlite"))
+event.listen(Hotel.__table__, "after_create", DDL(SEARCH_VECTOR_INDEX_DDL).execute_if(dialect="postgresql"))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.infrastructure.database.base import Base
+
+
+def nights_between(check_in, check_out):
+    """Nights of a stay: check_in included, check_out excluded."""
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+
+class RoomNight(Base):
+    """
+    One row per booked night of a room.
+
+    The primary key (room_id, night) is the uniqueness constraint: the
+    database itself rejects two bookings sharing a night of the same room.
+
+    Nights of a hold carry its expiry: once expires_at is past they no
+    longer count as booked, and are deleted when the hold is released.
+    """
+    __tablename__ = "room_nights"
+
+    room_id = Column(UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    night = Column(Date, primary_key=True)
+
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
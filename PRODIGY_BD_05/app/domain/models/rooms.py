@@ -1,14 +1,21 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.domain.mixins.timestamp_mixin import TimeStamp
+from app.domain.mixins.version_mixin import Versioned
 from app.infrastructure.database.base import Base
 
-class Room(Base, TimeStamp):
+class Room(Base, TimeStamp, Versioned):
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Recherche : filtres capacité / prix sur les chambres disponibles
+        Index("ix_rooms_available_capacity_price", "is_available", "capacity", "price_per_night"),
+        Index("ix_rooms_available_price", "is_available", "price_per_night"),
+        Index("ix_rooms_hotel_available", "hotel_id", "is_available"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     hotel_id = Column(UUID(as_uuid=True), ForeignKey("hotels.id"), nullable=False)
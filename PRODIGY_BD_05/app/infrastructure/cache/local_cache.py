@@ -0,0 +1,104 @@
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class TierStats:
+    """Hit / miss counters of a cache tier, shared by the threads of the worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class LocalCache:
+    """
+    In-process L1 cache in front of Redis: LRU bounded by max_size
+    entries, every entry valid ttl seconds at most.
+
+    Values are kept decoded (no Redis round trip, no json.loads on a hit)
+    and shared between requests: callers must not mutate them.
+
+    Invalidations made by this worker apply at once; the ones made by the
+    other workers arrive through Redis pub/sub (see CacheService). The TTL
+    bounds the staleness even if a message is lost.
+    """
+
+    _instance = None
+
+    def __init__(self, max_size: int = settings.CACHE_L1_MAX_SIZE, ttl: float = settings.CACHE_L1_TTL):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value), du moins au plus récemment utilisé
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = TierStats()
+        self.evictions = 0
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.stats.record(False)
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.record(True)
+            return entry[1]
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys=(), patterns=()):
+        """Drop the given keys and the keys matching the glob patterns."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            for pattern in patterns:
+                for key in [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def as_dict(self):
+        return {
+            **self.stats.as_dict(),
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+        }
+
+
+def get_local_cache():
+    return LocalCache.get_instance()
@@ -0,0 +1,99 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values) -> str:
+    """Opaque cursor: url-safe base64 of the JSON sort key of the last row."""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by) -> list:
+    return decode_values(cursor, [lambda value, column=column: _parse_value(column, value) for column in order_by])
+
+
+def decode_values(cursor: str, parsers) -> list:
+    """Decode a cursor made of len(parsers) values, each one parsed by its parser."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_value(column, value):
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def cursor_for(row, order_by) -> str:
+    return encode_cursor([getattr(row, column.key) for column in order_by])
+
+
+def keyset_after(order_by, values):
+    """
+    (c1, c2, ...) > (v1, v2, ...) written as OR/AND so it works on every
+    backend: c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...
+    """
+    column, value = order_by[0], values[0]
+    if len(order_by) == 1:
+        return column > value
+
+    return or_(
+        column > value,
+        and_(column == value, keyset_after(order_by[1:], values[1:])),
+    )
+
+
+def keyset_before(order_by, values):
+    """Descending counterpart of keyset_after: (c1, c2, ...) < (v1, v2, ...)."""
+    column, value = order_by[0], values[0]
+    if len(order_by) == 1:
+        return column < value
+
+    return or_(
+        column < value,
+        and_(column == value, keyset_before(order_by[1:], values[1:])),
+    )
+
+
+def after_cursor(query, order_by, cursor: str | None):
+    """Order the query by order_by and skip the rows up to the cursor."""
+    if cursor:
+        query = query.filter(keyset_after(order_by, decode_cursor(cursor, order_by)))
+    return query.order_by(*order_by)
+
+
+def paginate(query, order_by, cursor: str | None, limit: int):
+    """
+    Keyset pagination on order_by (the last column must be unique, e.g. id).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = after_cursor(query, order_by, cursor).limit(limit + 1).all()
+    return page_of(rows, order_by, limit)
+
+
+def page_of(rows, order_by, limit: int):
+    """Cut the limit + 1 fetched rows down to a page and its next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, cursor_for(rows[-1], order_by)
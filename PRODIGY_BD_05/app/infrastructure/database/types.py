@@ -0,0 +1,35 @@
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedEnum(TypeDecorator):
+    """
+    Store a str Enum as a SMALLINT code (2 bytes instead of a string).
+
+    Accepts the enum members or their string values on the way in and
+    returns enum members on the way out.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class, codes: dict):
+        super().__init__()
+        self.enum_class = enum_class
+        # Tuple : les arguments du type entrent dans la clé du cache de compilation
+        self.codes = tuple(codes.items())
+        self._to_code = dict(codes)
+        self._to_member = {code: member for member, code in codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_code[self.enum_class(value)]
+
+    def process_literal_param(self, value, dialect):
+        return self.process_bind_param(value, dialect)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_member[value]
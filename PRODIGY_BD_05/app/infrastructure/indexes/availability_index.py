@@ -0,0 +1,238 @@
+import bisect
+import calendar
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+
+def to_date(value) -> date:
+    """Normalise a date/datetime query parameter to a plain date."""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite renvoie des datetimes naïfs (stockés en UTC)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def month_range(year: int, month: int):
+    """Return the first night of the month and its number of nights."""
+    return date(year, month, 1), calendar.monthrange(year, month)[1]
+
+
+def months_between(check_in: date, check_out: date):
+    """Yield the (year, month) pairs touched by the nights [check_in, check_out)."""
+    year, month = check_in.year, check_in.month
+    last = check_out - timedelta(days=1)
+    while (year, month) <= (last.year, last.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def occupancy_bitmap(intervals, first_night: date, nights: int) -> int:
+    """
+    Pack the booked nights of [first_night, first_night + nights) into an int.
+
+    Bit i is set when the night first_night + i is booked by one of the
+    (check_in, check_out) intervals.
+    """
+    bitmap = 0
+    end_night = first_night + timedelta(days=nights)
+    for check_in, check_out in intervals:
+        start = max(check_in, first_night)
+        end = min(check_out, end_night)
+        if start < end:
+            bitmap |= ((1 << (end - start).days) - 1) << (start - first_night).days
+    return bitmap
+
+
+class AvailabilityIndex:
+    """
+    In-memory index of the booked intervals of every room.
+
+    For each room the confirmed bookings are kept sorted by check-in date,
+    together with the running maximum of their check-out dates. Checking
+    whether a room is free between check_in and check_out is then a single
+    binary search (O(log n) per room) instead of a correlated anti-join
+    over the bookings table.
+
+    It also keeps a per-room occupancy bitmap for every month (one bit per
+    night), used by the calendar endpoints.
+
+    Holds are indexed with their expiry: a lapsed hold is dropped the next
+    time its room is read, so the index treats it as free like the SQL
+    path does, whether or not the sweeper released it yet.
+
+    The index is loaded once at startup and kept up to date by
+    BookingService. While it is not loaded, RoomRepository falls back to
+    the SQL query, which remains the reference implementation.
+
+    Note: the index lives in the worker process and only sees the writes
+    it handled itself. Its results are cached in the shared Redis, so a
+    stale index would serve wrong pages to every worker: enable it
+    (AVAILABILITY_INDEX_ENABLED, off by default) only when a single
+    uvicorn process handles every booking and cancellation.
+    """
+
+    _instance = None
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._intervals = {}  # room_id -> [(check_in, check_out, booking_id), ...] trié par check_in
+        self._starts = {}  # room_id -> [check_in, ...]
+        self._max_ends = {}  # room_id -> max(check_out) des intervalles [0..i]
+        self._room_by_booking = {}  # booking_id -> room_id
+        self._bitmaps = {}  # room_id -> {(year, month): bitmap}
+        self._hold_expiry = {}  # booking_id -> expires_at des holds
+        self._holds_by_room = {}  # room_id -> {booking_id des holds}
+        self.loaded = False
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def load(self, rows):
+        """
+        (Re)build the index from (booking_id, room_id, check_in, check_out,
+        expires_at) rows, expires_at being None except for holds.
+        """
+        with self._lock:
+            self._intervals = {}
+            self._room_by_booking = {}
+            self._hold_expiry = {}
+            self._holds_by_room = {}
+
+            for booking_id, room_id, check_in, check_out, expires_at in rows:
+                self._intervals.setdefault(room_id, []).append((check_in, check_out, booking_id))
+                self._room_by_booking[booking_id] = room_id
+                self._track_hold(booking_id, room_id, expires_at)
+
+            self._starts = {}
+            self._max_ends = {}
+            self._bitmaps = {}
+            for room_id, intervals in self._intervals.items():
+                intervals.sort()
+                self._reindex(room_id)
+                for check_in, check_out, _ in intervals:
+                    self._set_bits(room_id, check_in, check_out)
+
+            self.loaded = True
+
+    def add(self, booking_id, room_id, check_in, check_out, expires_at=None):
+        if not self.loaded:
+            return
+
+        with self._lock:
+            intervals = self._intervals.setdefault(room_id, [])
+            bisect.insort(intervals, (check_in, check_out, booking_id))
+            self._room_by_booking[booking_id] = room_id
+            self._track_hold(booking_id, room_id, expires_at)
+            self._reindex(room_id)
+            self._set_bits(room_id, check_in, check_out)
+
+    def remove(self, booking_id):
+        if not self.loaded:
+            return
+
+        with self._lock:
+            room_id = self._room_by_booking.pop(booking_id, None)
+            if room_id is None:
+                return
+
+            if self._hold_expiry.pop(booking_id, None) is not None:
+                self._holds_by_room[room_id].discard(booking_id)
+                if not self._holds_by_room[room_id]:
+                    del self._holds_by_room[room_id]
+
+            removed = [interval for interval in self._intervals[room_id] if interval[2] == booking_id]
+            self._intervals[room_id] = [
+                interval for interval in self._intervals[room_id]
+                if interval[2] != booking_id
+            ]
+            self._reindex(room_id)
+
+            # Les intervalles peuvent se chevaucher : on recalcule les mois touchés
+            for check_in, check_out, _ in removed:
+                for year, month in months_between(check_in, check_out):
+                    self._rebuild_month(room_id, year, month)
+
+    def is_free(self, room_id, check_in, check_out) -> bool:
+        """
+        A room is busy if an interval starts before check_out and ends
+        after check_in. Among the intervals starting before check_out,
+        only the largest check-out date matters.
+        """
+        check_in, check_out = to_date(check_in), to_date(check_out)
+
+        with self._lock:
+            self._drop_expired_holds(room_id)
+            starts = self._starts.get(room_id)
+            if not starts:
+                return True
+
+            i = bisect.bisect_left(starts, check_out) - 1
+            return i < 0 or self._max_ends[room_id][i] <= check_in
+
+    def month_bitmap(self, room_id, year: int, month: int) -> int:
+        with self._lock:
+            self._drop_expired_holds(room_id)
+            return self._bitmaps.get(room_id, {}).get((year, month), 0)
+
+    def _track_hold(self, booking_id, room_id, expires_at):
+        if expires_at is not None:
+            self._hold_expiry[booking_id] = as_utc(expires_at)
+            self._holds_by_room.setdefault(room_id, set()).add(booking_id)
+
+    def _drop_expired_holds(self, room_id):
+        holds = self._holds_by_room.get(room_id)
+        if not holds:
+            return
+
+        now = datetime.now(timezone.utc)
+        for booking_id in [booking_id for booking_id in holds if self._hold_expiry[booking_id] <= now]:
+            self.remove(booking_id)
+
+    def _set_bits(self, room_id, check_in, check_out):
+        months = self._bitmaps.setdefault(room_id, {})
+        for year, month in months_between(check_in, check_out):
+            first_night, nights = month_range(year, month)
+            months[(year, month)] = months.get((year, month), 0) | occupancy_bitmap(
+                [(check_in, check_out)], first_night, nights
+            )
+
+    def _rebuild_month(self, room_id, year, month):
+        first_night, nights = month_range(year, month)
+        bitmap = occupancy_bitmap(
+            [(check_in, check_out) for check_in, check_out, _ in self._intervals.get(room_id, [])],
+            first_night,
+            nights,
+        )
+        months = self._bitmaps.setdefault(room_id, {})
+        if bitmap:
+            months[(year, month)] = bitmap
+        else:
+            months.pop((year, month), None)
+
+    def _reindex(self, room_id):
+        intervals = self._intervals[room_id]
+        if not intervals:
+            del self._intervals[room_id]
+            self._starts.pop(room_id, None)
+            self._max_ends.pop(room_id, None)
+            return
+
+        self._starts[room_id] = [interval[0] for interval in intervals]
+
+        max_ends = []
+        current = None
+        for _, check_out, _ in intervals:
+            current = check_out if current is None or check_out > current else current
+            max_ends.append(current)
+        self._max_ends[room_id] = max_ends
+
+
+def get_availability_index():
+    return AvailabilityIndex.get_instance()
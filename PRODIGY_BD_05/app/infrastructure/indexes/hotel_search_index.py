@@ -0,0 +1,163 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Poids des champs : un terme dans le nom compte plus que dans la description
+FIELD_WEIGHTS = {"name": 3.0, "address": 2.0, "description": 1.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# BM25
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, accent-folded alphanumeric tokens ("Hôtel Plateau" -> hotel, plateau)."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return _TOKEN_RE.findall(folded)
+
+
+def document_terms(name, description, address) -> Counter:
+    """Field-weighted term frequencies of a hotel."""
+    terms = Counter()
+    for field, text in (("name", name), ("description", description), ("address", address)):
+        for token in tokenize(text):
+            terms[token] += FIELD_WEIGHTS[field]
+    return terms
+
+
+class HotelSearchIndex:
+    """
+    In-memory inverted index over the name, description and address of
+    the hotels.
+
+    Each token maps to the hotels containing it with a field-weighted
+    term frequency. A query is answered by walking the postings of its
+    tokens only (never the whole catalogue) and ranking the matches with
+    BM25: hotels matching more, rarer and better placed terms come first.
+
+    Like the availability index, it is loaded at startup, kept up to date
+    by HotelService and lives in the worker process: it does not see the
+    hotels written through other workers, and its results are cached in
+    the shared Redis. Enable it (HOTEL_SEARCH_INDEX_ENABLED, off by
+    default) only with a single uvicorn process. While it is not loaded,
+    HotelRepository queries the database full-text index instead (FTS5
+    on SQLite, tsvector + GIN on PostgreSQL, see
+    app.domain.models.hotels).
+    """
+
+    _instance = None
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}  # token -> {hotel_id: tf pondéré}
+        self._terms = {}  # hotel_id -> Counter des termes du document
+        self._lengths = {}  # hotel_id -> longueur pondérée du document
+        self._total_length = 0.0
+        self.loaded = False
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def load(self, rows):
+        """
+        (Re)build the index from (hotel_id, name, description, address) rows.
+        """
+        with self._lock:
+            self._postings = {}
+            self._terms = {}
+            self._lengths = {}
+            self._total_length = 0.0
+
+            for hotel_id, name, description, address in rows:
+                self._index(hotel_id, document_terms(name, description, address))
+
+            self.loaded = True
+
+    def upsert(self, hotel_id, name, description, address):
+        if not self.loaded:
+            return
+
+        with self._lock:
+            self._unindex(hotel_id)
+            self._index(hotel_id, document_terms(name, description, address))
+
+    def remove(self, hotel_id):
+        if not self.loaded:
+            return
+
+        with self._lock:
+            self._unindex(hotel_id)
+
+    def search(self, query: str, after=None, limit: int = 10):
+        """
+        Ranked (hotel_id, score) matches of the query, best first.
+
+        `after` is the (score, hotel_id) key of the last result of the
+        previous page (keyset on score desc, then id).
+        """
+        tokens = set(tokenize(query))
+
+        with self._lock:
+            documents = len(self._terms)
+            if not tokens or not documents:
+                return []
+
+            average_length = self._total_length / documents
+            scores = Counter()
+            for token in tokens:
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for hotel_id, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[hotel_id] / average_length)
+                    scores[hotel_id] += idf * tf * (K1 + 1) / (tf + norm)
+
+        ranked = sorted(((round(score, 6), hotel_id) for hotel_id, score in scores.items()), key=_rank_key)
+        if after is not None:
+            after_key = _rank_key(after)
+            ranked = [result for result in ranked if _rank_key(result) > after_key]
+
+        return [(hotel_id, score) for score, hotel_id in ranked[:limit]]
+
+    def _index(self, hotel_id, terms: Counter):
+        if not terms:
+            return
+
+        self._terms[hotel_id] = terms
+        length = sum(terms.values())
+        self._lengths[hotel_id] = length
+        self._total_length += length
+        for token, tf in terms.items():
+            self._postings.setdefault(token, {})[hotel_id] = tf
+
+    def _unindex(self, hotel_id):
+        terms = self._terms.pop(hotel_id, None)
+        if terms is None:
+            return
+
+        self._total_length -= self._lengths.pop(hotel_id)
+        for token in terms:
+            postings = self._postings[token]
+            postings.pop(hotel_id, None)
+            if not postings:
+                del self._postings[token]
+
+
+def _rank_key(result):
+    score, hotel_id = result
+    return -score, str(hotel_id)
+
+
+def get_hotel_search_index():
+    return HotelSearchIndex.get_instance()
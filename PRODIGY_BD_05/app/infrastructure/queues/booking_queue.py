@@ -0,0 +1,70 @@
+import json
+import uuid
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+QUEUE_KEY = "queue:bookings"
+QUEUED_KEY = "queue:bookings:queued:{booking_id}"
+
+# Marqueur "déjà en file" et RPUSH atomiques : un seul job par réservation
+ENQUEUE_ONCE = """
+if redis.call("set", KEYS[2], "1", "NX", "EX", ARGV[2]) then
+    return redis.call("rpush", KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+class BookingQueue:
+    """
+    Redis list of the pending bookings whose side effects (confirmation,
+    cache invalidation) are left to the booking worker.
+
+    RPUSH on the API side, BLPOP / LPOP on the worker side: FIFO, and a
+    job is handed to a single worker.
+
+    A booking has at most one job in the queue: enqueue sets a marker
+    key with the push, and pop clears it. Re-queueing a booking whose job
+    is still waiting is a no-op, so repeated sweeps (from every API
+    process) never grow the queue. The marker expires after
+    BOOKING_QUEUE_MARKER_TTL in case a worker died between the pop and
+    its deletion.
+    """
+
+    def __init__(self):
+        self.redis = get_redis()
+
+    def enqueue(self, booking_id) -> bool:
+        """Queue a job for the booking. False if one is already queued."""
+        return bool(self.redis.eval(
+            ENQUEUE_ONCE,
+            2,
+            QUEUE_KEY,
+            QUEUED_KEY.format(booking_id=booking_id),
+            json.dumps({"booking_id": str(booking_id)}),
+            settings.BOOKING_QUEUE_MARKER_TTL,
+        ))
+
+    def pop(self, timeout: int = 0):
+        """
+        Next booking id, or None when the queue is empty. With a timeout,
+        waits up to `timeout` seconds for a job (BLPOP).
+        """
+        if timeout:
+            item = self.redis.blpop(QUEUE_KEY, timeout=timeout)
+            raw = item[1] if item else None
+        else:
+            raw = self.redis.lpop(QUEUE_KEY)
+
+        if raw is None:
+            return None
+
+        booking_id = uuid.UUID(json.loads(raw)["booking_id"])
+        # Job sorti de la file : la réservation peut de nouveau être mise en file
+        self.redis.delete(QUEUED_KEY.format(booking_id=booking_id))
+        return booking_id
+
+
+def get_booking_queue():
+    return BookingQueue()
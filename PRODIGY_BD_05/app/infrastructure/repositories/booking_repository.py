@@ -1,8 +1,30 @@
 import uuid
+from datetime import date
 
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, insert, literal, or_, select, union_all, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from app.domain.models.booking import Booking
+from app.domain.mixins.timestamp_mixin import utcnow
+from app.domain.models.booking import Booking, BookingStatus
+from app.domain.models.booking_archive import BookingArchive
+from app.domain.models.room_nights import RoomNight, nights_between
+from app.domain.models.rooms import Room
+from app.infrastructure.database.pagination import decode_values, keyset_before, page_of
+
+# Colonnes copiées telles quelles de bookings vers bookings_archive
+ARCHIVED_COLUMNS = (
+    "id", "user_id", "room_id", "check_in_date", "check_out_date",
+    "status", "expires_at", "created_at", "updated_at",
+)
+
+
+def occupying(now):
+    """Bookings that hold their nights: confirmed, pending, and holds not yet expired."""
+    return and_(
+        Booking.occupying_status(),
+        or_(Booking.expires_at.is_(None), Booking.expires_at > now),
+    )
+
 
 class BookingRepository:
     def __init__(self, db : Session):
@@ -11,29 +33,287 @@ class BookingRepository:
     def get_booking_by_id(self, booking_id: str):
         return self.db.query(Booking).filter(Booking.id == uuid.UUID(booking_id)).first()
 
-    def has_conflict(self, room_id, check_in, check_out):
-        return self.db.query(Booking).filter(
+    def get_archived_by_id(self, booking_id: str):
+        return self.db.query(BookingArchive).filter(BookingArchive.id == uuid.UUID(booking_id)).first()
+
+    def has_conflict(self, room_id, check_in, check_out) -> bool:
+        """
+        True if a confirmed booking or a live hold of the room overlaps
+        [check_in, check_out).
+
+        Single EXISTS (SELECT 1 ... LIMIT 1) probe on the partial
+        ix_bookings_room_dates_occupying index.
+        """
+        return self.db.query(self.conflict_probe(room_id, check_in, check_out).exists()).scalar()
+
+    def conflict_probe(self, room_id, check_in, check_out):
+        return self.db.query(literal(1)).filter(
             Booking.room_id == room_id,
-            or_(
-                and_(
-                    Booking.check_in_date <= check_in,
-                    Booking.check_out_date > check_in,
-                    Booking.status == "confirmed"
-                ),
+            occupying(utcnow()),
+            Booking.check_in_date < check_out,
+            Booking.check_out_date > check_in,
+        ).limit(1)
+
+    def get_occupied_intervals(self):
+        """(booking_id, room_id, check_in, check_out, expires_at) of the confirmed bookings and live holds."""
+        return self.db.query(
+            Booking.id,
+            Booking.room_id,
+            Booking.check_in_date,
+            Booking.check_out_date,
+            Booking.expires_at,
+        ).filter(occupying(utcnow())).all()
+
+    def create(self, booking: Booking):
+        """
+        Insert the booking and its room nights in one transaction.
+
+        Raises IntegrityError (after rollback) when one of the nights is
+        already taken: the (room_id, night) key rejects double bookings.
+        OperationalError (lock timeout) is re-raised after rollback too.
+        """
+        try:
+            self.db.add(booking)
+            self.db.flush()
+            self.db.add_all(self.nights_of(booking))
+            self.db.commit()
+        except (IntegrityError, OperationalError):
+            self.db.rollback()
+            raise
+
+        self.db.refresh(booking)
+        return booking
+
+    def create_many(self, bookings: list[Booking]):
+        """
+        Insert several bookings and their room nights in one transaction:
+        all of them or none (IntegrityError / OperationalError after rollback).
+        """
+        try:
+            self.db.add_all(bookings)
+            self.db.flush()
+            self.db.add_all([night for booking in bookings for night in self.nights_of(booking)])
+            self.db.commit()
+        except (IntegrityError, OperationalError):
+            self.db.rollback()
+            raise
+
+        # Un seul SELECT recharge toutes les réservations expirées par le commit
+        self.db.query(Booking).filter(Booking.id.in_([booking.id for booking in bookings])).all()
+        return bookings
+
+    def get_conflicts(self, stays):
+        """
+        Confirmed bookings and live holds overlapping any of the
+        (room_id, check_in, check_out) stays, in one query (one index probe
+        per stay).
+
+        Returns (room_id, check_in_date, check_out_date) rows.
+        """
+        if not stays:
+            return []
+
+        return self.db.query(
+            Booking.room_id,
+            Booking.check_in_date,
+            Booking.check_out_date,
+        ).filter(
+            occupying(utcnow()),
+            or_(*[
                 and_(
+                    Booking.room_id == room_id,
                     Booking.check_in_date < check_out,
-                    Booking.check_out_date >= check_out,
-                    Booking.status == "confirmed"
+                    Booking.check_out_date > check_in,
                 )
-            )
-        ).first()
+                for room_id, check_in, check_out in stays
+            ]),
+        ).all()
 
-    def create(self, booking: Booking):
-        self.db.add(booking)
+    def get_owner_id(self, booking_id: uuid.UUID):
+        """user_id of the booking, None if it does not exist."""
+        return self.db.query(Booking.user_id).filter(Booking.id == booking_id).scalar()
+
+    def cancel_owned(self, booking_id: uuid.UUID, user_id: uuid.UUID):
+        """
+        Cancel the booking if it belongs to user_id and still holds its
+        nights (confirmed, pending or held), and release them, without
+        loading it: one UPDATE ... RETURNING plus the nights DELETE, in one
+        transaction.
+
+        Returns the cancelled booking row (with its room's hotel_id), or
+        None when nothing matched (unknown booking, someone else's, or
+        already cancelled / expired).
+        Backends without UPDATE ... RETURNING fall back to UPDATE then SELECT.
+        """
+        columns = [
+            *(getattr(Booking, column) for column in ARCHIVED_COLUMNS),
+            select(Room.hotel_id).where(Room.id == Booking.room_id).scalar_subquery().label("hotel_id"),
+        ]
+        statement = update(Booking).where(
+            Booking.id == booking_id,
+            Booking.user_id == user_id,
+            Booking.occupying_status(),
+        ).values(status=BookingStatus.CANCELLED).execution_options(synchronize_session=False)
+
+        if self.db.get_bind().dialect.update_returning:
+            row = self.db.execute(statement.returning(*columns)).first()
+        elif self.db.execute(statement).rowcount:
+            row = self.db.execute(select(*columns).where(Booking.id == booking_id)).first()
+        else:
+            row = None
+
+        if row is None:
+            self.db.rollback()
+            return None
+
+        self.db.query(RoomNight).filter(RoomNight.booking_id == booking_id).delete(synchronize_session=False)
+        self.db.commit()
+        return row
+
+    def get_stays_of(self, booking_ids):
+        """(room_id, hotel_id, check_in_date, check_out_date) of the bookings."""
+        return self.db.query(
+            Booking.room_id,
+            Room.hotel_id,
+            Booking.check_in_date,
+            Booking.check_out_date,
+        ).join(Room, Room.id == Booking.room_id).filter(Booking.id.in_(booking_ids)).all()
+
+    def confirm_hold(self, booking: Booking, now):
+        """
+        Turn a live hold into a confirmed booking in a single conditional
+        UPDATE (still held, not expired at `now`): a hold released
+        meanwhile by the sweeper can never be confirmed without its
+        nights. Its nights are already reserved: only the expiry is
+        cleared, no conflict is possible.
+
+        Returns the booking, or None (after rollback) if the hold is gone.
+        """
+        updated = self.db.query(Booking).filter(
+            Booking.id == booking.id,
+            Booking.status == BookingStatus.HELD,
+            Booking.expires_at > now,
+        ).update(
+            {Booking.status: BookingStatus.CONFIRMED, Booking.expires_at: None},
+            synchronize_session=False,
+        )
+        if updated != 1:
+            self.db.rollback()
+            return None
+
+        self.db.query(RoomNight).filter(RoomNight.booking_id == booking.id).update(
+            {RoomNight.expires_at: None},
+            synchronize_session=False,
+        )
         self.db.commit()
         self.db.refresh(booking)
         return booking
 
+    def confirm_pending(self, booking_id) -> bool:
+        """
+        pending -> confirmed in a single conditional UPDATE. False if the
+        booking is no longer pending (e.g. cancelled meanwhile).
+        """
+        updated = self.db.query(Booking).filter(
+            Booking.id == booking_id,
+            Booking.status == BookingStatus.PENDING,
+        ).update({Booking.status: BookingStatus.CONFIRMED}, synchronize_session=False)
+        self.db.commit()
+        return updated == 1
+
+    def get_stale_pending(self, before):
+        """Ids of the bookings still pending since before (their queued job was lost)."""
+        return [
+            booking_id
+            for (booking_id,) in self.db.query(Booking.id).filter(
+                Booking.status == BookingStatus.PENDING,
+                Booking.created_at <= before,
+            )
+        ]
+
+    def release_expired_holds(self, now, room_ids=None):
+        """
+        Mark the holds expired at `now` (of room_ids, or all) as expired and
+        delete their nights. Not committed: the caller's transaction does.
+
+        Returns the ids of the released holds.
+        """
+        query = self.db.query(Booking.id).filter(Booking.status == BookingStatus.HELD, Booking.expires_at <= now)
+        if room_ids is not None:
+            query = query.filter(Booking.room_id.in_(room_ids))
+
+        booking_ids = [booking_id for (booking_id,) in query.all()]
+        if booking_ids:
+            self.db.query(RoomNight).filter(RoomNight.booking_id.in_(booking_ids)).delete(synchronize_session=False)
+            self.db.query(Booking).filter(Booking.id.in_(booking_ids)).update(
+                {Booking.status: BookingStatus.EXPIRED},
+                synchronize_session=False,
+            )
+        return booking_ids
+
+    def sweep_expired_holds(self, now):
+        booking_ids = self.release_expired_holds(now)
+        self.db.commit()
+        return booking_ids
+
+    def archive_before(self, cutoff: date, batch_size: int) -> int:
+        """
+        Move up to batch_size bookings whose stay ended before cutoff to
+        bookings_archive (INSERT ... SELECT then DELETE, one transaction).
+        Their nights are past and deleted with them.
+
+        Returns the number of bookings moved, 0 once nothing is left.
+        """
+        booking_ids = [
+            booking_id
+            for (booking_id,) in self.db.query(Booking.id).filter(Booking.check_out_date < cutoff).limit(batch_size)
+        ]
+        if not booking_ids:
+            return 0
+
+        self.db.execute(insert(BookingArchive).from_select(
+            ARCHIVED_COLUMNS,
+            select(*(getattr(Booking, column) for column in ARCHIVED_COLUMNS)).where(Booking.id.in_(booking_ids)),
+        ))
+        self.db.query(RoomNight).filter(RoomNight.booking_id.in_(booking_ids)).delete(synchronize_session=False)
+        self.db.query(Booking).filter(Booking.id.in_(booking_ids)).delete(synchronize_session=False)
+        self.db.commit()
+        return len(booking_ids)
+
+    def get_history_page(self, user_id: uuid.UUID, cursor: str | None, limit: int):
+        """
+        Bookings of the user, current and archived, latest stay first:
+        UNION ALL of bookings and bookings_archive, keyset on
+        (check_in_date, id) descending.
+
+        Returns (rows, next_cursor); rows carry an `archived` flag.
+        """
+        columns = ARCHIVED_COLUMNS[:-1]
+        history = union_all(
+            select(
+                *(getattr(Booking, column) for column in columns),
+                literal(False).label("archived"),
+            ).where(Booking.user_id == user_id),
+            select(
+                *(getattr(BookingArchive, column) for column in columns),
+                literal(True).label("archived"),
+            ).where(BookingArchive.user_id == user_id),
+        ).subquery("history")
+
+        order_by = [history.c.check_in_date, history.c.id]
+        query = self.db.query(history)
+        if cursor:
+            query = query.filter(keyset_before(order_by, decode_values(cursor, [date.fromisoformat, uuid.UUID])))
+
+        rows = query.order_by(*(column.desc() for column in order_by)).limit(limit + 1).all()
+        return page_of(rows, order_by, limit)
+
+    def nights_of(self, booking: Booking):
+        return [
+            RoomNight(room_id=booking.room_id, night=night, booking_id=booking.id, expires_at=booking.expires_at)
+            for night in nights_between(booking.check_in_date, booking.check_out_date)
+        ]
+
     def update(self, booking: Booking):
         self.db.add(booking)
         self.db.commit()
@@ -1,9 +1,25 @@
-from app.domain.models.hotels import Hotel
+import uuid
+
+from sqlalchemy import Float, column, func, literal_column, or_, select, table
+from sqlalchemy.dialects.postgresql import UUID
+from app.domain.models.hotels import HOTELS_FTS, HOTELS_FTS_WEIGHTS, SEARCH_VECTOR_SQL, Hotel
+from app.infrastructure.database.pagination import decode_values, encode_cursor, paginate
+from app.infrastructure.indexes.hotel_search_index import (
+    HotelSearchIndex,
+    get_hotel_search_index,
+    tokenize,
+)
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+# Table FTS5 (SQLite) créée avec hotels, voir app.domain.models.hotels
+hotels_fts = table(HOTELS_FTS, column("hotel_id", UUID(as_uuid=True)))
+
 
 class HotelRepository:
     def __init__(self, db : Session):
         self.db = db
+        self.search_index = get_hotel_search_index()
 
     def create(self, hotel: Hotel):
         self.db.add(hotel)
@@ -17,6 +33,104 @@ class HotelRepository:
     def get_all(self):
         return self.db.query(Hotel).all()
 
+    def get_page(self, cursor: str | None, limit: int):
+        return paginate(self.db.query(Hotel), [Hotel.created_at, Hotel.id], cursor, limit)
+
+    def get_search_documents(self):
+        """(id, name, description, address) of every hotel, to load the search index."""
+        return self.db.query(Hotel.id, Hotel.name, Hotel.description, Hotel.address).all()
+
+    def search_page(self, query: str, cursor: str | None, limit: int):
+        """
+        One page of the hotels matching the query, best match first.
+
+        Returns (hotels, next_cursor). Uses the search index when it is
+        loaded (cursor: (score, id) of the last hotel), otherwise the
+        database full-text index (_search_matches, cursor: (rank, id)).
+        """
+        if self.search_index.loaded:
+            return self._search_index_page(query, cursor, limit)
+        if not tokenize(query):
+            return [], None
+
+        matches = self._search_matches(query)
+        if matches is None:
+            return self._search_index_page(query, cursor, limit, self._search_candidates(query))
+
+        order_by = [matches.c.rank, matches.c.hotel_id]
+        rows, next_cursor = paginate(self.db.query(matches), order_by, cursor, limit)
+        hotels = {hotel.id: hotel for hotel in self.get_by_ids([row.hotel_id for row in rows])}
+        return [hotels[row.hotel_id] for row in rows if row.hotel_id in hotels], next_cursor
+
+    def _search_matches(self, query: str):
+        """
+        Subquery (hotel_id, rank) of the hotels containing one of the
+        tokens, lower rank first, answered by the full-text index:
+
+        - SQLite: MATCH on the FTS5 table hotels_fts, rank = bm25 with the
+          FIELD_WEIGHTS of name / description / address;
+        - PostgreSQL: @@ on the GIN-indexed tsvector of search_text,
+          rank = -ts_rank.
+
+        None on other backends.
+        """
+        tokens = sorted(set(tokenize(query)))
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            matches = select(
+                hotels_fts.c.hotel_id,
+                func.bm25(literal_column(HOTELS_FTS), 0.0, *HOTELS_FTS_WEIGHTS, type_=Float).label("rank"),
+            ).where(literal_column(HOTELS_FTS).match(" OR ".join(f'"{token}"' for token in tokens)))
+        elif dialect == "postgresql":
+            vector = literal_column(SEARCH_VECTOR_SQL)
+            tsquery = func.to_tsquery(literal_column("'simple'"), " | ".join(tokens))
+            matches = select(
+                Hotel.id.label("hotel_id"),
+                (-func.ts_rank(vector, tsquery, type_=Float)).label("rank"),
+            ).where(vector.op("@@")(tsquery))
+        else:
+            return None
+
+        return matches.subquery("matches")
+
+    def _search_index_page(self, query: str, cursor: str | None, limit: int, candidates=None):
+        """
+        Page ranked by the search index, or on backends without full-text
+        index by a throwaway index of the candidates (LIKE on search_text).
+        """
+        after = decode_values(cursor, [float, uuid.UUID]) if cursor else None
+
+        index = self.search_index
+        if candidates is not None:
+            index = HotelSearchIndex()
+            index.load(candidates)
+
+        results = index.search(query, after, limit + 1)
+        hotels = {hotel.id: hotel for hotel in self.get_by_ids([hotel_id for hotel_id, _ in results])}
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            hotel_id, score = results[-1]
+            next_cursor = encode_cursor([score, str(hotel_id)])
+
+        return [hotels[hotel_id] for hotel_id, _ in results if hotel_id in hotels], next_cursor
+
+    def _search_candidates(self, query: str):
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        return self.db.query(Hotel.id, Hotel.name, Hotel.description, Hotel.address).filter(or_(*[
+            Hotel.search_text.contains(token, autoescape=True)
+            for token in tokens
+        ])).all()
+
+    def get_by_ids(self, hotel_ids):
+        if not hotel_ids:
+            return []
+        return self.db.query(Hotel).filter(Hotel.id.in_(hotel_ids)).all()
+
     def get_by_id(self, hotel_id):
         return self.db.query(Hotel).filter(Hotel.id == hotel_id).first()
     
@@ -25,7 +139,12 @@ class HotelRepository:
     #     db.commit()
 
     def update(self, hotel: Hotel):
-        self.db.add(hotel)
-        self.db.commit()
+        """Raises StaleDataError (after rollback) if the hotel changed since it was read."""
+        try:
+            self.db.add(hotel)
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise
         self.db.refresh(hotel)
         return hotel
\ No newline at end of file
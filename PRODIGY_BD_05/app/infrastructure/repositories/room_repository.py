@@ -1,12 +1,25 @@
-from sqlalchemy import and_
-from app.domain.models.booking import Booking
+from datetime import timedelta
+
+from sqlalchemy import and_, exists, func, or_
+from app.api.v1.schemas.room_schema import RoomSearchFilters, RoomSort
+from app.domain.mixins.timestamp_mixin import utcnow
+from app.domain.models.hotels import Hotel
+from app.domain.models.room_nights import RoomNight, nights_between
 from app.domain.models.rooms import Room
+from app.infrastructure.database.pagination import after_cursor, page_of, paginate
+from app.infrastructure.indexes.availability_index import (
+    get_availability_index,
+    month_range,
+    to_date,
+)
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 
 class RoomRepository:
     def __init__(self, db : Session):
         self.db = db
+        self.availability = get_availability_index()
 
     def create(self, room: Room):
         self.db.add(room)
@@ -15,8 +28,13 @@ class RoomRepository:
         return room
     
     def update(self, room: Room):
-        self.db.add(room)
-        self.db.commit()
+        """Raises StaleDataError (after rollback) if the room changed since it was read."""
+        try:
+            self.db.add(room)
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise
         self.db.refresh(room)
         return room
     
@@ -27,11 +45,48 @@ class RoomRepository:
     def get_all_available_rooms(self):
         return self.db.query(Room).filter(Room.is_available == True).all()
 
+    def get_available_rooms_page(self, cursor: str | None, limit: int):
+        return paginate(
+            self.db.query(Room).filter(Room.is_available == True),
+            [Room.created_at, Room.id],
+            cursor,
+            limit,
+        )
+
     def get_by_id(self, room_id):
         return self.db.query(Room).filter(Room.id == room_id).first()
+
+    def get_by_id_for_update(self, room_id):
+        """
+        Get the room and lock its row (SELECT ... FOR UPDATE) until the
+        end of the transaction, so bookings of the same room are made one
+        at a time while other rooms proceed in parallel.
+
+        SQLite has no row locks and ignores FOR UPDATE: there, writers are
+        serialised by the database lock and the room_nights key rejects
+        the overlapping booking.
+        """
+        return self.db.query(Room).filter(Room.id == room_id).with_for_update().first()
+
+    def get_by_ids_for_update(self, room_ids):
+        """
+        Get and lock several rooms in one IN query. Rows are locked in id
+        order so two overlapping batches cannot deadlock each other.
+        """
+        if not room_ids:
+            return []
+        return self.db.query(Room).filter(Room.id.in_(room_ids)).order_by(Room.id).with_for_update().all()
     
     def get_all_rooms_by_hotel_id(self, hotel_id):
         return self.db.query(Room).filter(Room.hotel_id == hotel_id).all()
+
+    def get_rooms_page_by_hotel_id(self, hotel_id, cursor: str | None, limit: int):
+        return paginate(
+            self.db.query(Room).filter(Room.hotel_id == hotel_id),
+            [Room.created_at, Room.id],
+            cursor,
+            limit,
+        )
     
     def get_available_rooms_by_hotel_id(self, hotel_id):
         return self.db.query(Room).filter(Room.hotel_id == hotel_id, Room.is_available == True).all()
@@ -39,11 +94,220 @@ class RoomRepository:
     def get_booked_rooms_by_hotel_id(self, hotel_id):
         return self.db.query(Room).filter(Room.hotel_id == hotel_id, Room.is_available == False).all()
     
+    def get_room_ids_by_hotel_id(self, hotel_id):
+        return [room_id for (room_id,) in self.db.query(Room.id).filter(Room.hotel_id == hotel_id).all()]
+
     def get_all_rooms(self):
         return self.db.query(Room).all()
     
     
-    def get_available_by_date(self, check_in, check_out):
+    def _search_query(self, filters: RoomSearchFilters | None = None):
+        """
+        Available rooms with the search filters pushed into SQL (backed by
+        the ix_rooms_* composite indexes).
+        """
+        query = self.db.query(Room).filter(Room.is_available == True)
+        if filters is None:
+            return query
+
+        if filters.hotel_id is not None:
+            query = query.filter(Room.hotel_id == filters.hotel_id)
+        if filters.min_capacity is not None:
+            query = query.filter(Room.capacity >= filters.min_capacity)
+        if filters.min_price is not None:
+            query = query.filter(Room.price_per_night >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.filter(Room.price_per_night <= filters.max_price)
+
+        return query
+
+    def _search_order(self, filters: RoomSearchFilters | None = None):
+        """Sort key of the search; always ends with the id to be a valid keyset."""
+        if filters is not None and filters.sort == RoomSort.PRICE:
+            return [Room.price_per_night, Room.id]
+        if filters is not None and filters.sort == RoomSort.CAPACITY:
+            return [Room.capacity, Room.id]
+        return [Room.created_at, Room.id]
+
+    def _free_between(self, check_in, check_out):
+        """
+        Le symbole ~ signifie "NOT" (non). On cherche
+        les chambres qui n'ont aucune nuit réservée
+        dans [check_in, check_out) : un simple range scan
+        sur la clé primaire (room_id, night) de room_nights.
+        Les nuits d'un hold expiré ne comptent plus.
+        """
+        return ~exists().where(
+            RoomNight.room_id == Room.id,
+            RoomNight.night >= to_date(check_in),
+            RoomNight.night < to_date(check_out),
+            self._night_taken(),
+        )
+
+    def _night_taken(self):
+        return or_(RoomNight.expires_at.is_(None), RoomNight.expires_at > utcnow())
+
+    def _booked_nights(self, room_ids, first_night, end_night):
+        """(room_id, night) rows booked in [first_night, end_night)."""
+        query = self.db.query(RoomNight.room_id, RoomNight.night).filter(
+            RoomNight.night >= to_date(first_night),
+            RoomNight.night < to_date(end_night),
+            self._night_taken(),
+        )
+        if room_ids is not None:
+            query = query.filter(RoomNight.room_id.in_(room_ids))
+        return query.all()
+
+    def get_available_by_date(self, check_in, check_out, filters: RoomSearchFilters | None = None):
+        """
+        Get all available rooms for a given date range.
+
+        Uses the in-memory availability index when it is loaded, and the
+        SQL anti-join (get_available_by_date_sql) otherwise.
+        """
+        if not self.availability.loaded:
+            return self.get_available_by_date_sql(check_in, check_out, filters)
+
+        return [
+            room for room in self._search_query(filters).order_by(*self._search_order(filters))
+            if self.availability.is_free(room.id, check_in, check_out)
+        ]
+
+    def get_available_by_date_page(
+        self,
+        check_in,
+        check_out,
+        filters: RoomSearchFilters | None,
+        cursor: str | None,
+        limit: int,
+    ):
+        """
+        One page (keyset on the search sort key) of the available rooms.
+
+        Returns (rooms, next_cursor). With the availability index, rooms
+        are streamed in order and the scan stops as soon as the page is
+        full.
+        """
+        order_by = self._search_order(filters)
+
+        if not self.availability.loaded:
+            return paginate(
+                self._search_query(filters).filter(self._free_between(check_in, check_out)),
+                order_by,
+                cursor,
+                limit,
+            )
+
+        rooms = []
+        for room in after_cursor(self._search_query(filters), order_by, cursor).yield_per(limit + 1):
+            if self.availability.is_free(room.id, check_in, check_out):
+                rooms.append(room)
+                if len(rooms) > limit:
+                    break
+
+        return page_of(rooms, order_by, limit)
+
+    def get_top_available_by_date(self, check_in, check_out, k: int, order: RoomSort):
+        """
+        The k first available rooms in `order` (e.g. the k cheapest).
+
+        ORDER BY ... LIMIT k is pushed into the anti-join, or the ordered
+        scan stops after k free rooms with the index: memory is bounded by
+        k, not by the inventory size.
+        """
+        rooms, _ = self.get_available_by_date_page(
+            check_in,
+            check_out,
+            RoomSearchFilters(sort=order),
+            None,
+            k,
+        )
+        return rooms
+
+    def get_free_capacity_by_hotel(self, check_in, check_out, party_size: int):
+        """
+        Hotels whose free rooms can host party_size guests, with their free
+        capacity and free room count, in a single GROUP BY hotel_id.
+        """
+        free_capacity = func.sum(Room.capacity)
+
+        return self.db.query(
+            Room.hotel_id,
+            free_capacity.label("free_capacity"),
+            func.count(Room.id).label("free_rooms"),
+        ).filter(
+            Room.is_available == True,
+            self._free_between(check_in, check_out),
+        ).group_by(Room.hotel_id).having(free_capacity >= party_size).all()
+
+    def get_availability_summary_by_hotel(self, check_in, check_out):
+        """
+        Per hotel: number of free rooms and min / max free price, in a
+        single GROUP BY over hotels LEFT JOIN free rooms (hotels without
+        any free room are returned with 0).
+        """
+        return self.db.query(
+            Hotel.id.label("hotel_id"),
+            Hotel.name,
+            func.count(Room.id).label("free_rooms"),
+            func.min(Room.price_per_night).label("min_price"),
+            func.max(Room.price_per_night).label("max_price"),
+        ).outerjoin(
+            Room,
+            and_(
+                Room.hotel_id == Hotel.id,
+                Room.is_available == True,
+                self._free_between(check_in, check_out),
+            ),
+        ).group_by(Hotel.id, Hotel.name).all()
+
+    def get_free_rooms_by_hotel_ids(self, hotel_ids, check_in, check_out):
+        if not hotel_ids:
+            return []
+
+        return self.db.query(Room).filter(
+            Room.hotel_id.in_(hotel_ids),
+            Room.is_available == True,
+            self._free_between(check_in, check_out),
+        ).all()
+
+    def get_available_by_date_windows(self, windows, filters: RoomSearchFilters | None = None, limit: int | None = None):
+        """
+        Get the available rooms of several (check_in, check_out) windows at once,
+        at most `limit` per window (first ones in search order).
+
+        The rooms are streamed once, until every window is full. Without
+        the shared availability index, the booked nights of the whole span
+        are read in one range scan and every window is answered in memory
+        instead of running one anti-join per window.
+        """
+        if self.availability.loaded:
+            def is_free(room, check_in, check_out):
+                return self.availability.is_free(room.id, check_in, check_out)
+        else:
+            booked = set(self._booked_nights(
+                None,
+                min(check_in for check_in, _ in windows),
+                max(check_out for _, check_out in windows),
+            ))
+
+            def is_free(room, check_in, check_out):
+                return not any((room.id, night) in booked for night in nights_between(to_date(check_in), to_date(check_out)))
+
+        results = [[] for _ in windows]
+        rooms = self._search_query(filters).order_by(*self._search_order(filters))
+        # Lecture par lots : on s'arrête dès que chaque fenêtre est pleine
+        for room in rooms.yield_per(100):
+            for rooms_of_window, (check_in, check_out) in zip(results, windows):
+                if (limit is None or len(rooms_of_window) < limit) and is_free(room, check_in, check_out):
+                    rooms_of_window.append(room)
+
+            if limit is not None and all(len(rooms_of_window) >= limit for rooms_of_window in results):
+                break
+
+        return results
+
+    def get_available_by_date_sql(self, check_in, check_out, filters: RoomSearchFilters | None = None):
         """
         Get all available rooms for a given date range.
 
@@ -51,22 +315,29 @@ class RoomRepository:
             db (Session): The database session.
             check_in (date): The start date of the range.
             check_out (date): The end date of the range.
+            filters (RoomSearchFilters): Optional capacity / price / hotel filters and sort.
 
         Returns:
             List[Room]: A list of available rooms.
+        """
+        return self._search_query(filters).filter(
+            self._free_between(check_in, check_out)
+        ).order_by(*self._search_order(filters)).all()
 
-        Le symbole ~ signifie "NOT" (non). On cherche 
-        les chambres qui n'ont aucune réservation (any) 
-        correspondant aux critères entre parenthèses.
-        
+    def get_month_bitmaps(self, room_ids, year: int, month: int):
         """
-        return self.db.query(Room).filter(
-            Room.is_available == True,
-            ~Room.bookings.any(
-                and_(
-                    Booking.check_in_date < check_out,
-                    Booking.check_out_date > check_in,
-                    Booking.status == "confirmed"
-                )
-            )
-        ).all()
\ No newline at end of file
+        Get the occupancy bitmap (bit i = night i of the month) of each room.
+
+        Read from the availability index when it is loaded, otherwise
+        from a range scan of the room_nights of the month.
+        """
+        if self.availability.loaded:
+            return {room_id: self.availability.month_bitmap(room_id, year, month) for room_id in room_ids}
+
+        first_night, nights = month_range(year, month)
+        bitmaps = {room_id: 0 for room_id in room_ids}
+        if room_ids:
+            for room_id, night in self._booked_nights(room_ids, first_night, first_night + timedelta(days=nights)):
+                bitmaps[room_id] |= 1 << (night - first_night).days
+
+        return bitmaps
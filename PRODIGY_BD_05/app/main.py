@@ -1,4 +1,9 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import HTMLResponse
 from app.api.router import router
@@ -8,9 +13,102 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.core.exceptions import response_format
-
-
-app = FastAPI(title="Hotel Booking API")
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.infrastructure.cache.local_cache import get_local_cache
+from app.cli.release_expired_holds import release_expired_holds
+from app.infrastructure.queues.booking_queue import BookingQueue
+from app.workers.booking_worker import process_next, requeue_stale_pending
+from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.indexes.availability_index import get_availability_index
+from app.infrastructure.indexes.hotel_search_index import get_hotel_search_index
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.repositories.hotel_repository import HotelRepository
+
+
+async def sweep_expired_holds(interval: int):
+    """Release the lapsed holds every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        # Une erreur passagère (DB / Redis) ne doit pas arrêter le sweeper
+        with suppress(Exception):
+            await run_in_threadpool(release_expired_holds)
+
+
+async def consume_booking_queue():
+    """
+    In-process booking worker: finalise the pending bookings as they are
+    queued, and queue again the ones whose job was lost.
+    """
+    queue = BookingQueue()
+    loop = asyncio.get_running_loop()
+    next_requeue = 0.0
+    while True:
+        try:
+            if loop.time() >= next_requeue:
+                await run_in_threadpool(requeue_stale_pending, queue)
+                next_requeue = loop.time() + settings.BOOKING_PENDING_REQUEUE_AFTER
+            # BLPOP bloquant (1 s) dans un thread : la boucle asyncio reste libre
+            await run_in_threadpool(process_next, queue, 1)
+        except Exception:
+            # Redis / DB indisponible : on réessaie sans arrêter le worker
+            await asyncio.sleep(1)
+
+
+async def listen_cache_invalidations():
+    """Apply the L1 invalidations published by the other workers (see CacheService)."""
+    local = get_local_cache()
+    while True:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        try:
+            await run_in_threadpool(pubsub.subscribe, settings.CACHE_INVALIDATION_CHANNEL)
+            while True:
+                message = await run_in_threadpool(pubsub.get_message, timeout=1)
+                if message is not None:
+                    local.invalidate(**json.loads(message["data"]))
+        except Exception:
+            # Messages peut-être perdus pendant la coupure : on repart d'un L1 vide
+            local.clear()
+            await asyncio.sleep(1)
+        finally:
+            with suppress(Exception):
+                pubsub.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the in-memory availability and hotel search indexes before
+    serving requests, and run the hold expiry sweeper (and the booking
+    worker in BOOKING_ASYNC_MODE, the L1 cache invalidation listener in
+    CACHE_L1_ENABLED) while serving.
+    """
+    db = SessionLocal()
+    try:
+        if settings.AVAILABILITY_INDEX_ENABLED:
+            get_availability_index().load(BookingRepository(db).get_occupied_intervals())
+        if settings.HOTEL_SEARCH_INDEX_ENABLED:
+            get_hotel_search_index().load(HotelRepository(db).get_search_documents())
+    finally:
+        db.close()
+
+    tasks = []
+    if settings.BOOKING_HOLD_SWEEP_INTERVAL > 0:
+        tasks.append(asyncio.create_task(sweep_expired_holds(settings.BOOKING_HOLD_SWEEP_INTERVAL)))
+    if settings.BOOKING_ASYNC_MODE and settings.BOOKING_WORKER_IN_PROCESS:
+        tasks.append(asyncio.create_task(consume_booking_queue()))
+    if settings.CACHE_L1_ENABLED:
+        tasks.append(asyncio.create_task(listen_cache_invalidations()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+app = FastAPI(title="Hotel Booking API", lifespan=lifespan)
 
 app.include_router(router)
 
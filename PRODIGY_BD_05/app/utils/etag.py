@@ -0,0 +1,24 @@
+from fastapi import HTTPException
+
+
+def etag(version: int) -> str:
+    """Strong ETag of a versioned resource: the quoted version number."""
+    return f'"{version}"'
+
+
+def parse_if_match(value: str | None) -> int | None:
+    """
+    Version expected by an If-Match header ("3", W/"3" or 3).
+
+    None when the header is absent or "*" (no precondition).
+    """
+    if value is None or value.strip() == "*":
+        return None
+
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
@@ -7,3 +7,7 @@ class ApiResponse(BaseModel, Generic[T]):
     code: int
     message: str
     data: Optional[T] = None
+
+
+class PaginatedResponse(ApiResponse[T], Generic[T]):
+    next_cursor: Optional[str] = None
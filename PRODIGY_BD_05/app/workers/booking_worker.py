@@ -0,0 +1,77 @@
+"""
+Booking worker of the asynchronous pipeline (BOOKING_ASYNC_MODE).
+
+Pops the pending bookings queued by POST /v1/bookings, confirms them
+and runs the deferred side effects (cache invalidation).
+
+Usage:
+    python -m app.workers.booking_worker
+
+With BOOKING_WORKER_IN_PROCESS (default), the API also consumes the
+queue itself from a background task, so no separate process is needed.
+
+A job is popped before the booking is finalised: if the worker crashes
+or fails in between, the job is lost. Every BOOKING_PENDING_REQUEUE_AFTER
+seconds, the bookings still pending for longer than that are queued
+again (requeue_stale_pending), so none stays pending forever. Bookings
+whose job is still waiting are skipped, so a backlog is never queued
+twice, whatever the number of processes running the sweep.
+"""
+
+import time
+
+from app.core.config import settings
+
+from app.application.services.v1.booking_service import BookingService
+from app.application.services.v1.cache_service import CacheService
+from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.queues.booking_queue import BookingQueue
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.repositories.room_repository import RoomRepository
+
+
+def process_next(queue: BookingQueue, timeout: int = 0, session_factory=SessionLocal) -> bool:
+    """Process one queued booking. False when the queue stayed empty."""
+    booking_id = queue.pop(timeout)
+    if booking_id is None:
+        return False
+
+    db = session_factory()
+    try:
+        service = BookingService(BookingRepository(db), RoomRepository(db), CacheService(), queue)
+        service.finalize_pending(booking_id)
+    finally:
+        db.close()
+    return True
+
+
+def requeue_stale_pending(queue: BookingQueue, session_factory=SessionLocal) -> int:
+    """Queue again the bookings whose job was lost. Returns the count."""
+    db = session_factory()
+    try:
+        service = BookingService(BookingRepository(db), RoomRepository(db), CacheService(), queue)
+        return len(service.requeue_stale_pending())
+    finally:
+        db.close()
+
+
+def drain(queue: BookingQueue, session_factory=SessionLocal) -> int:
+    """Process every queued booking without waiting. Returns the count."""
+    processed = 0
+    while process_next(queue, session_factory=session_factory):
+        processed += 1
+    return processed
+
+
+def main():
+    queue = BookingQueue()
+    next_requeue = 0.0
+    while True:
+        if time.monotonic() >= next_requeue:
+            requeue_stale_pending(queue)
+            next_requeue = time.monotonic() + settings.BOOKING_PENDING_REQUEUE_AFTER
+        process_next(queue, timeout=5)
+
+
+if __name__ == "__main__":
+    main()
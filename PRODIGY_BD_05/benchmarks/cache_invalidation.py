@@ -0,0 +1,108 @@
+"""
+Benchmark of CacheService.invalidate_pattern: KEYS + DEL (previous
+implementation) against SCAN + pipelined UNLINK.
+
+Usage (from PRODIGY_BD_05, against a real Redis server):
+    python -m benchmarks.cache_invalidation [--keys 100000 1000000] [--noise 1]
+
+For each size, the matching keys (bench:rooms:*) are created next to
+`noise` times as many unrelated keys (bench:other:*), then invalidated
+with both strategies. While an invalidation runs, a second client sends
+PING in a loop: its worst latency is the time Redis was blocked for
+every other client.
+
+Only bench:* keys are written and deleted.
+"""
+
+import argparse
+import threading
+import time
+
+from redis import Redis
+
+from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+
+PATTERN = "bench:rooms:*"
+
+
+def legacy_invalidate(redis, pattern: str) -> int:
+    """invalidate_pattern before the SCAN rewrite."""
+    keys = redis.keys(pattern)
+    if keys:
+        redis.delete(*keys)
+    return len(keys)
+
+
+def populate(redis, size: int, noise: int):
+    pipe = redis.pipeline(transaction=False)
+    for i in range(size):
+        pipe.setex(f"bench:rooms:search:{i}", 600, "[]")
+        for j in range(noise):
+            pipe.setex(f"bench:other:{j}:{i}", 600, "[]")
+        if i % 10_000 == 0:
+            pipe.execute()
+    pipe.execute()
+
+
+def cleanup():
+    CacheService().invalidate_pattern("bench:*", budget=float("inf"))
+
+
+class PingProbe(threading.Thread):
+    """Measure the worst PING latency seen by another client."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
+        self.stopped = threading.Event()
+        self.worst = 0.0
+
+    def run(self):
+        while not self.stopped.is_set():
+            start = time.perf_counter()
+            self.redis.ping()
+            self.worst = max(self.worst, time.perf_counter() - start)
+            time.sleep(0.001)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def measure(invalidate):
+    probe = PingProbe()
+    probe.start()
+    start = time.perf_counter()
+    removed = invalidate()
+    elapsed = time.perf_counter() - start
+    probe.stop()
+    return removed, elapsed, probe.worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare KEYS and SCAN based cache invalidation.")
+    parser.add_argument("--keys", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--noise", type=int, default=1, help="unrelated keys per matching key")
+    args = parser.parse_args(argv)
+
+    redis = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB, decode_responses=True)
+    cache = CacheService()
+    strategies = {
+        "keys+del": lambda: legacy_invalidate(redis, PATTERN),
+        "scan+unlink": lambda: cache.invalidate_pattern(PATTERN, budget=float("inf")),
+    }
+
+    print(f"{'keys':>10}  {'strategy':<12} {'removed':>10} {'total (s)':>10} {'worst PING (ms)':>16}")
+    for size in args.keys:
+        for name, invalidate in strategies.items():
+            cleanup()
+            populate(redis, size, args.noise)
+            removed, elapsed, worst = measure(invalidate)
+            print(f"{size:>10}  {name:<12} {removed:>10} {elapsed:>10.3f} {worst * 1000:>16.1f}")
+
+    cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,14 +11,18 @@ This file configures:
 2. Redis Mocking
    - FakeRedis class replaces real Redis client
    - Avoids external dependency during tests
-   - Simulates get, setex, delete, keys operations
+   - Simulates get, set (nx), setex, incr, expire, delete, unlink, keys, scan, sets (sadd, srem, scard, sscan, sunion), exists, pipelines, list (rpush, lpop, blpop), publish, info and eval (application Lua scripts) operations
 
-3. FastAPI Dependency Overrides
+3. In-memory Indexes
+   - Availability and hotel search indexes and the L1 cache reset before and after each test
+   - Not loaded by default: repositories use the SQL path
+
+4. FastAPI Dependency Overrides
    - Overrides get_db dependency
    - Injects test database session
    - Clears overrides after test
 
-4. Authentication Fixtures
+5. Authentication Fixtures
    - create_user(role): dynamically create user with specific role
    - user_token: returns valid JWT for USER
    - owner_token: returns valid JWT for OWNER
@@ -34,6 +38,7 @@ All integration and e2e tests depend on this setup.
 """
 
 
+import fnmatch
 import pytest
 import uuid
 from fastapi.testclient import TestClient
@@ -44,7 +49,11 @@ from sqlalchemy.pool import StaticPool
 from app.main import app
 from app.infrastructure.database.base import Base
 from app.infrastructure.database.session import get_db
-from app.core.redis import RedisClient
+from app.core.redis import RELEASE_LOCK, RedisClient
+from app.infrastructure.queues.booking_queue import ENQUEUE_ONCE
+from app.infrastructure.indexes.availability_index import AvailabilityIndex
+from app.infrastructure.indexes.hotel_search_index import HotelSearchIndex
+from app.infrastructure.cache.local_cache import LocalCache
 
 from app.domain.models.users import User
 from app.core.security import get_password_hash
@@ -88,9 +97,29 @@ def override_get_db(db):
 # FAKE REDIS
 # -------------------------
 
+class FakePipeline:
+    """Queue the commands and run them on execute(), like redis-py."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+
 class FakeRedis:
     def __init__(self):
         self.store = {}
+        self.scans = {}
+        self.published = []
 
     def get(self, key):
         return self.store.get(key)
@@ -98,12 +127,101 @@ class FakeRedis:
     def setex(self, key, ttl, value):
         self.store[key] = value
 
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def expire(self, key, ttl):
+        return key in self.store
+
+    def exists(self, *keys):
+        return sum(key in self.store for key in keys)
+
+    def sadd(self, key, *members):
+        members = set(members) - self.store.setdefault(key, set())
+        self.store[key] |= members
+        return len(members)
+
+    def srem(self, key, *members):
+        removed = self.store.get(key, set()) & set(members)
+        self.store.get(key, set()).difference_update(removed)
+        return len(removed)
+
+    def scard(self, key):
+        return len(self.store.get(key, set()))
+
+    def sscan(self, key, cursor=0, count=10):
+        # Curseur = position dans un instantané des membres pris au premier appel
+        if cursor == 0:
+            self.scans[key] = sorted(self.store.get(key, set()))
+        snapshot = self.scans[key]
+        page = [member for member in snapshot[cursor:cursor + count] if member in self.store.get(key, set())]
+        cursor += count
+        return (cursor if cursor < len(snapshot) else 0), page
+
+    def sunion(self, keys):
+        return set().union(*(self.store.get(key, set()) for key in keys))
+
+    def incr(self, key):
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
     def delete(self, *keys):
-        for key in keys:
-            self.store.pop(key, None)
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    unlink = delete
 
     def keys(self, pattern):
-        return list(self.store.keys())
+        return [key for key in self.store if fnmatch.fnmatchcase(key, pattern)]
+
+    def scan(self, cursor=0, match="*", count=10):
+        # Curseur = position dans un instantané des clés pris au premier appel
+        if cursor == 0:
+            self.scans[match] = list(self.store)
+        snapshot = self.scans[match]
+        page = [key for key in snapshot[cursor:cursor + count] if key in self.store and fnmatch.fnmatchcase(key, match)]
+        cursor += count
+        return (cursor if cursor < len(snapshot) else 0), page
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def publish(self, channel, message):
+        # Aucun abonné dans les tests : le message est seulement enregistré
+        self.published.append((channel, message))
+        return 0
+
+    def info(self, section=None):
+        return {}
+
+    def eval(self, script, numkeys, *keys_and_args):
+        # Scripts Lua de l'application, rejoués en Python
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == RELEASE_LOCK:
+            if self.store.get(keys[0]) != args[0]:
+                return 0
+            return self.delete(keys[0])
+        if script == ENQUEUE_ONCE:
+            if not self.set(keys[1], "1", nx=True, ex=args[1]):
+                return 0
+            return self.rpush(keys[0], args[0])
+        raise NotImplementedError(script)
+
+    def rpush(self, key, *values):
+        self.store.setdefault(key, []).extend(values)
+        return len(self.store[key])
+
+    def lpop(self, key):
+        items = self.store.get(key)
+        if not items:
+            return None
+        return items.pop(0)
+
+    def blpop(self, key, timeout=0):
+        value = self.lpop(key)
+        return (key, value) if value is not None else None
 
 
 @pytest.fixture(autouse=True)
@@ -113,6 +231,21 @@ def override_redis():
     RedisClient._instance = None
 
 
+# -------------------------
+# AVAILABILITY INDEX
+# -------------------------
+
+@pytest.fixture(autouse=True)
+def reset_indexes():
+    AvailabilityIndex._instance = None
+    HotelSearchIndex._instance = None
+    LocalCache._instance = None
+    yield
+    AvailabilityIndex._instance = None
+    HotelSearchIndex._instance = None
+    LocalCache._instance = None
+
+
 @pytest.fixture
 def client(db):
     app.dependency_overrides[get_db] = override_get_db(db)
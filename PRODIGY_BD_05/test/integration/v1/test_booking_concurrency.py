@@ -0,0 +1,121 @@
+"""
+Concurrency stress tests for booking creation.
+
+Runs against a file-based SQLite database (the shared in-memory one has a
+single connection), one session per thread, like one request per worker.
+
+Scenarios Covered:
+
+✔ Hundreds of parallel bookings of the same room: exactly one succeeds
+✔ Parallel bookings of different rooms all succeed
+
+Goal:
+Guarantee booking creation is atomic per room under concurrent load.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.schemas.booking_schema import BookingCreate
+from app.application.services.v1.booking_service import BookingService
+from app.application.services.v1.cache_service import CacheService
+from app.domain.models.booking import Booking
+from app.domain.models.hotels import Hotel
+from app.domain.models.room_nights import RoomNight
+from app.domain.models.rooms import Room
+from app.domain.models.users import User
+from app.infrastructure.database.base import Base
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.repositories.room_repository import RoomRepository
+
+ATTEMPTS = 200
+WORKERS = 32
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"check_same_thread": False, "timeout": 60},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def seed_rooms(session_factory, count):
+    db = session_factory()
+    user = User(email="guest@concurrency.test", hashed_password="x", role="user")
+    db.add(user)
+    db.flush()
+
+    hotel = Hotel(name="Busy Hotel", address="Abidjan", owner_id=user.id)
+    db.add(hotel)
+    db.flush()
+
+    rooms = [Room(hotel_id=hotel.id, title=f"Room {i}", price_per_night=100, capacity=2) for i in range(count)]
+    db.add_all(rooms)
+    db.commit()
+
+    user_id, room_ids = str(user.id), [room.id for room in rooms]
+    db.close()
+    return user_id, room_ids
+
+
+def run_in_parallel(session_factory, user_id, room_ids):
+    """Book each room of room_ids from its own thread and session; return the status codes."""
+    check_in = date.today() + timedelta(days=10)
+    start = threading.Event()
+
+    def attempt(room_id):
+        db = session_factory()
+        service = BookingService(BookingRepository(db), RoomRepository(db), CacheService())
+        start.wait()
+        try:
+            service.create(user_id, BookingCreate(
+                room_id=room_id,
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=3),
+            ))
+            return 200
+        except HTTPException as exc:
+            return exc.status_code
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        futures = [pool.submit(attempt, room_id) for room_id in room_ids]
+        start.set()
+        return [future.result() for future in futures]
+
+
+def test_parallel_bookings_same_room(session_factory):
+    user_id, (room_id,) = seed_rooms(session_factory, 1)
+
+    statuses = run_in_parallel(session_factory, user_id, [room_id] * ATTEMPTS)
+
+    assert statuses.count(200) == 1
+    assert set(statuses) <= {200, 400}
+
+    db = session_factory()
+    assert db.query(Booking).filter(Booking.room_id == room_id).count() == 1
+    assert db.query(RoomNight).filter(RoomNight.room_id == room_id).count() == 3
+    db.close()
+
+
+def test_parallel_bookings_different_rooms(session_factory):
+    user_id, room_ids = seed_rooms(session_factory, 50)
+
+    statuses = run_in_parallel(session_factory, user_id, room_ids)
+
+    assert statuses == [200] * len(room_ids)
+
+    db = session_factory()
+    assert db.query(Booking).count() == len(room_ids)
+    db.close()
@@ -3,6 +3,11 @@ Integration tests for Booking Routes (v1).
 
 Covered Endpoints:
 - POST   /v1/bookings
+- POST   /v1/bookings/batch
+- POST   /v1/bookings/hold
+- PATCH  /v1/bookings/{booking_id}/confirm
+- GET    /v1/bookings/me
+- GET    /v1/bookings/{booking_id}
 - PATCH  /v1/bookings/{booking_id}/cancel
 
 Booking Creation:
@@ -12,11 +17,42 @@ Booking Creation:
 ✔ Invalid date range (400)
 ✔ Booking conflict scenario
 
+Batch Booking:
+--------------
+✔ All bookings of a batch created at once
+✔ One conflicting item rejects the whole batch (409, per-item outcomes)
+✔ Overlapping items of the same batch rejected
+✔ Batch size limit (422)
+
+Holds:
+------
+✔ Held room is occupied for searches and bookings
+✔ Hold converted into a confirmed booking
+✔ Confirmed hold stays booked in the availability index after its TTL
+✔ Expired hold cannot be confirmed (410) and frees its nights
+✔ Expiry sweeper releases lapsed holds
+
+Async Pipeline (BOOKING_ASYNC_MODE):
+------------------------------------
+✔ Booking acknowledged 202 as pending, nights reserved immediately
+✔ Worker confirms and invalidates the cache; status endpoint reflects it
+✔ Booking cancelled before the worker runs stays cancelled
+✔ Pending booking whose job was lost is queued again and confirmed, never queued twice
+✔ Status endpoint: not found (404), not owner (403)
+
+History & Archive:
+------------------
+✔ History lists current and archived bookings, latest stay first
+✔ History is paginated with a cursor
+✔ Archived booking still readable, no longer cancellable (404)
+
 Cancellation:
 --------------
 ✔ Cancel own booking
+✔ Cancel an already cancelled booking (409)
 ✔ Cancel non-existent booking (404)
 ✔ Cancel by non-owner (403)
+✔ Cancelled nights can be booked again
 
 RBAC:
 ------
@@ -24,6 +60,14 @@ RBAC:
 ✔ Unauthorized access blocked
 ✔ Ownership enforced on cancellation
 
+Room Nights:
+------------
+✔ Overlapping booking rejected by the (room_id, night) key
+
+Availability Index:
+-------------------
+✔ Booking and cancellation update the loaded index
+
 Business Rules Validated:
 --------------------------
 - Room availability check
@@ -37,8 +81,22 @@ Guarantee booking integrity and prevent reservation conflicts.
 
 
 
+import time
+import uuid
 from datetime import date, timedelta
 
+from app.application.services.v1.booking_service import BookingService
+from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+from app.domain.models.booking import Booking
+from app.infrastructure.indexes.availability_index import get_availability_index
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.queues.booking_queue import BookingQueue
+from app.infrastructure.repositories.room_repository import RoomRepository
+from app.workers.booking_worker import drain, requeue_stale_pending
+from app.cli.archive_bookings import archive_bookings
+from sqlalchemy.orm import sessionmaker
+
 
 def create_room_for_booking(client, owner_token):
     hotel = client.post(
@@ -137,6 +195,12 @@ def test_cancel_success(client, user_token, owner_token):
     )
     assert res.status_code == 200
 
+    res = client.patch(
+        f"/v1/bookings/{book.json()['data']['id']}/cancel",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 409
+
 def test_cancel_not_found(client, user_token):
     res = client.patch(
         "/v1/bookings/11111111-1111-1111-1111-111111111111/cancel",
@@ -162,4 +226,357 @@ def test_cancel_not_owner(client, user_token, owner_token):
         f"/v1/bookings/{book.json()['data']['id']}/cancel",
         headers={"Authorization": f"Bearer {owner_token}"}
     )
-    assert res.status_code == 403
\ No newline at end of file
+    assert res.status_code == 403
+
+
+def test_booking_updates_availability_index(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    get_availability_index().load([])
+
+    params = {
+        "check_in": str(date.today() + timedelta(days=1)),
+        "check_out": str(date.today() + timedelta(days=3)),
+    }
+    book = client.post(
+        "/v1/bookings",
+        json={
+            "room_id": room_id,
+            "check_in_date": params["check_in"],
+            "check_out_date": params["check_out"],
+        },
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert book.status_code == 200
+    assert client.get("/v1/rooms/search", params=params).json()["data"] == []
+
+    client.patch(
+        f"/v1/bookings/{book.json()['data']['id']}/cancel",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    res = client.get("/v1/rooms/search", params=params)
+    assert [room["id"] for room in res.json()["data"]] == [room_id]
+
+
+def book(client, token, room_id, check_in, check_out):
+    return client.post(
+        "/v1/bookings",
+        json={
+            "room_id": room_id,
+            "check_in_date": str(check_in),
+            "check_out_date": str(check_out),
+        },
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_booking_overlap_rejected_by_room_nights(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    today = date.today()
+
+    assert book(client, user_token, room_id, today + timedelta(days=2), today + timedelta(days=5)).status_code == 200
+
+    res = book(client, user_token, room_id, today + timedelta(days=4), today + timedelta(days=6))
+    assert res.status_code == 400
+
+    # Back-to-back stays share no night
+    assert book(client, user_token, room_id, today + timedelta(days=5), today + timedelta(days=7)).status_code == 200
+
+
+def test_cancelled_nights_can_be_booked_again(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    check_in, check_out = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+
+    first = book(client, user_token, room_id, check_in, check_out)
+    client.patch(
+        f"/v1/bookings/{first.json()['data']['id']}/cancel",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert book(client, user_token, room_id, check_in, check_out).status_code == 200
+
+
+def stay(room_id, start, nights):
+    check_in = date.today() + timedelta(days=start)
+    return {
+        "room_id": room_id,
+        "check_in_date": str(check_in),
+        "check_out_date": str(check_in + timedelta(days=nights)),
+    }
+
+
+def test_booking_batch_success(client, user_token, owner_token):
+    room_ids = [create_room_for_booking(client, owner_token) for _ in range(3)]
+    items = [stay(room_id, 1, 2) for room_id in room_ids] + [stay(room_ids[0], 3, 2)]
+
+    res = client.post(
+        "/v1/bookings/batch",
+        json={"bookings": items},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert res.status_code == 200
+    outcomes = res.json()["data"]
+    assert [outcome["status"] for outcome in outcomes] == ["created"] * 4
+    assert [outcome["booking"]["room_id"] for outcome in outcomes] == [item["room_id"] for item in items]
+
+    # Nights now taken
+    assert book(client, user_token, room_ids[1], date.today() + timedelta(days=2), date.today() + timedelta(days=4)).status_code == 400
+
+
+def test_booking_batch_conflict_rejects_everything(client, user_token, owner_token):
+    room_ids = [create_room_for_booking(client, owner_token) for _ in range(2)]
+    assert book(client, user_token, room_ids[1], date.today() + timedelta(days=2), date.today() + timedelta(days=3)).status_code == 200
+
+    res = client.post(
+        "/v1/bookings/batch",
+        json={"bookings": [stay(room_ids[0], 1, 2), stay(room_ids[1], 1, 5)]},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert res.status_code == 409
+    outcomes = res.json()["data"]
+    assert [outcome["status"] for outcome in outcomes] == ["skipped", "rejected"]
+    assert outcomes[1]["reason"] == "Booking conflict"
+
+    # Rien n'a été créé : la première chambre est toujours libre
+    assert book(client, user_token, room_ids[0], date.today() + timedelta(days=1), date.today() + timedelta(days=3)).status_code == 200
+
+
+def test_booking_batch_overlapping_items(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+
+    res = client.post(
+        "/v1/bookings/batch",
+        json={"bookings": [stay(room_id, 1, 3), stay(room_id, 2, 1), stay("11111111-1111-1111-1111-111111111111", 1, 1)]},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert res.status_code == 409
+    assert [outcome["reason"] for outcome in res.json()["data"]] == [
+        None,
+        "Overlaps another booking of the batch",
+        "Room not found",
+    ]
+
+
+def test_booking_batch_size_limit(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+
+    res = client.post(
+        "/v1/bookings/batch",
+        json={"bookings": [stay(room_id, i + 1, 1) for i in range(51)]},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 422
+
+    res = client.post("/v1/bookings/batch", json={"bookings": []}, headers={"Authorization": f"Bearer {user_token}"})
+    assert res.status_code == 422
+
+
+def hold(client, token, room_id, check_in, check_out):
+    return client.post(
+        "/v1/bookings/hold",
+        json={
+            "room_id": room_id,
+            "check_in_date": str(check_in),
+            "check_out_date": str(check_out),
+        },
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+def test_hold_occupies_room(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    check_in, check_out = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+
+    res = hold(client, user_token, room_id, check_in, check_out)
+    assert res.status_code == 200
+    assert res.json()["data"]["status"] == "held"
+    assert res.json()["data"]["expires_at"] is not None
+
+    search = client.get("/v1/rooms/search", params={"check_in": str(check_in), "check_out": str(check_out)})
+    assert search.json()["data"] == []
+    assert book(client, user_token, room_id, check_in, check_out).status_code == 400
+
+
+def test_hold_confirm(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    held = hold(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=3))
+
+    res = client.patch(
+        f"/v1/bookings/{held.json()['data']['id']}/confirm",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 200
+    assert res.json()["data"]["status"] == "confirmed"
+    assert res.json()["data"]["expires_at"] is None
+
+    # Déjà confirmé
+    res = client.patch(
+        f"/v1/bookings/{held.json()['data']['id']}/confirm",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 400
+
+
+def test_hold_confirm_updates_availability_index(client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_HOLD_TTL", 1)
+    index = get_availability_index()
+    index.load([])
+    room_id = create_room_for_booking(client, owner_token)
+    check_in, check_out = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+    held = hold(client, user_token, room_id, check_in, check_out)
+
+    res = client.patch(
+        f"/v1/bookings/{held.json()['data']['id']}/confirm",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 200
+
+    # TTL du hold d'origine dépassé : la réservation confirmée occupe toujours la chambre
+    time.sleep(1.1)
+    assert index.is_free(uuid.UUID(room_id), check_in, check_out) is False
+
+
+def test_hold_confirm_not_owner(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    held = hold(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=3))
+
+    res = client.patch(
+        f"/v1/bookings/{held.json()['data']['id']}/confirm",
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    assert res.status_code == 403
+
+
+def test_expired_hold(client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_HOLD_TTL", -1)
+    room_id = create_room_for_booking(client, owner_token)
+    check_in, check_out = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+
+    held = hold(client, user_token, room_id, check_in, check_out)
+
+    res = client.patch(
+        f"/v1/bookings/{held.json()['data']['id']}/confirm",
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 410
+
+    search = client.get("/v1/rooms/search", params={"check_in": str(check_in), "check_out": str(check_out)})
+    assert [room["id"] for room in search.json()["data"]] == [room_id]
+    assert book(client, user_token, room_id, check_in, check_out).status_code == 200
+
+
+def test_sweeper_releases_expired_holds(db, client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_HOLD_TTL", -1)
+    room_id = create_room_for_booking(client, owner_token)
+    held = hold(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=3))
+
+    service = BookingService(BookingRepository(db), RoomRepository(db), CacheService())
+    released = service.release_expired_holds()
+
+    assert [str(booking_id) for booking_id in released] == [held.json()["data"]["id"]]
+    assert db.query(Booking).filter(Booking.status == "expired").count() == 1
+    assert service.release_expired_holds() == []
+
+
+def test_async_booking_pipeline(db, client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_ASYNC_MODE", True)
+    room_id = create_room_for_booking(client, owner_token)
+    check_in, check_out = date.today() + timedelta(days=1), date.today() + timedelta(days=3)
+    params = {"check_in": str(check_in), "check_out": str(check_out)}
+
+    # Recherche mise en cache avant la réservation
+    assert len(client.get("/v1/rooms/search", params=params).json()["data"]) == 1
+
+    res = book(client, user_token, room_id, check_in, check_out)
+    assert res.status_code == 202
+    booking_id = res.json()["data"]["id"]
+    assert res.json()["data"]["status"] == "pending"
+
+    # Nuits déjà réservées : pas de double réservation pendant l'attente
+    assert book(client, user_token, room_id, check_in, check_out).status_code == 400
+
+    status = client.get(f"/v1/bookings/{booking_id}", headers={"Authorization": f"Bearer {user_token}"})
+    assert status.json()["data"]["status"] == "pending"
+
+    assert drain(BookingQueue(), sessionmaker(bind=db.get_bind())) == 1
+
+    status = client.get(f"/v1/bookings/{booking_id}", headers={"Authorization": f"Bearer {user_token}"})
+    assert status.json()["data"]["status"] == "confirmed"
+    assert client.get("/v1/rooms/search", params=params).json()["data"] == []
+
+
+def test_async_booking_cancelled_before_worker(db, client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_ASYNC_MODE", True)
+    room_id = create_room_for_booking(client, owner_token)
+    res = book(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=3))
+    booking_id = res.json()["data"]["id"]
+
+    client.patch(f"/v1/bookings/{booking_id}/cancel", headers={"Authorization": f"Bearer {user_token}"})
+    drain(BookingQueue(), sessionmaker(bind=db.get_bind()))
+
+    status = client.get(f"/v1/bookings/{booking_id}", headers={"Authorization": f"Bearer {user_token}"})
+    assert status.json()["data"]["status"] == "cancelled"
+
+
+def test_async_booking_lost_job_requeued(db, client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_ASYNC_MODE", True)
+    room_id = create_room_for_booking(client, owner_token)
+    res = book(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=3))
+    booking_id = res.json()["data"]["id"]
+    session_factory = sessionmaker(bind=db.get_bind())
+
+    queue = BookingQueue()
+    assert requeue_stale_pending(queue, session_factory) == 0
+
+    # Job encore en file : jamais mis en file une seconde fois, même par plusieurs processus
+    monkeypatch.setattr(settings, "BOOKING_PENDING_REQUEUE_AFTER", 0)
+    assert requeue_stale_pending(queue, session_factory) == 0
+    assert requeue_stale_pending(queue, session_factory) == 0
+
+    # Le worker a dépilé le job puis planté avant finalize_pending
+    assert queue.pop() is not None
+    assert queue.pop() is None
+    assert requeue_stale_pending(queue, session_factory) == 1
+    assert drain(queue, session_factory) == 1
+
+    status = client.get(f"/v1/bookings/{booking_id}", headers={"Authorization": f"Bearer {user_token}"})
+    assert status.json()["data"]["status"] == "confirmed"
+    assert requeue_stale_pending(queue, session_factory) == 0
+
+
+def test_get_booking_errors(client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    booking_id = book(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=2)).json()["data"]["id"]
+
+    res = client.get(f"/v1/bookings/{booking_id}", headers={"Authorization": f"Bearer {owner_token}"})
+    assert res.status_code == 403
+
+    res = client.get("/v1/bookings/11111111-1111-1111-1111-111111111111", headers={"Authorization": f"Bearer {user_token}"})
+    assert res.status_code == 404
+
+
+def test_booking_history_with_archive(db, client, user_token, owner_token):
+    room_id = create_room_for_booking(client, owner_token)
+    headers = {"Authorization": f"Bearer {user_token}"}
+    past = book(client, user_token, room_id, date.today() + timedelta(days=1), date.today() + timedelta(days=2)).json()["data"]["id"]
+    upcoming = book(client, user_token, room_id, date.today() + timedelta(days=5), date.today() + timedelta(days=7)).json()["data"]["id"]
+
+    assert archive_bookings(db, date.today() + timedelta(days=4)) == 1
+
+    res = client.get("/v1/bookings/me", headers=headers)
+    assert res.status_code == 200
+    assert [(item["id"], item["archived"]) for item in res.json()["data"]] == [(upcoming, False), (past, True)]
+
+    first = client.get("/v1/bookings/me", params={"limit": 1}, headers=headers).json()
+    second = client.get("/v1/bookings/me", params={"limit": 1, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert [item["id"] for item in first["data"] + second["data"]] == [upcoming, past]
+    assert second["next_cursor"] is None
+
+    res = client.get(f"/v1/bookings/{past}", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["data"]["archived"] is True
+
+    assert client.patch(f"/v1/bookings/{past}/cancel", headers=headers).status_code == 404
+    assert client.get("/v1/bookings/me", headers={"Authorization": f"Bearer {owner_token}"}).json()["data"] == []
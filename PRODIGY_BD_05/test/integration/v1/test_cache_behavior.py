@@ -3,11 +3,15 @@ Integration tests for Cache Behavior (v1).
 
 Covered Endpoints:
 - GET /v1/rooms/search
+- GET /v1/cache/stats
 
 Cache Behavior:
 ---------------
 ✔ Cache is used for the first request
 ✔ Cache is not used for subsequent requests
+✔ Cancellation drops the date searches but keeps unrelated room lists
+✔ Booking drops only the searches covering its nights
+✔ Cache stats (L1 / L2 counters) are reserved to admins
 
 Goal:
 Ensure that the cache is used for the first request and not for subsequent requests.
@@ -17,6 +21,10 @@ Ensure that the cache is used for the first request and not for subsequent reque
 
 from datetime import date, timedelta
 
+from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+from app.core.redis import get_redis
+
 
 def test_search_rooms_cache_usage(client, owner_token):
     # Setup
@@ -218,3 +226,87 @@ def test_cache_invalidated_after_room_update(client, owner_token):
         res_room = client.get(f"/v1/rooms/search?check_in={str(date.today())}&check_out={str(date.today() + timedelta(days=7))}")
         assert res_room.status_code == 200
 
+
+
+def test_cancellation_invalidation_is_targeted(client, owner_token, user_token):
+    hotel = client.post(
+        "/v1/hotels",
+        json={"name": "Hotel Cancel", "description": "Nice", "address": "Paris"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    hotel_id = hotel.json()["data"]["id"]
+
+    room = client.post(
+        f"/v1/rooms/hotel/{hotel_id}",
+        json={"title": "Room Cancel", "price_per_night": 100, "capacity": 2},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    room_id = room.json()["data"]["id"]
+
+    params = {
+        "check_in": str(date.today() + timedelta(days=1)),
+        "check_out": str(date.today() + timedelta(days=3)),
+    }
+    booking = client.post(
+        "/v1/bookings",
+        json={"room_id": room_id, "check_in_date": params["check_in"], "check_out_date": params["check_out"]},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    # Cache rempli : recherche (chambre occupée) et liste des chambres de l'hôtel
+    assert client.get("/v1/rooms/search", params=params).json()["data"] == []
+    client.get(f"/v1/rooms/hotel/{hotel_id}")
+
+    client.patch(f"/v1/bookings/{booking.json()['data']['id']}/cancel", headers={"Authorization": f"Bearer {user_token}"})
+
+    assert [r["id"] for r in client.get("/v1/rooms/search", params=params).json()["data"]] == [room_id]
+    # La liste des chambres de l'hôtel est toujours servie par le cache
+    assert get_redis().get(CacheService().key(f"rooms:hotel:{hotel_id}", "", settings.POSTS_PER_PAGE)) is not None
+
+
+def test_booking_invalidates_overlapping_searches_only(client, owner_token, user_token):
+    hotel = client.post(
+        "/v1/hotels",
+        json={"name": "Hotel Tags", "description": "Nice", "address": "Paris"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    room = client.post(
+        f"/v1/rooms/hotel/{hotel.json()['data']['id']}",
+        json={"title": "Room Tags", "price_per_night": 100, "capacity": 2},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    room_id = room.json()["data"]["id"]
+
+    overlapping = {"check_in": str(date.today() + timedelta(days=2)), "check_out": str(date.today() + timedelta(days=4))}
+    later = {"check_in": str(date.today() + timedelta(days=10)), "check_out": str(date.today() + timedelta(days=12))}
+    client.get("/v1/rooms/search", params=overlapping)
+    cached_later = client.get("/v1/rooms/search", params=later).json()
+
+    client.post(
+        "/v1/bookings",
+        json={"room_id": room_id, "check_in_date": str(date.today() + timedelta(days=1)), "check_out_date": str(date.today() + timedelta(days=3))},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    assert client.get("/v1/rooms/search", params=overlapping).json()["data"] == []
+
+    # Recherche sur d'autres nuits : toujours en cache
+    cached = [key for key in get_redis().keys("rooms:search:*") if later["check_in"] in key]
+    assert len(cached) == 1
+    assert [r["id"] for r in CacheService().get(cached[0])["value"]["items"]] == [r["id"] for r in cached_later["data"]] == [room_id]
+
+
+def test_cache_stats_admin_only(client, admin_token, user_token, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", True)
+    client.get("/v1/hotels")
+    client.get("/v1/hotels")
+
+    forbidden = client.get("/v1/cache/stats", headers={"Authorization": f"Bearer {user_token}"})
+    assert forbidden.status_code == 403
+
+    response = client.get("/v1/cache/stats", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    stats = response.json()["data"]
+    assert stats["l1"]["hits"] >= 1
+    assert stats["l1"]["max_size"] == settings.CACHE_L1_MAX_SIZE
+    assert {"hits", "misses", "evictions"} <= set(stats["l2"])
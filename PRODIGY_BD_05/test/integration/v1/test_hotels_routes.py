@@ -5,6 +5,7 @@ Covered Endpoints:
 - POST   /v1/hotels
 - PUT    /v1/hotels/{hotel_id}
 - GET    /v1/hotels
+- GET    /v1/hotels/search
 
 RBAC Covered:
 --------------
@@ -17,10 +18,27 @@ Update Scenarios:
 ✔ Update success (owner)
 ✔ Update hotel not found (404)
 ✔ Update by non-owner (403)
+✔ Stale If-Match rejected (412), ETag returned
+✔ Concurrent write between read and update rejected (409)
 
 Listing:
 --------
 ✔ List hotels (public access)
+✔ Cursor pagination walks every hotel exactly once
+✔ Invalid cursor (400)
+
+Search:
+-------
+✔ Ranked full-text search (with and without the search index)
+✔ Accent-insensitive search (with and without the search index)
+✔ Search results are paginated
+✔ Updated hotels are re-indexed (with and without the search index)
+✔ Without the search index, matches come from the FTS5 index, not a table scan
+✔ Empty query rejected (422)
+
+Availability:
+-------------
+✔ Free room count and min / max free price per hotel
 
 Security Validation:
 - Role-based access control
@@ -31,6 +49,16 @@ Goal:
 Guarantee RBAC correctness and hotel ownership integrity.
 """
 
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.domain.models.hotels import Hotel
+from app.infrastructure.indexes.hotel_search_index import get_hotel_search_index
+from app.infrastructure.repositories.hotel_repository import HotelRepository
+
+
 def create_hotel(client, token):
     res = client.post(
         "/v1/hotels",
@@ -102,4 +130,196 @@ def test_update_hotel_not_owner(client, owner_token, create_user):
 
 def test_list_hotels(client):
     res = client.get("/v1/hotels")
-    assert res.status_code == 200
\ No newline at end of file
+    assert res.status_code == 200
+
+
+def test_list_hotels_pagination(client, owner_token):
+    created = {create_hotel(client, owner_token).json()["data"]["id"] for _ in range(5)}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/v1/hotels", params=params)
+        assert res.status_code == 200
+        assert len(res.json()["data"]) <= 2
+
+        seen += [hotel["id"] for hotel in res.json()["data"]]
+        cursor = res.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(created)
+    assert set(seen) == created
+
+
+def test_list_hotels_invalid_cursor(client):
+    res = client.get("/v1/hotels", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+
+def test_hotels_availability(client, owner_token, user_token):
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    hotel_id = create_hotel(client, owner_token).json()["data"]["id"]
+    empty_hotel_id = create_hotel(client, owner_token).json()["data"]["id"]
+
+    room_ids = []
+    for price in (80, 120, 200):
+        res = client.post(
+            f"/v1/rooms/hotel/{hotel_id}",
+            json={"title": f"Room {price}", "price_per_night": price, "capacity": 2},
+            headers=headers,
+        )
+        room_ids.append(res.json()["data"]["id"])
+
+    check_in = date.today() + timedelta(days=3)
+    check_out = check_in + timedelta(days=2)
+    client.post(
+        "/v1/bookings",
+        json={"room_id": room_ids[2], "check_in_date": str(check_in), "check_out_date": str(check_out)},
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    res = client.get("/v1/hotels/availability", params={"check_in": str(check_in), "check_out": str(check_out)})
+    assert res.status_code == 200
+
+    summary = {hotel["hotel_id"]: hotel for hotel in res.json()["data"]}
+    assert summary[hotel_id]["free_rooms"] == 2
+    assert summary[hotel_id]["min_price"] == 80
+    assert summary[hotel_id]["max_price"] == 120
+    assert summary[empty_hotel_id]["free_rooms"] == 0
+    assert summary[empty_hotel_id]["min_price"] is None
+
+
+def seed_search_hotels(client, owner_token):
+    hotels = [
+        ("Hôtel Ivoire", "Grande piscine et spa", "Cocody, Abidjan"),
+        ("Pool Side Lodge", "Rooftop pool", "Plateau, Abidjan"),
+        ("Plateau Business", "Salles de réunion", "Plateau, Abidjan"),
+        ("Dakar Beach", "Pool on the beach", "Dakar"),
+    ]
+    for name, description, address in hotels:
+        client.post(
+            "/v1/hotels",
+            json={"name": name, "description": description, "address": address},
+            headers={"Authorization": f"Bearer {owner_token}"}
+        )
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_hotels(client, owner_token, index_loaded):
+    if index_loaded:
+        get_hotel_search_index().load([])
+    seed_search_hotels(client, owner_token)
+
+    res = client.get("/v1/hotels/search", params={"q": "abidjan pool"})
+    assert res.status_code == 200
+
+    names = [hotel["name"] for hotel in res.json()["data"]]
+    # Both terms first, then one of them
+    assert names[0] == "Pool Side Lodge"
+    assert set(names) == {"Pool Side Lodge", "Hôtel Ivoire", "Plateau Business", "Dakar Beach"}
+
+    res = client.get("/v1/hotels/search", params={"q": "PISCINE"})
+    assert [hotel["name"] for hotel in res.json()["data"]] == ["Hôtel Ivoire"]
+
+    res = client.get("/v1/hotels/search", params={"q": "nowhere"})
+    assert res.json()["data"] == []
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_hotels_accent_folding(client, owner_token, index_loaded):
+    if index_loaded:
+        get_hotel_search_index().load([])
+    seed_search_hotels(client, owner_token)
+
+    res = client.get("/v1/hotels/search", params={"q": "hotel reunion"})
+    assert {hotel["name"] for hotel in res.json()["data"]} == {"Hôtel Ivoire", "Plateau Business"}
+
+
+def test_search_hotels_pagination(client, owner_token):
+    seed_search_hotels(client, owner_token)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "abidjan pool", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/v1/hotels/search", params=params).json()
+        seen += [hotel["name"] for hotel in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 4
+    assert len(set(seen)) == 4
+    assert seen[0] == "Pool Side Lodge"
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_hotels_after_update(client, owner_token, index_loaded):
+    if index_loaded:
+        get_hotel_search_index().load([])
+    hotel_id = create_hotel(client, owner_token).json()["data"]["id"]
+
+    client.put(
+        f"/v1/hotels/{hotel_id}",
+        json={"description": "Now with a sauna"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+
+    res = client.get("/v1/hotels/search", params={"q": "sauna"})
+    assert [hotel["id"] for hotel in res.json()["data"]] == [hotel_id]
+
+
+def test_search_hotels_uses_fulltext_index(db, client, owner_token):
+    seed_search_hotels(client, owner_token)
+    matches = HotelRepository(db)._search_matches("abidjan pool")
+    sql = str(select(matches).compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+    assert "VIRTUAL TABLE INDEX" in plan
+    assert "hotels " not in plan
+
+
+def test_search_hotels_empty_query(client):
+    assert client.get("/v1/hotels/search", params={"q": ""}).status_code == 422
+
+
+def test_update_hotel_if_match(client, owner_token):
+    hotel = create_hotel(client, owner_token).json()["data"]
+    assert hotel["version"] == 1
+    headers = {"Authorization": f"Bearer {owner_token}"}
+
+    res = client.put(f"/v1/hotels/{hotel['id']}", json={"name": "V2"}, headers={**headers, "If-Match": '"1"'})
+    assert res.status_code == 200
+    assert res.headers["ETag"] == '"2"'
+
+    res = client.put(f"/v1/hotels/{hotel['id']}", json={"name": "Lost"}, headers={**headers, "If-Match": '"1"'})
+    assert res.status_code == 412
+
+    res = client.put(f"/v1/hotels/{hotel['id']}", json={"name": "V3"}, headers={**headers, "If-Match": "*"})
+    assert res.status_code == 200
+
+
+def test_update_hotel_concurrent_write(client, owner_token, monkeypatch):
+    hotel_id = create_hotel(client, owner_token).json()["data"]["id"]
+    get_by_id = HotelRepository.get_by_id
+
+    def read_then_concurrent_write(self, hotel_id):
+        hotel = get_by_id(self, hotel_id)
+        self.db.execute(update(Hotel).where(Hotel.id == hotel_id).values(version=Hotel.version + 1).execution_options(synchronize_session=False))
+        return hotel
+
+    monkeypatch.setattr(HotelRepository, "get_by_id", read_then_concurrent_write)
+
+    res = client.put(
+        f"/v1/hotels/{hotel_id}",
+        json={"name": "Lost update"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    assert res.status_code == 409
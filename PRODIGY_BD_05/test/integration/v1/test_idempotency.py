@@ -0,0 +1,218 @@
+"""
+Integration tests for the Idempotency-Key header (v1).
+
+Covered Endpoints:
+- POST   /v1/bookings
+- POST   /v1/hotels
+
+Scenarios Covered:
+------------------
+✔ Retry with the same key replays the first response (no second booking)
+✔ Retry of a failed request replays the same error
+✔ Transient 5xx errors are not stored: the retry runs again
+✔ Result stored between the GET and the lock: replayed, not run again
+✔ A lock taken over by a duplicate after the lock TTL is never released
+✔ Same key with a different payload rejected (422)
+✔ Keys are scoped per user
+✔ Concurrent duplicate waits for the in-flight result
+✔ Duplicate still in flight after the wait timeout (409)
+✔ Requests without the header are unaffected
+
+Goal:
+Guarantee client retries never create duplicates.
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.schemas.booking_schema import BookingBatchCreate
+from app.application.services.v1.idempotency_service import IdempotencyService
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.domain.models.booking import Booking
+from app.domain.models.hotels import Hotel
+from app.utils.response import ApiResponse
+
+
+def create_room(client, owner_token):
+    hotel = client.post(
+        "/v1/hotels",
+        json={"name": "Hotel I", "description": "Nice", "address": "Abidjan"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    room = client.post(
+        f"/v1/rooms/hotel/{hotel.json()['data']['id']}",
+        json={"title": "Room I", "description": "Nice", "price_per_night": 100, "capacity": 2},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    return room.json()["data"]["id"]
+
+
+def booking_payload(room_id, start=1):
+    return {
+        "room_id": room_id,
+        "check_in_date": str(date.today() + timedelta(days=start)),
+        "check_out_date": str(date.today() + timedelta(days=start + 2)),
+    }
+
+
+def post_booking(client, token, payload, key=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if key:
+        headers["Idempotency-Key"] = key
+    return client.post("/v1/bookings", json=payload, headers=headers)
+
+
+def test_retry_replays_response(db, client, user_token, owner_token):
+    room_id = create_room(client, owner_token)
+
+    first = post_booking(client, user_token, booking_payload(room_id), "retry-1")
+    retry = post_booking(client, user_token, booking_payload(room_id), "retry-1")
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert db.query(Booking).count() == 1
+
+
+def test_retry_replays_error(client, user_token, owner_token):
+    room_id = create_room(client, owner_token)
+    assert post_booking(client, user_token, booking_payload(room_id)).status_code == 200
+
+    first = post_booking(client, user_token, booking_payload(room_id), "retry-2")
+    retry = post_booking(client, user_token, booking_payload(room_id), "retry-2")
+
+    assert first.status_code == retry.status_code == 400
+    assert retry.json() == first.json()
+
+
+def test_retry_after_server_error_runs_again():
+    service = IdempotencyService()
+    payload = BookingBatchCreate.model_construct(bookings=[])
+    outcomes = [HTTPException(status_code=503, detail="Room is busy, please retry"), None]
+
+    def execute():
+        error = outcomes.pop(0)
+        if error is not None:
+            raise error
+        return ApiResponse(code=201, message="Created", data="booked")
+
+    with pytest.raises(HTTPException):
+        service.run("bookings", "user-1", "busy", payload, execute)
+
+    assert service.run("bookings", "user-1", "busy", payload, execute).data == "booked"
+    assert outcomes == []
+    assert service.run("bookings", "user-1", "busy", payload, execute)["data"] == "booked"
+
+
+def test_result_stored_before_lock_is_replayed(monkeypatch):
+    service = IdempotencyService()
+    payload = BookingBatchCreate.model_construct(bookings=[])
+    service.run("bookings", "user-1", "race", payload, lambda: ApiResponse(code=201, message="Created", data=1))
+
+    # Le premier GET ne voit pas encore le résultat (stocké juste après, verrou rendu)
+    redis = get_redis()
+    real_get, calls = redis.get, []
+
+    def get(key):
+        calls.append(key)
+        return None if len(calls) == 1 else real_get(key)
+
+    monkeypatch.setattr(redis, "get", get)
+
+    result = service.run("bookings", "user-1", "race", payload, lambda: pytest.fail("must not run twice"))
+
+    assert result["data"] == 1
+    assert len(calls) == 2  # GET manqué, SET NX, puis GET de contrôle
+    assert "idempotency:bookings:user-1:race:lock" not in redis.store
+
+
+def test_keeps_lock_of_other_request():
+    service = IdempotencyService()
+    payload = BookingBatchCreate.model_construct(bookings=[])
+    redis = get_redis()
+    lock_key = "idempotency:bookings:user-1:slow:lock"
+
+    def execute():
+        # IDEMPOTENCY_LOCK_TTL dépassé : un doublon a pris le verrou entre-temps
+        redis.store[lock_key] = "their-token"
+        return ApiResponse(code=201, message="Created", data=1)
+
+    service.run("bookings", "user-1", "slow", payload, execute)
+
+    assert redis.get(lock_key) == "their-token"
+
+
+def test_key_reused_with_other_payload(client, user_token, owner_token):
+    room_id = create_room(client, owner_token)
+    post_booking(client, user_token, booking_payload(room_id), "retry-3")
+
+    res = post_booking(client, user_token, booking_payload(room_id, start=5), "retry-3")
+    assert res.status_code == 422
+
+
+def test_keys_scoped_per_user(client, user_token, owner_token):
+    room_id = create_room(client, owner_token)
+
+    assert post_booking(client, user_token, booking_payload(room_id), "shared").status_code == 200
+    # Même clé, autre utilisateur : exécutée, donc conflit
+    assert post_booking(client, owner_token, booking_payload(room_id), "shared").status_code == 400
+
+
+def test_concurrent_duplicate_waits_for_result():
+    service = IdempotencyService()
+    payload = BookingBatchCreate.model_construct(bookings=[])
+    calls = []
+
+    def execute():
+        calls.append(1)
+        time.sleep(0.2)
+        return ApiResponse(code=201, message="Created", data=len(calls))
+
+    results = [None, None]
+
+    def request(i):
+        results[i] = service.run("bookings", "user-1", "concurrent", payload, execute)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [result["data"] if isinstance(result, dict) else result.data for result in results] == [1, 1]
+
+
+def test_duplicate_in_flight_timeout(client, user_token, owner_token, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT", 0.2)
+    room_id = create_room(client, owner_token)
+    user_id = post_booking(client, user_token, booking_payload(room_id, start=10)).json()["data"]["user_id"]
+
+    get_redis().set(f"idempotency:bookings:{user_id}:stuck:lock", "1", nx=True, ex=30)
+
+    res = post_booking(client, user_token, booking_payload(room_id), "stuck")
+    assert res.status_code == 409
+
+
+def test_hotel_creation_idempotent(db, client, owner_token):
+    headers = {"Authorization": f"Bearer {owner_token}", "Idempotency-Key": "hotel-1"}
+    payload = {"name": "Once", "description": "Only once", "address": "Abidjan"}
+
+    first = client.post("/v1/hotels", json=payload, headers=headers)
+    retry = client.post("/v1/hotels", json=payload, headers=headers)
+
+    assert first.json()["data"]["id"] == retry.json()["data"]["id"]
+    assert db.query(Hotel).filter(Hotel.name == "Once").count() == 1
+
+
+def test_without_key(db, client, owner_token):
+    payload = {"name": "Twice", "description": None, "address": "Abidjan"}
+    for _ in range(2):
+        client.post("/v1/hotels", json=payload, headers={"Authorization": f"Bearer {owner_token}"})
+
+    assert db.query(Hotel).filter(Hotel.name == "Twice").count() == 2
@@ -7,6 +7,8 @@ Covered Endpoints:
 - PATCH  /v1/rooms/{room_id}/availability
 - DELETE /v1/rooms/{room_id}
 - GET    /v1/rooms/search
+- GET    /v1/rooms/{room_id}/calendar
+- GET    /v1/rooms/hotel/{hotel_id}/calendar
 
 RBAC Covered:
 --------------
@@ -21,9 +23,33 @@ Availability:
 --------------
 ✔ Toggle room availability
 
+Optimistic Concurrency:
+-----------------------
+✔ Updates bump the version and return it as ETag
+✔ Stale If-Match rejected (412) on update and toggle
+✔ Concurrent write between read and update rejected (409)
+
+Search:
+-------
+✔ Flexible-date search returns one result per shifted window
+✔ Flexible-date search caps each window at limit, rejects a cursor (400)
+✔ Capacity / price / hotel filters and sort (SQL path and index path)
+✔ Filtered searches do not share cache entries
+✔ Invalid price range (400)
+✔ Cursor pagination of sorted search results (SQL path and index path)
+✔ Top-K cheapest free rooms
+✔ Group search: hotels hosting a party with the cheapest combination
+
+Calendar:
+---------
+✔ Room month view reflects bookings
+✔ Hotel month view ORs / ANDs room bitmaps
+✔ Invalid month (400)
+
 Error Handling:
 ---------------
 ✔ Room not found (404)
+✔ Malformed room / hotel id (404, not 500), no cache key left behind
 ✔ Invalid date range search (400)
 
 Goal:
@@ -31,6 +57,17 @@ Ensure room lifecycle management is secure and ownership-protected.
 """
 
 
+from datetime import date, timedelta
+
+import pytest
+
+from sqlalchemy import update
+
+from app.core.redis import get_redis
+from app.domain.models.rooms import Room
+from app.infrastructure.indexes.availability_index import get_availability_index
+from app.infrastructure.repositories.room_repository import RoomRepository
+
 
 def create_hotel(client, token):
     res = client.post(
@@ -116,6 +153,52 @@ def test_toggle_availability(client, owner_token):
     assert res.status_code == 200
 
 
+def test_update_room_if_match(client, owner_token):
+    hotel_id = create_hotel(client, owner_token)
+    room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+    headers = {"Authorization": f"Bearer {owner_token}"}
+
+    res = client.put(f"/v1/rooms/{room_id}", json={"title": "V2"}, headers={**headers, "If-Match": '"1"'})
+    assert res.status_code == 200
+    assert res.json()["data"]["version"] == 2
+    assert res.headers["ETag"] == '"2"'
+
+    # Un autre client a encore la version 1
+    res = client.put(f"/v1/rooms/{room_id}", json={"title": "Lost"}, headers={**headers, "If-Match": '"1"'})
+    assert res.status_code == 412
+
+    res = client.patch(f"/v1/rooms/{room_id}/availability", headers={**headers, "If-Match": 'W/"1"'})
+    assert res.status_code == 412
+
+    res = client.patch(f"/v1/rooms/{room_id}/availability", headers={**headers, "If-Match": '"2"'})
+    assert res.status_code == 200
+    assert res.headers["ETag"] == '"3"'
+
+    res = client.put(f"/v1/rooms/{room_id}", json={"title": "V4"}, headers={**headers, "If-Match": "abc"})
+    assert res.status_code == 400
+
+
+def test_update_room_concurrent_write(client, owner_token, monkeypatch):
+    hotel_id = create_hotel(client, owner_token)
+    room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+    get_by_id = RoomRepository.get_by_id
+
+    def read_then_concurrent_write(self, room_id):
+        room = get_by_id(self, room_id)
+        # Un autre propriétaire écrit entre la lecture et l'UPDATE
+        self.db.execute(update(Room).where(Room.id == room_id).values(version=Room.version + 1).execution_options(synchronize_session=False))
+        return room
+
+    monkeypatch.setattr(RoomRepository, "get_by_id", read_then_concurrent_write)
+
+    res = client.put(
+        f"/v1/rooms/{room_id}",
+        json={"title": "Lost update"},
+        headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    assert res.status_code == 409
+
+
 def test_delete_room_success(client, owner_token):
     hotel_id = create_hotel(client, owner_token)
     room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
@@ -152,4 +235,280 @@ def test_search_invalid_date(client):
             "check_out": "2026-05-01"
         }
     )
-    assert res.status_code == 400
\ No newline at end of file
+    assert res.status_code == 400
+
+
+def test_search_flex_days(client, owner_token, user_token):
+    hotel_id = create_hotel(client, owner_token)
+    room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+
+    check_in = date.today() + timedelta(days=10)
+    res = client.post(
+        "/v1/bookings",
+        json={
+            "room_id": room_id,
+            "check_in_date": str(check_in),
+            "check_out_date": str(check_in + timedelta(days=2)),
+        },
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+    assert res.status_code == 200
+
+    res = client.get(
+        "/v1/rooms/search",
+        params={
+            "check_in": str(check_in),
+            "check_out": str(check_in + timedelta(days=2)),
+            "flex_days": 3,
+        }
+    )
+    assert res.status_code == 200
+
+    windows = res.json()["data"]
+    assert len(windows) == 7
+    free = {window["check_in"]: [room["id"] for room in window["rooms"]] for window in windows}
+    assert free[str(check_in)] == []
+    assert free[str(check_in - timedelta(days=1))] == []
+    assert free[str(check_in - timedelta(days=2))] == [room_id]
+    assert free[str(check_in + timedelta(days=2))] == [room_id]
+
+
+def test_search_flex_days_limit(client, owner_token):
+    hotel_id = create_hotel(client, owner_token)
+    for _ in range(3):
+        create_room(client, owner_token, hotel_id)
+
+    params = {
+        "check_in": str(date.today() + timedelta(days=10)),
+        "check_out": str(date.today() + timedelta(days=12)),
+        "flex_days": 2,
+        "limit": 2,
+    }
+    res = client.get("/v1/rooms/search", params=params)
+    assert res.status_code == 200
+    assert [len(window["rooms"]) for window in res.json()["data"]] == [2] * 5
+
+    res = client.get("/v1/rooms/search", params={**params, "cursor": "abc"})
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_filters_and_sort(client, owner_token, index_loaded):
+    if index_loaded:
+        get_availability_index().load([])
+
+    hotel_id = create_hotel(client, owner_token)
+    other_hotel_id = create_hotel(client, owner_token)
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    for target, title, price, capacity in (
+        (hotel_id, "Cheap", 40, 1),
+        (hotel_id, "Family", 120, 4),
+        (hotel_id, "Suite", 300, 2),
+        (other_hotel_id, "Other", 90, 3),
+    ):
+        res = client.post(
+            f"/v1/rooms/hotel/{target}",
+            json={"title": title, "price_per_night": price, "capacity": capacity},
+            headers=headers,
+        )
+        assert res.status_code == 200
+
+    params = {
+        "check_in": str(date.today() + timedelta(days=1)),
+        "check_out": str(date.today() + timedelta(days=3)),
+    }
+
+    res = client.get("/v1/rooms/search", params=params)
+    assert len(res.json()["data"]) == 4
+
+    res = client.get("/v1/rooms/search", params={**params, "min_capacity": 2, "sort": "price"})
+    assert [room["title"] for room in res.json()["data"]] == ["Other", "Family", "Suite"]
+
+    res = client.get("/v1/rooms/search", params={**params, "min_price": 50, "max_price": 200, "sort": "capacity"})
+    assert [room["title"] for room in res.json()["data"]] == ["Other", "Family"]
+
+    res = client.get("/v1/rooms/search", params={**params, "hotel_id": hotel_id, "sort": "price"})
+    assert [room["title"] for room in res.json()["data"]] == ["Cheap", "Family", "Suite"]
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_pagination(client, owner_token, index_loaded):
+    if index_loaded:
+        get_availability_index().load([])
+
+    hotel_id = create_hotel(client, owner_token)
+    for price in (90, 10, 50, 50, 70):
+        client.post(
+            f"/v1/rooms/hotel/{hotel_id}",
+            json={"title": f"Room {price}", "price_per_night": price, "capacity": 2},
+            headers={"Authorization": f"Bearer {owner_token}"},
+        )
+
+    params = {
+        "check_in": str(date.today() + timedelta(days=1)),
+        "check_out": str(date.today() + timedelta(days=3)),
+        "sort": "price",
+        "limit": 2,
+    }
+
+    prices = []
+    pages = 0
+    while True:
+        res = client.get("/v1/rooms/search", params=params)
+        assert res.status_code == 200
+        prices += [room["price_per_night"] for room in res.json()["data"]]
+        pages += 1
+
+        if res.json()["next_cursor"] is None:
+            break
+        params["cursor"] = res.json()["next_cursor"]
+
+    assert prices == [10, 50, 50, 70, 90]
+    assert pages == 3
+
+
+@pytest.mark.parametrize("index_loaded", [False, True])
+def test_search_top_cheapest(client, owner_token, user_token, index_loaded):
+    if index_loaded:
+        get_availability_index().load([])
+
+    hotel_id = create_hotel(client, owner_token)
+    room_ids = {}
+    for price in (90, 10, 50, 30, 70):
+        res = client.post(
+            f"/v1/rooms/hotel/{hotel_id}",
+            json={"title": f"Room {price}", "price_per_night": price, "capacity": 2},
+            headers={"Authorization": f"Bearer {owner_token}"},
+        )
+        room_ids[price] = res.json()["data"]["id"]
+
+    check_in = date.today() + timedelta(days=1)
+    client.post(
+        "/v1/bookings",
+        json={
+            "room_id": room_ids[10],
+            "check_in_date": str(check_in),
+            "check_out_date": str(check_in + timedelta(days=2)),
+        },
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    res = client.get(
+        "/v1/rooms/search/top",
+        params={"check_in": str(check_in), "check_out": str(check_in + timedelta(days=2)), "k": 3},
+    )
+    assert res.status_code == 200
+    assert [room["price_per_night"] for room in res.json()["data"]] == [30, 50, 70]
+
+
+def test_search_group(client, owner_token, user_token):
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    big_hotel = create_hotel(client, owner_token)
+    small_hotel = create_hotel(client, owner_token)
+
+    room_ids = {}
+    for hotel_id, title, price, capacity in (
+        (big_hotel, "Dorm", 200, 6),
+        (big_hotel, "Family", 120, 4),
+        (big_hotel, "Double", 60, 2),
+        (big_hotel, "Double bis", 70, 2),
+        (small_hotel, "Single", 30, 1),
+        (small_hotel, "Double", 50, 2),
+    ):
+        res = client.post(
+            f"/v1/rooms/hotel/{hotel_id}",
+            json={"title": title, "price_per_night": price, "capacity": capacity},
+            headers=headers,
+        )
+        room_ids[(hotel_id, title)] = res.json()["data"]["id"]
+
+    check_in = date.today() + timedelta(days=5)
+    check_out = check_in + timedelta(days=2)
+    client.post(
+        "/v1/bookings",
+        json={
+            "room_id": room_ids[(big_hotel, "Double bis")],
+            "check_in_date": str(check_in),
+            "check_out_date": str(check_out),
+        },
+        headers={"Authorization": f"Bearer {user_token}"}
+    )
+
+    res = client.get(
+        "/v1/rooms/search/group",
+        params={"check_in": str(check_in), "check_out": str(check_out), "party_size": 8},
+    )
+    assert res.status_code == 200
+
+    data = res.json()["data"]
+    assert [hotel["hotel_id"] for hotel in data] == [big_hotel]
+    assert data[0]["free_capacity"] == 12
+    assert data[0]["price_per_night"] == 260
+    assert sorted(room["title"] for room in data[0]["rooms"]) == ["Dorm", "Double"]
+
+
+def test_search_invalid_price_range(client):
+    res = client.get(
+        "/v1/rooms/search",
+        params={
+            "check_in": str(date.today() + timedelta(days=1)),
+            "check_out": str(date.today() + timedelta(days=3)),
+            "min_price": 200,
+            "max_price": 100,
+        }
+    )
+    assert res.status_code == 400
+
+
+def test_room_calendar(client, owner_token, user_token):
+    hotel_id = create_hotel(client, owner_token)
+    room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+    other_room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+
+    check_in = date.today() + timedelta(days=40)
+    month = f"{check_in.year:04d}-{check_in.month:02d}"
+    for booked_room_id, nights in ((room_id, 2), (other_room_id, 1)):
+        res = client.post(
+            "/v1/bookings",
+            json={
+                "room_id": booked_room_id,
+                "check_in_date": str(check_in),
+                "check_out_date": str(check_in + timedelta(days=nights)),
+            },
+            headers={"Authorization": f"Bearer {user_token}"}
+        )
+        assert res.status_code == 200
+
+    res = client.get(f"/v1/rooms/{room_id}/calendar", params={"month": month})
+    assert res.status_code == 200
+    booked = [day["date"] for day in res.json()["data"]["days"] if day["booked"]]
+    assert booked[0] == str(check_in)
+    assert res.json()["data"]["bitmap"] >> (check_in.day - 1) & 1
+
+    res = client.get(f"/v1/rooms/hotel/{hotel_id}/calendar", params={"month": month})
+    assert res.status_code == 200
+    data = res.json()["data"]
+    day = data["days"][check_in.day - 1]
+    assert data["rooms"] == 2
+    assert day["any_booked"] and day["fully_booked"]
+    assert data["fully_booked"] & ~data["any_booked"] == 0
+
+
+def test_room_calendar_invalid_month(client, owner_token):
+    hotel_id = create_hotel(client, owner_token)
+    room_id = create_room(client, owner_token, hotel_id).json()["data"]["id"]
+
+    res = client.get(f"/v1/rooms/{room_id}/calendar", params={"month": "2026-13"})
+    assert res.status_code == 400
+
+
+def test_room_calendar_not_found(client):
+    res = client.get("/v1/rooms/11111111-1111-1111-1111-111111111111/calendar")
+    assert res.status_code == 404
+
+
+def test_malformed_ids_not_found(client):
+    for path in ("/v1/rooms/not-a-uuid/calendar", "/v1/rooms/hotel/zzz/calendar", "/v1/rooms/hotel/zzz"):
+        assert client.get(path).status_code == 404
+
+    assert not [key for key in get_redis().store if "zzz" in key or "not-a-uuid" in key]
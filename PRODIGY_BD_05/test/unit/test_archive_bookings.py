@@ -0,0 +1,71 @@
+"""
+Unit tests for the booking archival command.
+
+Scenarios Covered:
+
+✔ Stays checked out before the cutoff move to bookings_archive
+✔ Their room nights are deleted, current stays keep theirs
+✔ Columns (status, dates, created_at) are preserved
+✔ Running the archival twice is a no-op
+
+Goal:
+Guarantee the hot bookings table only keeps current and future stays.
+"""
+
+from datetime import date
+
+from app.cli.archive_bookings import archive_bookings
+from app.domain.models.booking import Booking, BookingStatus
+from app.domain.models.booking_archive import BookingArchive
+from app.domain.models.hotels import Hotel
+from app.domain.models.room_nights import RoomNight
+from app.domain.models.rooms import Room
+from app.domain.models.users import User
+from app.infrastructure.repositories.booking_repository import BookingRepository
+
+
+def seed_bookings(db):
+    owner = User(email="owner@archive.test", hashed_password="x", role="owner")
+    db.add(owner)
+    db.flush()
+
+    hotel = Hotel(name="Archive Hotel", address="Abidjan", owner_id=owner.id)
+    db.add(hotel)
+    db.flush()
+
+    room = Room(hotel_id=hotel.id, title="Room", price_per_night=50, capacity=2)
+    db.add(room)
+    db.flush()
+
+    repo = BookingRepository(db)
+    bookings = [
+        repo.create(Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2020, 1, 1), check_out_date=date(2020, 1, 4))),
+        repo.create(Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2020, 2, 1), check_out_date=date(2020, 2, 3))),
+        repo.create(Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 1), check_out_date=date(2030, 1, 3))),
+    ]
+    repo.cancel_owned(bookings[1].id, owner.id)
+    return [booking.id for booking in bookings]
+
+
+def test_archive_bookings(db):
+    past_id, cancelled_id, current_id = seed_bookings(db)
+
+    assert archive_bookings(db, date(2025, 1, 1), batch_size=1) == 2
+
+    assert [booking.id for booking in db.query(Booking).all()] == [current_id]
+    assert {row.id for row in db.query(BookingArchive).all()} == {past_id, cancelled_id}
+    assert {night.booking_id for night in db.query(RoomNight).all()} == {current_id}
+
+    archived = db.query(BookingArchive).filter(BookingArchive.id == cancelled_id).one()
+    assert archived.status == BookingStatus.CANCELLED
+    assert archived.check_in_date == date(2020, 2, 1)
+    assert archived.created_at is not None
+    assert archived.archived_at is not None
+
+
+def test_archive_bookings_is_idempotent(db):
+    seed_bookings(db)
+    archive_bookings(db, date(2025, 1, 1))
+
+    assert archive_bookings(db, date(2025, 1, 1)) == 0
+    assert db.query(BookingArchive).count() == 2
@@ -0,0 +1,177 @@
+"""
+Unit tests for the in-memory AvailabilityIndex.
+
+Scenarios Covered:
+
+✔ Free / busy checks on a single room (half-open intervals)
+✔ add / remove keep the index consistent
+✔ A lapsed hold counts as free before the sweeper releases it (like SQL)
+✔ Monthly occupancy bitmaps follow add / remove (overlaps included)
+✔ Index results match the SQL anti-join (reference) on random data
+✔ Batched window search matches the SQL anti-join
+✔ RoomRepository uses the index once loaded
+
+Goal:
+Guarantee the index and the SQL fallback always agree.
+"""
+
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+
+from app.domain.models.booking import Booking
+from app.domain.models.hotels import Hotel
+from app.domain.models.rooms import Room
+from app.domain.models.users import User
+from app.infrastructure.indexes.availability_index import AvailabilityIndex, get_availability_index
+from app.infrastructure.repositories.booking_repository import BookingRepository
+from app.infrastructure.repositories.room_repository import RoomRepository
+
+
+def seed(db, rooms_count=5, bookings_count=60):
+    rnd = random.Random(42)
+    owner = User(email="owner@index.test", hashed_password="x", role="owner")
+    db.add(owner)
+    db.flush()
+
+    hotel = Hotel(name="Index Hotel", address="Abidjan", owner_id=owner.id)
+    db.add(hotel)
+    db.flush()
+
+    rooms = [
+        Room(hotel_id=hotel.id, title=f"Room {i}", price_per_night=50 + i, capacity=2)
+        for i in range(rooms_count)
+    ]
+    db.add_all(rooms)
+    db.flush()
+
+    db.commit()
+
+    # Through the repository so room_nights is maintained; overlapping
+    # bookings are rejected by the (room_id, night) key.
+    repo = BookingRepository(db)
+    start = date(2030, 1, 1)
+    for _ in range(bookings_count):
+        check_in = start + timedelta(days=rnd.randint(0, 90))
+        try:
+            booking = repo.create(Booking(
+                user_id=owner.id,
+                room_id=rnd.choice(rooms).id,
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=rnd.randint(1, 7)),
+                status="confirmed",
+            ))
+        except IntegrityError:
+            continue
+        if rnd.random() < 0.3:
+            repo.cancel_owned(booking.id, owner.id)
+    return rooms
+
+
+def test_is_free_half_open_intervals():
+    index = AvailabilityIndex()
+    index.load([(uuid.uuid4(), "r1", date(2030, 1, 10), date(2030, 1, 15), None)])
+
+    assert index.is_free("r1", date(2030, 1, 5), date(2030, 1, 10))
+    assert index.is_free("r1", date(2030, 1, 15), date(2030, 1, 20))
+    assert not index.is_free("r1", date(2030, 1, 12), date(2030, 1, 13))
+    assert not index.is_free("r1", date(2030, 1, 1), date(2030, 1, 30))
+    assert index.is_free("unknown", date(2030, 1, 1), date(2030, 1, 30))
+
+
+def test_add_and_remove():
+    index = AvailabilityIndex()
+    index.load([])
+    booking_id = uuid.uuid4()
+
+    index.add(booking_id, "r1", date(2030, 1, 10), date(2030, 1, 15))
+    assert not index.is_free("r1", date(2030, 1, 11), date(2030, 1, 12))
+
+    index.remove(booking_id)
+    assert index.is_free("r1", date(2030, 1, 11), date(2030, 1, 12))
+
+
+def test_lapsed_hold_is_free():
+    index = AvailabilityIndex()
+    now = datetime.now(timezone.utc)
+    index.load([(uuid.uuid4(), "r1", date(2030, 1, 10), date(2030, 1, 15), now + timedelta(minutes=10))])
+    lapsed = uuid.uuid4()
+    # Hold expiré mais pas encore libéré par le sweeper (datetime naïf, comme SQLite)
+    index.add(lapsed, "r1", date(2030, 2, 1), date(2030, 2, 3), (now - timedelta(minutes=1)).replace(tzinfo=None))
+
+    assert not index.is_free("r1", date(2030, 1, 11), date(2030, 1, 12))
+    assert index.is_free("r1", date(2030, 2, 1), date(2030, 2, 3))
+    assert index.month_bitmap("r1", 2030, 2) == 0
+
+    index.remove(lapsed)  # libéré ensuite par le sweeper : sans effet
+
+
+def test_add_is_ignored_until_loaded():
+    index = AvailabilityIndex()
+    index.add(uuid.uuid4(), "r1", date(2030, 1, 10), date(2030, 1, 15))
+
+    index.load([])
+    assert index.is_free("r1", date(2030, 1, 11), date(2030, 1, 12))
+
+
+def test_month_bitmap():
+    index = AvailabilityIndex()
+    index.load([(uuid.uuid4(), "r1", date(2030, 1, 30), date(2030, 2, 2), None)])
+
+    assert index.month_bitmap("r1", 2030, 1) == 0b11 << 29
+    assert index.month_bitmap("r1", 2030, 2) == 0b1
+
+    overlapping = uuid.uuid4()
+    index.add(overlapping, "r1", date(2030, 2, 1), date(2030, 2, 3))
+    assert index.month_bitmap("r1", 2030, 2) == 0b11
+
+    index.remove(overlapping)
+    assert index.month_bitmap("r1", 2030, 2) == 0b1
+
+
+def test_index_matches_sql_reference(db):
+    seed(db)
+    rnd = random.Random(7)
+    room_repo = RoomRepository(db)
+    get_availability_index().load(BookingRepository(db).get_occupied_intervals())
+
+    for _ in range(200):
+        check_in = date(2030, 1, 1) + timedelta(days=rnd.randint(-5, 100))
+        check_out = check_in + timedelta(days=rnd.randint(1, 10))
+
+        expected = {room.id for room in room_repo.get_available_by_date_sql(check_in, check_out)}
+        actual = {room.id for room in room_repo.get_available_by_date(check_in, check_out)}
+
+        assert actual == expected
+
+    room_ids = [room.id for room in room_repo.get_all_rooms()]
+    for month in (1, 2, 3, 4):
+        from_index = room_repo.get_month_bitmaps(room_ids, 2030, month)
+        room_repo.availability.loaded = False
+        from_sql = room_repo.get_month_bitmaps(room_ids, 2030, month)
+        room_repo.availability.loaded = True
+
+        assert from_index == from_sql
+
+
+def test_windows_match_sql_reference(db):
+    seed(db)
+    room_repo = RoomRepository(db)
+    windows = [
+        (date(2030, 1, 20) + timedelta(days=shift), date(2030, 1, 23) + timedelta(days=shift))
+        for shift in range(-7, 8)
+    ]
+
+    for rooms, (check_in, check_out) in zip(room_repo.get_available_by_date_windows(windows), windows):
+        expected = {room.id for room in room_repo.get_available_by_date_sql(check_in, check_out)}
+        assert {room.id for room in rooms} == expected
+
+
+def test_repository_falls_back_to_sql_when_not_loaded(db):
+    rooms = seed(db, rooms_count=2, bookings_count=0)
+    room_repo = RoomRepository(db)
+
+    assert not room_repo.availability.loaded
+    assert len(room_repo.get_available_by_date(date(2030, 1, 1), date(2030, 1, 2))) == len(rooms)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the room_nights backfill command.
+
+Scenarios Covered:
+
+✔ Confirmed bookings without nights are backfilled
+✔ Cancelled bookings are ignored
+✔ Running the backfill twice is a no-op
+✔ Pre-existing double bookings are reported, not inserted
+
+Goal:
+Guarantee existing data can be migrated to the room_nights inventory.
+"""
+
+from datetime import date
+
+from app.cli.backfill_room_nights import backfill_room_nights
+from app.domain.models.booking import Booking
+from app.domain.models.hotels import Hotel
+from app.domain.models.room_nights import RoomNight
+from app.domain.models.rooms import Room
+from app.domain.models.users import User
+
+
+def seed_legacy_bookings(db):
+    """Bookings inserted directly, as before the room_nights table existed."""
+    owner = User(email="owner@backfill.test", hashed_password="x", role="owner")
+    db.add(owner)
+    db.flush()
+
+    hotel = Hotel(name="Backfill Hotel", address="Abidjan", owner_id=owner.id)
+    db.add(hotel)
+    db.flush()
+
+    room = Room(hotel_id=hotel.id, title="Room", price_per_night=50, capacity=2)
+    db.add(room)
+    db.flush()
+
+    bookings = [
+        Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 1), check_out_date=date(2030, 1, 4), status="confirmed"),
+        Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 4), check_out_date=date(2030, 1, 6), status="confirmed"),
+        Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 2), check_out_date=date(2030, 1, 3), status="cancelled"),
+        # Double booking made before the constraint existed
+        Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 5), check_out_date=date(2030, 1, 7), status="confirmed"),
+    ]
+    for booking in bookings:
+        db.add(booking)
+        db.flush()
+    db.commit()
+    return room, bookings
+
+
+def test_backfill_room_nights(db):
+    room, bookings = seed_legacy_bookings(db)
+    confirmed = {bookings[0].id, bookings[1].id, bookings[3].id}
+
+    backfilled, conflicts = backfill_room_nights(db, batch_size=1)
+
+    # One of the two overlapping bookings (the first in id order) keeps the night
+    assert len(backfilled) == 2
+    assert len(conflicts) == 1
+    assert conflicts[0] in {bookings[1].id, bookings[3].id}
+    assert set(backfilled) | set(conflicts) == confirmed
+
+    rows = db.query(RoomNight).filter(RoomNight.room_id == room.id).all()
+    by_id = {booking.id: booking for booking in bookings}
+    assert len(rows) == sum(
+        (by_id[booking_id].check_out_date - by_id[booking_id].check_in_date).days
+        for booking_id in backfilled
+    )
+    assert all(row.booking_id in backfilled for row in rows)
+
+
+def test_backfill_is_idempotent(db):
+    seed_legacy_bookings(db)
+    backfill_room_nights(db)
+    count = db.query(RoomNight).count()
+
+    backfilled, _ = backfill_room_nights(db)
+
+    assert backfilled == []
+    assert db.query(RoomNight).count() == count
@@ -0,0 +1,147 @@
+"""
+Unit tests for BookingRepository.has_conflict, cancel_owned and confirm_hold.
+
+Scenarios Covered:
+
+✔ Overlap detection (partial, containing, strictly contained)
+✔ Back-to-back stays do not conflict (half-open intervals)
+✔ Cancelled bookings are ignored
+✔ Live holds conflict, expired holds do not
+✔ cancel_owned: one UPDATE ... RETURNING, only for the owner, only once
+✔ cancel_owned falls back to UPDATE + SELECT without RETURNING support
+✔ confirm_hold never confirms a hold released meanwhile by the sweeper
+✔ SQLite query plan probes the partial ix_bookings_room_dates_occupying index
+
+Goal:
+Guarantee conflict detection is correct and a single index probe.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.domain.mixins.timestamp_mixin import utcnow
+from app.domain.models.booking import Booking, BookingStatus
+from app.domain.models.hotels import Hotel
+from app.domain.models.room_nights import RoomNight
+from app.domain.models.rooms import Room
+from app.domain.models.users import User
+from app.infrastructure.repositories.booking_repository import BookingRepository
+
+
+@pytest.fixture
+def room(db):
+    owner = User(email="owner@conflict.test", hashed_password="x", role="owner")
+    db.add(owner)
+    db.flush()
+
+    hotel = Hotel(name="Conflict Hotel", address="Abidjan", owner_id=owner.id)
+    db.add(hotel)
+    db.flush()
+
+    room = Room(hotel_id=hotel.id, title="Room", price_per_night=50, capacity=2)
+    db.add(room)
+    db.flush()
+
+    repo = BookingRepository(db)
+    repo.create(Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 1, 10), check_out_date=date(2030, 1, 15), status="confirmed"))
+    cancelled = repo.create(Booking(user_id=owner.id, room_id=room.id, check_in_date=date(2030, 2, 1), check_out_date=date(2030, 2, 5), status="confirmed"))
+    repo.cancel_owned(cancelled.id, owner.id)
+    return room
+
+
+@pytest.mark.parametrize("check_in, check_out, expected", [
+    (date(2030, 1, 8), date(2030, 1, 11), True),    # chevauche le début
+    (date(2030, 1, 14), date(2030, 1, 20), True),   # chevauche la fin
+    (date(2030, 1, 5), date(2030, 1, 20), True),    # contient la réservation
+    (date(2030, 1, 11), date(2030, 1, 13), True),   # strictement contenu
+    (date(2030, 1, 5), date(2030, 1, 10), False),   # départ le jour de l'arrivée
+    (date(2030, 1, 15), date(2030, 1, 18), False),  # arrivée le jour du départ
+    (date(2030, 2, 2), date(2030, 2, 3), False),    # réservation annulée
+])
+def test_has_conflict(db, room, check_in, check_out, expected):
+    assert BookingRepository(db).has_conflict(room.id, check_in, check_out) is expected
+
+
+def test_has_conflict_with_holds(db, room):
+    repo = BookingRepository(db)
+    for month, expires_at in ((3, utcnow() + timedelta(minutes=10)), (4, utcnow() - timedelta(minutes=1))):
+        repo.create(Booking(
+            user_id=room.hotel.owner_id,
+            room_id=room.id,
+            check_in_date=date(2030, month, 1),
+            check_out_date=date(2030, month, 3),
+            status="held",
+            expires_at=expires_at,
+        ))
+
+    assert repo.has_conflict(room.id, date(2030, 3, 2), date(2030, 3, 4)) is True
+    assert repo.has_conflict(room.id, date(2030, 4, 2), date(2030, 4, 4)) is False
+
+
+@pytest.mark.parametrize("update_returning", [True, False])
+def test_cancel_owned(db, room, monkeypatch, update_returning):
+    monkeypatch.setattr(db.get_bind().dialect, "update_returning", update_returning)
+    repo = BookingRepository(db)
+    owner_id = room.hotel.owner_id
+    booking_id = repo.create(Booking(user_id=owner_id, room_id=room.id, check_in_date=date(2030, 5, 1), check_out_date=date(2030, 5, 3))).id
+
+    assert repo.cancel_owned(booking_id, room.id) is None
+    assert db.query(RoomNight).filter(RoomNight.booking_id == booking_id).count() == 2
+
+    row = repo.cancel_owned(booking_id, owner_id)
+    assert (row.id, row.status, row.check_in_date) == (booking_id, BookingStatus.CANCELLED, date(2030, 5, 1))
+    assert db.query(RoomNight).filter(RoomNight.booking_id == booking_id).count() == 0
+    assert repo.has_conflict(room.id, date(2030, 5, 1), date(2030, 5, 3)) is False
+
+    # Déjà annulée : aucune réécriture
+    assert repo.cancel_owned(booking_id, owner_id) is None
+
+
+def test_confirm_hold_after_sweep(db, room):
+    repo = BookingRepository(db)
+    now = utcnow()
+    hold = repo.create(Booking(
+        user_id=room.hotel.owner_id,
+        room_id=room.id,
+        check_in_date=date(2030, 6, 1),
+        check_out_date=date(2030, 6, 3),
+        status="held",
+        expires_at=now + timedelta(minutes=10),
+    ))
+    hold_id = hold.id
+
+    # Le sweeper libère le hold entre le contrôle du service et la confirmation
+    assert repo.sweep_expired_holds(now + timedelta(minutes=11)) == [hold_id]
+
+    assert repo.confirm_hold(hold, now) is None
+    db.expire_all()
+    assert db.get(Booking, hold_id).status == BookingStatus.EXPIRED
+    assert db.query(RoomNight).filter(RoomNight.booking_id == hold_id).count() == 0
+
+
+def test_confirm_hold(db, room):
+    repo = BookingRepository(db)
+    hold = repo.create(Booking(
+        user_id=room.hotel.owner_id,
+        room_id=room.id,
+        check_in_date=date(2030, 6, 1),
+        check_out_date=date(2030, 6, 3),
+        status="held",
+        expires_at=utcnow() + timedelta(minutes=10),
+    ))
+
+    booking = repo.confirm_hold(hold, utcnow())
+
+    assert (booking.status, booking.expires_at) == (BookingStatus.CONFIRMED, None)
+    assert db.query(RoomNight).filter(RoomNight.booking_id == hold.id, RoomNight.expires_at.is_(None)).count() == 2
+
+
+def test_has_conflict_uses_overlap_index(db, room):
+    probe = BookingRepository(db).conflict_probe(room.id, date(2030, 1, 11), date(2030, 1, 13))
+    sql = str(probe.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+    assert "ix_bookings_room_dates_occupying" in plan
+    assert "SCAN" not in plan
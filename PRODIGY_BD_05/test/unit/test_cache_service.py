@@ -0,0 +1,243 @@
+"""
+Unit tests for CacheService invalidation (SCAN patterns, generations, tags).
+
+Scenarios Covered:
+
+✔ Only the matching keys are removed, across several SCAN pages
+✔ The number of removed keys is returned
+✔ KEYS is never called
+✔ The time budget stops the invalidation early
+✔ Versioned keys embed the namespace generation
+✔ bump() moves only the given namespaces to a new generation
+✔ A lost generation counter restarts above every previous one
+✔ Generation counters are created with a TTL
+✔ invalidate_tags removes only the entries carrying one of the tags
+✔ Tag sets drop their expired keys as they grow (SSCAN, no EXPIRE NX / GT)
+✔ night_tags covers the nights [check_in, check_out)
+✔ get_or_set: concurrent misses in a worker run the computation once
+✔ get_or_set: a worker waits for the key filled by the lock holder
+✔ get_or_set: computes itself if the lock holder never fills the key
+✔ get_or_set: XFetch refreshes a key early, stale value served meanwhile
+✔ get_or_set: the lock is released when the computation fails
+✔ get_or_set: a lock taken over by another worker is never released
+
+Goal:
+Guarantee invalidation never blocks Redis with a single KEYS call, and
+an expired key is recomputed once instead of by every request.
+"""
+
+import json
+import threading
+import time
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.application.services.v1 import cache_service
+from app.application.services.v1.cache_service import CacheService, night_tags
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    redis = get_redis()
+    monkeypatch.setattr(redis, "keys", lambda pattern: pytest.fail("KEYS must not be used"))
+    for i in range(25):
+        redis.setex(f"rooms:search:{i}", 60, "[]")
+        redis.setex(f"hotels:all:{i}", 60, "[]")
+
+    cache = CacheService()
+    cache.scan_count = 4
+    cache.unlink_batch = 10
+    return cache
+
+
+def test_invalidate_pattern(cache):
+    assert cache.invalidate_pattern("rooms:*") == 25
+
+    remaining = get_redis().store
+    assert len(remaining) == 25
+    assert all(key.startswith("hotels:") for key in remaining)
+    assert cache.invalidate_pattern("rooms:*") == 0
+
+
+def test_invalidate_pattern_budget(cache):
+    removed = cache.invalidate_pattern("*", budget=0)
+
+    # Une seule page SCAN traitée, le reste expirera par TTL
+    assert removed == cache.scan_count
+    assert len(get_redis().store) == 50 - removed
+
+
+def test_bump_changes_only_given_namespaces():
+    cache = CacheService()
+    rooms_key = cache.key("rooms:hotel:1", "", 10)
+    other_key = cache.key("rooms:hotel:2", "", 10)
+    cache.set(rooms_key, ["cached"])
+    assert rooms_key.startswith("rooms:hotel:1:v")
+
+    cache.bump("rooms:hotel:1")
+
+    assert cache.key("rooms:hotel:1", "", 10) != rooms_key
+    assert cache.get(cache.key("rooms:hotel:1", "", 10)) is None
+    assert cache.key("rooms:hotel:2", "", 10) == other_key
+
+
+def test_lost_generation_restarts_higher(monkeypatch):
+    clock = iter([1_000_000_000, 1_000_000_000, 1_000_005_000])
+    monkeypatch.setattr(cache_service.time, "time_ns", lambda: next(clock))
+    cache = CacheService()
+    cache.bump("hotels")
+    cache.bump("hotels")
+    before = cache.generation("hotels")
+
+    get_redis().delete("gen:hotels")
+
+    assert cache.generation("hotels") > before
+
+
+def test_generation_counter_expires(monkeypatch):
+    redis = get_redis()
+    calls = []
+    set_key = redis.set
+    monkeypatch.setattr(redis, "set", lambda key, value, **kwargs: calls.append((key, kwargs)) or set_key(key, value, **kwargs))
+
+    cache = CacheService()
+    cache.generation("rooms:calendar:1")
+    cache.bump("rooms:calendar:2")
+
+    assert calls == [
+        ("gen:rooms:calendar:1", {"nx": True, "ex": settings.CACHE_GENERATION_TTL}),
+        ("gen:rooms:calendar:2", {"nx": True, "ex": settings.CACHE_GENERATION_TTL}),
+    ]
+
+
+def test_night_tags():
+    assert night_tags(date(2030, 1, 30), date(2030, 2, 2)) == ["night:2030-01-30", "night:2030-01-31", "night:2030-02-01"]
+
+
+def test_invalidate_tags():
+    cache = CacheService()
+    cache.set("search:january", [1], tags=night_tags(date(2030, 1, 10), date(2030, 1, 12)) + ["room:1"])
+    cache.set("search:february", [2], tags=night_tags(date(2030, 2, 10), date(2030, 2, 12)) + ["room:1"])
+    cache.set("search:room-2", [3], tags=["room:2"])
+
+    assert cache.invalidate_tags("night:2030-01-11", "night:2030-03-01") == 1
+    assert cache.get("search:january") is None
+    assert cache.get("search:february") == [2]
+
+    assert cache.invalidate_tags("room:1") == 1
+    assert cache.get("search:february") is None
+    assert cache.get("search:room-2") == [3]
+    assert cache.invalidate_tags() == 0
+
+
+def test_tag_set_pruned(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_TAG_PRUNE_EVERY", 4)
+    monkeypatch.setattr(settings, "CACHE_SCAN_COUNT", 2)
+    cache = CacheService()
+    redis = get_redis()
+
+    for i in range(3):
+        cache.set(f"search:{i}", [i], tags=["night:2030-01-10"])
+    # Deux entrées expirées par TTL : seules leurs références restent dans le set
+    redis.delete("search:0", "search:2")
+    assert redis.scard("tag:night:2030-01-10") == 3
+
+    # Le 4e membre déclenche la purge des clés expirées
+    cache.set("search:3", [3], tags=["night:2030-01-10"])
+    assert redis.store["tag:night:2030-01-10"] == {"search:1", "search:3"}
+
+    assert cache.invalidate_tags("night:2030-01-10") == 2
+
+
+def test_get_or_set_single_flight():
+    calls = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"items": [1]}
+
+    results = []
+
+    def request():
+        start.wait()
+        results.append(CacheService().get_or_set("hotels:v1:all", compute))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"items": [1]}] * 8
+    assert "lock:hotels:v1:all" not in get_redis().store
+
+
+def test_get_or_set_waits_for_lock_holder(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_LOCK_POLL", 0.01)
+    redis = get_redis()
+    # Un autre worker détient le verrou et remplit la clé un peu plus tard
+    redis.set("lock:hotels:v1:all", "1", nx=True, ex=10)
+    filler = threading.Timer(0.05, lambda: redis.setex(
+        "hotels:v1:all", 60, json.dumps({"value": ["theirs"], "delta": 0.01, "expires_at": time.time() + 60})
+    ))
+    filler.start()
+
+    assert CacheService().get_or_set("hotels:v1:all", lambda: pytest.fail("must not compute")) == ["theirs"]
+    filler.join()
+
+
+def test_get_or_set_lock_wait_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_LOCK_WAIT", 0.05)
+    monkeypatch.setattr(settings, "CACHE_LOCK_POLL", 0.01)
+    get_redis().set("lock:hotels:v1:all", "1", nx=True, ex=10)
+
+    assert CacheService().get_or_set("hotels:v1:all", lambda: ["mine"]) == ["mine"]
+    assert CacheService().get("hotels:v1:all")["value"] == ["mine"]
+
+
+def test_get_or_set_xfetch(monkeypatch):
+    monkeypatch.setattr(cache_service.random, "random", lambda: 0.5)  # -ln(0.5) ≈ 0.69
+    cache = CacheService()
+    cache.set("hotels:v1:all", {"value": ["old"], "delta": 10, "expires_at": time.time() + 100})
+
+    # Expiration lointaine au regard du coût du calcul : valeur en cache
+    assert cache.get_or_set("hotels:v1:all", lambda: pytest.fail("must not compute")) == ["old"]
+
+    cache.set("hotels:v1:all", {"value": ["old"], "delta": 10, "expires_at": time.time() + 5})
+
+    # Un autre worker rafraîchit déjà : l'ancienne valeur reste servie
+    get_redis().set("lock:hotels:v1:all", "1", nx=True, ex=10)
+    assert cache.get_or_set("hotels:v1:all", lambda: pytest.fail("must not compute")) == ["old"]
+    get_redis().delete("lock:hotels:v1:all")
+
+    assert cache.get_or_set("hotels:v1:all", lambda: ["new"]) == ["new"]
+    assert cache.get("hotels:v1:all")["value"] == ["new"]
+
+
+def test_get_or_set_releases_lock_on_error():
+    def compute():
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    with pytest.raises(HTTPException):
+        CacheService().get_or_set("rooms:calendar:1:v1:2030-01", compute)
+
+    assert get_redis().store == {}
+
+
+def test_get_or_set_keeps_lock_of_other_worker():
+    redis = get_redis()
+
+    def compute():
+        # Verrou expiré pendant le calcul et repris par un autre worker
+        redis.store["lock:hotels:v1:all"] = "their-token"
+        return ["mine"]
+
+    assert CacheService().get_or_set("hotels:v1:all", compute) == ["mine"]
+    assert redis.get("lock:hotels:v1:all") == "their-token"
@@ -0,0 +1,73 @@
+"""
+Unit tests for the in-memory HotelSearchIndex.
+
+Scenarios Covered:
+
+✔ Tokens are lowercased and accent-folded
+✔ Name matches rank above description matches
+✔ upsert / remove keep the postings consistent
+✔ Keyset paging on (score, id) returns every match once
+
+Goal:
+Guarantee ranked full-text search without scanning the catalogue.
+"""
+
+import uuid
+
+from app.infrastructure.indexes.hotel_search_index import HotelSearchIndex, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Hôtel  Le Plateau-Abidjan!") == ["hotel", "le", "plateau", "abidjan"]
+    assert tokenize(None) == []
+
+
+def test_name_ranks_above_description():
+    in_name, in_description = uuid.uuid4(), uuid.uuid4()
+    index = HotelSearchIndex()
+    index.load([
+        (in_description, "Sea View", "Has a pool", "Dakar"),
+        (in_name, "Pool House", "Quiet", "Dakar"),
+    ])
+
+    assert [hotel_id for hotel_id, _ in index.search("pool")] == [in_name, in_description]
+
+
+def test_upsert_and_remove():
+    hotel_id = uuid.uuid4()
+    index = HotelSearchIndex()
+    index.load([(hotel_id, "Sea View", None, "Dakar")])
+
+    index.upsert(hotel_id, "Mountain View", None, "Dakar")
+    assert index.search("sea") == []
+    assert [hotel_id for hotel_id, _ in index.search("mountain")] == [hotel_id]
+
+    index.remove(hotel_id)
+    assert index.search("mountain") == []
+    assert index.search("dakar") == []
+
+
+def test_upsert_is_ignored_until_loaded():
+    index = HotelSearchIndex()
+    index.upsert(uuid.uuid4(), "Sea View", None, "Dakar")
+
+    index.load([])
+    assert index.search("sea") == []
+
+
+def test_keyset_paging():
+    index = HotelSearchIndex()
+    index.load([(uuid.uuid4(), f"Hotel {i}", "pool " * (i % 3), "Abidjan") for i in range(25)])
+
+    seen, after = [], None
+    while True:
+        page = index.search("abidjan pool", after, 4)
+        if not page:
+            break
+        seen += page
+        hotel_id, score = page[-1]
+        after = (score, hotel_id)
+
+    assert len(seen) == 25
+    assert len({hotel_id for hotel_id, _ in seen}) == 25
+    assert [score for _, score in seen] == sorted((score for _, score in seen), reverse=True)
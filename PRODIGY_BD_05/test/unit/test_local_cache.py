@@ -0,0 +1,110 @@
+"""
+Unit tests for the L1 LocalCache and the two-tier CacheService.
+
+Scenarios Covered:
+
+✔ The least recently used entry is evicted first, evictions are counted
+✔ Hits and misses are counted
+✔ An entry expires after the TTL
+✔ Invalidation by key and by glob pattern
+✔ A value cached in L1 is served without calling Redis
+✔ bump() / delete() drop the L1 entries and publish the invalidation
+✔ Without CACHE_L1_ENABLED nothing is kept locally nor published
+
+Goal:
+Guarantee the L1 stays bounded and never outlives an invalidation made by this worker.
+"""
+
+import json
+
+import pytest
+
+from app.application.services.v1.cache_service import CacheService
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.infrastructure.cache import local_cache
+from app.infrastructure.cache.local_cache import LocalCache
+
+
+@pytest.fixture
+def l1(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", True)
+    return CacheService()
+
+
+def test_lru_eviction_and_counters():
+    cache = LocalCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" devient le moins récemment utilisé
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.as_dict()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (3, 1, 1, 2)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(local_cache.time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+
+    now[0] = 104.9
+    assert cache.get("a") == 1
+    now[0] = 105.0
+    assert cache.get("a") is None
+
+
+def test_invalidate_keys_and_patterns():
+    cache = LocalCache(max_size=10, ttl=60)
+    for key in ("hotels:v1:x", "hotels:v1:y", "rooms:search:v1:z", "gen:hotels"):
+        cache.set(key, 1)
+
+    cache.invalidate(keys=["gen:hotels"], patterns=["hotels:*"])
+
+    assert [key for key in ("hotels:v1:x", "hotels:v1:y", "rooms:search:v1:z", "gen:hotels") if cache.get(key)] == ["rooms:search:v1:z"]
+
+
+def test_l1_hit_skips_redis(l1, monkeypatch):
+    l1.set("hotels:v1:all", [{"id": 1}])
+    assert l1.get("hotels:v1:all") == [{"id": 1}]  # miss L1, hit Redis
+
+    monkeypatch.setattr(get_redis(), "get", lambda key: pytest.fail("Redis must not be called"))
+
+    assert l1.get("hotels:v1:all") == [{"id": 1}]
+    assert l1.local.stats.hits == 1
+    assert l1.stats()["l2"]["hits"] >= 1
+
+
+def test_invalidations_are_published(l1):
+    redis = get_redis()
+    generation = l1.generation("hotels")
+    l1.set("hotels:v1:all", [1])
+    l1.get("hotels:v1:all")
+
+    l1.bump("hotels")
+    l1.delete("hotels:v1:all")
+
+    assert l1.generation("hotels") == generation + 1
+    assert l1.get("hotels:v1:all") is None
+    assert [json.loads(message) for _, message in redis.published] == [
+        {"keys": ["gen:hotels"], "patterns": []},
+        {"keys": ["hotels:v1:all"], "patterns": []},
+    ]
+    assert {channel for channel, _ in redis.published} == {settings.CACHE_INVALIDATION_CHANNEL}
+
+
+def test_l1_disabled():
+    cache = CacheService()
+    cache.set("hotels:v1:all", [1])
+    cache.get("hotels:v1:all")
+    cache.bump("hotels")
+
+    assert cache.local is None
+    assert cache.stats()["l1"] is None
+    assert get_redis().published == []
+    assert LocalCache._instance is None
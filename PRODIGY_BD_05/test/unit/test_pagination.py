@@ -0,0 +1,60 @@
+"""
+Unit tests for keyset pagination helpers.
+
+Scenarios Covered:
+
+✔ Cursor round-trip (datetime / UUID values)
+✔ Rows sharing the same created_at are neither skipped nor repeated
+✔ Malformed cursor (400)
+
+Goal:
+Guarantee stable (created_at, id) pages.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.domain.models.hotels import Hotel
+from app.domain.models.users import User
+from app.infrastructure.database.pagination import decode_cursor, encode_cursor, paginate
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2030, 1, 1, 12, 0, 0, 123456)
+    hotel_id = uuid.uuid4()
+    order_by = [Hotel.created_at, Hotel.id]
+
+    assert decode_cursor(encode_cursor([created_at, hotel_id]), order_by) == [created_at, hotel_id]
+
+
+def test_invalid_cursor():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("bm9wZQ", [Hotel.created_at, Hotel.id])
+    assert exc.value.status_code == 400
+
+
+def test_paginate_with_identical_created_at(db):
+    owner = User(email="owner@page.test", hashed_password="x", role="owner")
+    db.add(owner)
+    db.flush()
+
+    created_at = datetime(2030, 1, 1, 12, 0, 0)
+    db.add_all([
+        Hotel(name=f"Hotel {i}", address="Abidjan", owner_id=owner.id, created_at=created_at)
+        for i in range(7)
+    ])
+    db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        hotels, cursor = paginate(db.query(Hotel), [Hotel.created_at, Hotel.id], cursor, 3)
+        seen += [hotel.id for hotel in hotels]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
@@ -0,0 +1,55 @@
+"""
+Unit tests for RoomService helpers.
+
+Scenarios Covered:
+
+✔ cheapest_combination matches a brute-force search on random rooms
+✔ cheapest_combination returns None when the party cannot be hosted
+
+Goal:
+Guarantee the group search always returns the cheapest room combination.
+"""
+
+import random
+from itertools import combinations
+from types import SimpleNamespace
+
+from app.application.services.v1.room_service import cheapest_combination
+
+
+def brute_force(rooms, party_size):
+    best = None
+    for size in range(1, len(rooms) + 1):
+        for chosen in combinations(rooms, size):
+            if sum(room.capacity for room in chosen) < party_size:
+                continue
+            price = sum(room.price_per_night for room in chosen)
+            if best is None or price < best:
+                best = price
+    return best
+
+
+def test_cheapest_combination_matches_brute_force():
+    rnd = random.Random(3)
+    for _ in range(100):
+        rooms = [
+            SimpleNamespace(capacity=rnd.randint(1, 5), price_per_night=float(rnd.randint(20, 300)))
+            for _ in range(rnd.randint(1, 8))
+        ]
+        party_size = rnd.randint(1, 15)
+
+        expected = brute_force(rooms, party_size)
+        result = cheapest_combination(rooms, party_size)
+
+        if expected is None:
+            assert result is None
+        else:
+            price, chosen = result
+            assert price == expected
+            assert sum(room.capacity for room in chosen) >= party_size
+            assert len({id(room) for room in chosen}) == len(chosen)
+
+
+def test_cheapest_combination_not_enough_capacity():
+    rooms = [SimpleNamespace(capacity=2, price_per_night=50.0)]
+    assert cheapest_combination(rooms, 3) is None